@@ -0,0 +1,236 @@
+"""
+리뷰 요청 수용 제어 모듈
+진행 중인 리뷰 수와 예상 대기 시간을 추적해 마감 시간 안에 끝나지 못할 요청은
+가벼운 리뷰로 낮추거나 "잠시 후 다시 시도" 결과로 즉시 거절
+"""
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+
+class AdmissionTicket:
+    """수용된 요청 하나"""
+
+    def __init__(self, mode: str, cost: float, estimate: float):
+        # 처리 시간 학습 키 (리뷰 유형, 낮춘 요청이면 ":degraded" 붙임)
+        self.mode = mode
+        self.cost = cost
+        self.estimate = estimate
+        self.started = time.monotonic()
+
+    def remaining(self, now: float) -> float:
+        """남은 예상 처리 시간 (예상보다 오래 걸리면 0)"""
+        return max(self.estimate - (now - self.started), 0.0)
+
+
+class ServiceTimeModel:
+    """
+    요청 하나의 처리 시간 모델 (고정 지연 + 비용당 시간)
+
+    관측값으로 지수 가중 최소제곱 직선을 맞추고, 기본 처리 시간에서 만든 사전 관측 두 개
+    (비용 0, 비용 1)를 항상 더해 비용이 한쪽에 몰려도 기울기가 터지지 않게 함.
+    관측 가중치는 새 관측마다 (1 - alpha)배, 시간이 지나면 반감기마다 절반으로 줄어
+    한동안 관측이 없으면 기본값으로 돌아감.
+    """
+
+    PRIOR_WEIGHT = 0.5
+
+    def __init__(self, default_seconds: float, fixed_ratio: float, alpha: float, half_life: float):
+        """
+        Args:
+            default_seconds: 관측 전 비용 1(전체 카테고리) 요청의 처리 시간 (초)
+            fixed_ratio: 기본 처리 시간 중 비용과 무관한 고정 지연 비율
+            alpha: 새 관측 가중치
+            half_life: 관측 가중치가 절반이 되는 시간 (초)
+        """
+        self.alpha = alpha
+        self.half_life = half_life
+        fixed = default_seconds * fixed_ratio
+        # 사전 관측 (비용, 시간): (0, 고정 지연), (1, 기본 처리 시간)
+        self._prior = [(0.0, fixed), (1.0, default_seconds)]
+        # 관측 가중 합계: 가중치, x, y, x², xy
+        self._sums = [0.0] * 5
+        self._updated = time.monotonic()
+        self.observations = 0
+
+    def _decay(self, now: float):
+        if self.half_life > 0 and now > self._updated:
+            factor = 0.5 ** ((now - self._updated) / self.half_life)
+            self._sums = [value * factor for value in self._sums]
+        self._updated = now
+
+    def observe(self, cost: float, seconds: float, now: float):
+        """관측 하나 반영"""
+        self._decay(now)
+        self._sums = [value * (1 - self.alpha) for value in self._sums]
+        for index, value in enumerate((1.0, cost, seconds, cost * cost, cost * seconds)):
+            self._sums[index] += value
+        self.observations += 1
+
+    def params(self, now: float) -> Tuple[float, float]:
+        """(고정 지연, 비용당 시간)"""
+        self._decay(now)
+        weight, sum_x, sum_y, sum_xx, sum_xy = self._sums
+        for x, y in self._prior:
+            weight += self.PRIOR_WEIGHT
+            sum_x += self.PRIOR_WEIGHT * x
+            sum_y += self.PRIOR_WEIGHT * y
+            sum_xx += self.PRIOR_WEIGHT * x * x
+            sum_xy += self.PRIOR_WEIGHT * x * y
+        mean_x = sum_x / weight
+        mean_y = sum_y / weight
+        variance = sum_xx / weight - mean_x * mean_x
+        per_unit = max((sum_xy / weight - mean_x * mean_y) / variance, 0.0) if variance > 1e-9 else 0.0
+        fixed = max(mean_y - per_unit * mean_x, 0.0)
+        return fixed, per_unit
+
+    def estimate(self, cost: float, now: float) -> float:
+        fixed, per_unit = self.params(now)
+        return fixed + per_unit * cost
+
+
+class AdmissionController:
+    """프로세스 단위 리뷰 요청 수용 제어 클래스 (스레드 안전)"""
+
+    def __init__(self,
+                 max_in_flight: int = Config.ADMISSION_MAX_IN_FLIGHT,
+                 deadline: float = Config.ADMISSION_DEADLINE_SECONDS,
+                 concurrency: int = Config.SCHEDULER_MAX_CONCURRENT,
+                 default_service: Optional[Dict[str, float]] = None,
+                 alpha: float = 0.3,
+                 fixed_ratio: float = Config.ADMISSION_FIXED_LATENCY_RATIO,
+                 half_life: float = Config.ADMISSION_SERVICE_HALF_LIFE_SECONDS):
+        """
+        Args:
+            max_in_flight: 동시에 처리할 최대 요청 수 (넘으면 예상 시간과 관계없이 거절)
+            deadline: 기본 마감 시간 (초, 예상 대기 + 처리 시간이 넘으면 낮추거나 거절)
+            concurrency: 동시에 처리되는 백엔드 호출 수 (대기 시간 추정용)
+            default_service: 관측 전 리뷰 유형별 예상 처리 시간 (초)
+            alpha: 처리 시간 관측 가중치
+            fixed_ratio: 기본 처리 시간 중 비용과 무관한 고정 지연 비율
+            half_life: 관측이 없을 때 학습한 처리 시간이 기본값으로 돌아가는 반감기 (초)
+        """
+        self.max_in_flight = max_in_flight
+        self.deadline = deadline
+        self.concurrency = max(concurrency, 1)
+        self.default_service = default_service or Config.ADMISSION_DEFAULT_SERVICE_SECONDS
+        self.alpha = alpha
+        self.fixed_ratio = fixed_ratio
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._in_flight = []
+        # 모드(리뷰 유형, 낮춘 요청은 ":degraded")별 처리 시간 모델
+        # (가벼운 모델은 속도와 고정 지연이 달라 따로 학습)
+        self._service: Dict[str, ServiceTimeModel] = {}
+        self._counts = {"admitted": 0, "degraded": 0, "rejected": 0}
+
+    def _model(self, mode: str) -> ServiceTimeModel:
+        model = self._service.get(mode)
+        if model is None:
+            review_type = mode.split(":")[0]
+            model = ServiceTimeModel(self.default_service.get(review_type, 10.0),
+                                     self.fixed_ratio, self.alpha, self.half_life)
+            self._service[mode] = model
+        return model
+
+    def _service_time(self, mode: str, cost: float) -> float:
+        return self._model(mode).estimate(cost, time.monotonic())
+
+    def _queue_delay(self, now: float) -> float:
+        """빈 슬롯이 없을 때 진행 중인 작업이 빠지기까지의 예상 대기 (초)"""
+        if len(self._in_flight) < self.concurrency:
+            return 0.0
+        return sum(ticket.remaining(now) for ticket in self._in_flight) / self.concurrency
+
+    def admit(self,
+              review_type: str,
+              cost: float = 1.0,
+              degraded_cost: Optional[float] = None,
+              deadline: Optional[float] = None) -> Dict:
+        """
+        요청 수용 여부 결정
+
+        Args:
+            review_type: 리뷰 유형
+            cost: 요청 비용 (전체 카테고리 종합 리뷰 = 1)
+            degraded_cost: 가벼운 리뷰로 낮췄을 때의 비용 (없으면 낮추지 않음)
+            deadline: 이 요청의 마감 시간 (초, 없으면 기본값)
+
+        Returns:
+            {"admitted", "degraded", "ticket", "estimated_seconds", "retry_after"}
+        """
+        deadline = deadline or self.deadline
+        with self._lock:
+            now = time.monotonic()
+            queue_delay = self._queue_delay(now)
+            estimate = queue_delay + self._service_time(review_type, cost)
+            decision = {"admitted": False, "degraded": False, "ticket": None,
+                        "estimated_seconds": round(estimate, 1), "retry_after": 0}
+
+            if len(self._in_flight) >= self.max_in_flight:
+                # 진행 중인 작업이 하나 빠질 때까지
+                soonest = min((ticket.remaining(now) for ticket in self._in_flight), default=0.0)
+                decision["retry_after"] = max(math.ceil(soonest), 1)
+            elif estimate <= deadline:
+                decision["admitted"] = True
+            elif (degraded_cost is not None
+                  and queue_delay + self._service_time(f"{review_type}:degraded", degraded_cost) <= deadline):
+                decision["admitted"] = True
+                decision["degraded"] = True
+                cost = degraded_cost
+                decision["estimated_seconds"] = round(
+                    queue_delay + self._service_time(f"{review_type}:degraded", cost), 1
+                )
+            else:
+                decision["retry_after"] = max(math.ceil(estimate - deadline), 1)
+
+            if not decision["admitted"]:
+                self._counts["rejected"] += 1
+                return decision
+
+            mode = f"{review_type}:degraded" if decision["degraded"] else review_type
+            ticket = AdmissionTicket(mode, cost, self._service_time(mode, cost))
+            self._in_flight.append(ticket)
+            self._counts["degraded" if decision["degraded"] else "admitted"] += 1
+            decision["ticket"] = ticket
+            return decision
+
+    def release(self, ticket: AdmissionTicket, completed: bool = True, service_seconds: Optional[float] = None):
+        """
+        요청 완료 반영
+
+        Args:
+            ticket: admit가 돌려준 티켓
+            completed: 백엔드 생성을 끝까지 마쳤는지 (오류/취소면 처리 시간을 학습하지 않음)
+            service_seconds: 백엔드 슬롯을 받은 뒤 실제 처리에 걸린 시간 (없으면 수용 이후 경과 시간,
+                             스케줄러 대기는 _queue_delay로 따로 계산하므로 빼고 넘겨야 함)
+        """
+        with self._lock:
+            if ticket in self._in_flight:
+                self._in_flight.remove(ticket)
+            if not completed or ticket.cost <= 0:
+                return
+            now = time.monotonic()
+            observed = service_seconds if service_seconds is not None else now - ticket.started
+            self._model(ticket.mode).observe(ticket.cost, observed, now)
+
+    def get_stats(self) -> Dict:
+        """진행 중 요청 수, 예상 대기 시간, 수용/축소/거절 수"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "in_flight": len(self._in_flight),
+                "max_in_flight": self.max_in_flight,
+                "queue_delay_s": round(self._queue_delay(now), 1),
+                "deadline_s": self.deadline,
+                "service_s": {mode: round(self._model(mode).estimate(1.0, now), 1)
+                              for mode in sorted(set(self.default_service) | set(self._service))},
+                **self._counts
+            }
+
+
+# 프로세스 내 모든 세션/API 요청이 같은 한도를 나눠 씀
+shared_admission = AdmissionController()
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+코드 리뷰 HTTP API 서버
+CI/IDE 플러그인용 asyncio 기반 JSON API (하나의 파이프라인을 모든 요청이 공유)
+
+엔드포인트:
+    GET  /health
+    POST /v1/review       {"code", "language", "review_type", "allow_reuse", "categories", "compress",
+                           "deadline", "stream"}
+    POST /v1/quick-fix    {"code", "issue", "language", "stream"}
+    POST /v1/test-cases   {"code", "language", "deadline", "stream"}
+    POST /v1/diff-review  {"diff", "language", "stream"}
+    POST /v1/feedback     {"review_result", "code", "language", "rating", "helpful",
+                           "suggestions", "review_type", "archive_id"}
+    POST /v1/cancel       {"request_id"}
+
+X-Priority: batch 헤더를 보내면 대화형 요청보다 낮은 우선순위로 처리합니다.
+X-Client-ID 헤더를 보내면 같은 클라이언트의 이전 코드에 대한 추측 작업(테스트 케이스 미리 생성)만 취소합니다.
+"stream": true (또는 ?stream=true)이면 text/event-stream으로 생성 조각(delta)을
+보내고 마지막에 전체 결과(result) 이벤트를 보냅니다.
+스트리밍 연결이 끊기거나 /v1/cancel로 X-Request-ID를 지정해 취소하면 진행 중인
+백엔드 호출을 멈추고 499 (cancelled, partial_result 포함)로 응답합니다.
+과부하로 "deadline"(초) 안에 끝낼 수 없는 리뷰는 503과 Retry-After 헤더로 바로 거절합니다.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from cancellation import CancellationToken
+from code_reviewer import ReviewError, resolve_categories
+from llm_backend import BACKEND_NAMES
+from scheduler import run_with_priority
+from config import Config
+
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    499: "Client Closed Request",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+MAX_HEADER_BYTES = 16 * 1024
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class HTTPError(Exception):
+    """요청 처리 중 HTTP 오류 응답으로 변환할 예외"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """파싱된 HTTP 요청"""
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Dict:
+        """요청 본문을 JSON 객체로 파싱"""
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"JSON 본문을 해석할 수 없습니다: {e}")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "JSON 본문은 객체여야 합니다.")
+        return payload
+
+
+def _require(payload: Dict, field: str, kind=str):
+    """필수 필드 검사"""
+    value = payload.get(field)
+    if value is None or not isinstance(value, kind):
+        raise HTTPError(400, f"'{field}' 필드가 필요합니다.")
+    return value
+
+
+def _deadline(payload: Dict) -> Optional[float]:
+    """선택 필드 deadline (결과를 기다릴 수 있는 시간, 초) 검사"""
+    value = payload.get("deadline")
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise HTTPError(400, "'deadline'은 양수(초)여야 합니다.")
+    return float(value)
+
+
+def _client_id(request: Request, request_id: str) -> str:
+    """
+    추측 작업 소유자 (X-Client-ID 헤더, 없으면 요청마다 별도)
+
+    파이프라인 하나를 모든 요청이 공유하므로 소유자가 같으면 다른 클라이언트의
+    추측 작업까지 취소됩니다. 헤더가 없는 요청은 다른 요청의 작업을 취소하지 않습니다.
+    """
+    client_id = request.headers.get("x-client-id", "")
+    if _REQUEST_ID_PATTERN.match(client_id):
+        return f"client:{client_id}"
+    return f"request:{request_id}"
+
+
+def _wants_stream(request: Request, payload: Dict) -> bool:
+    return bool(payload.get("stream")) or request.query.get("stream", "").lower() in ("1", "true")
+
+
+class ReviewAPIServer:
+    """코드 리뷰 파이프라인 HTTP API 서버 클래스"""
+
+    def __init__(self,
+                 pipeline,
+                 max_workers: int = Config.API_WORKER_THREADS,
+                 max_body_bytes: int = Config.API_MAX_BODY_BYTES,
+                 keepalive_timeout: float = Config.API_KEEPALIVE_TIMEOUT):
+        """
+        서버 초기화
+
+        Args:
+            pipeline: 모든 요청이 공유할 CodeReviewPipeline
+            max_workers: 파이프라인 호출을 실행할 스레드 수
+            max_body_bytes: 허용할 최대 요청 본문 크기
+            keepalive_timeout: 유휴 연결 유지 시간 (초)
+        """
+        self.pipeline = pipeline
+        self.max_body_bytes = max_body_bytes
+        self.keepalive_timeout = keepalive_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-api")
+        self.started_at = time.time()
+        self.in_flight = 0
+        # 진행 중인 요청의 취소 토큰 (request_id → CancellationToken)
+        self._cancel_tokens: Dict[str, CancellationToken] = {}
+        self.routes = {
+            "/health": ("GET", self.handle_health),
+            "/v1/review": ("POST", self.handle_review),
+            "/v1/quick-fix": ("POST", self.handle_quick_fix),
+            "/v1/test-cases": ("POST", self.handle_test_cases),
+            "/v1/diff-review": ("POST", self.handle_diff_review),
+            "/v1/feedback": ("POST", self.handle_feedback),
+            "/v1/cancel": ("POST", self.handle_cancel),
+        }
+
+    async def start(self, host: str = Config.API_SERVER_HOST, port: int = Config.API_SERVER_PORT):
+        """서버 소켓을 열고 asyncio.Server 반환"""
+        return await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+    def close(self):
+        """작업 스레드 정리"""
+        self.executor.shutdown(wait=False)
+
+    # ----- HTTP 처리 -----
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[Request]:
+        """요청 하나 읽기 (연결이 닫혔으면 None, Expect: 100-continue 지원)"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "요청 헤더가 너무 큽니다.")
+
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "잘못된 요청 라인입니다.")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(400, "chunked 요청 본문은 지원하지 않습니다. Content-Length를 사용하세요.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "잘못된 Content-Length입니다.")
+        if length < 0:
+            raise HTTPError(400, "잘못된 Content-Length입니다.")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"요청 본문은 {self.max_body_bytes} bytes 이하여야 합니다.")
+
+        if length and headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """연결 처리 (keep-alive 연결은 여러 요청을 순서대로 처리)"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader, writer)
+                except HTTPError as e:
+                    # 본문을 읽지 못했으므로 응답 후 연결 종료
+                    await self._send_json(writer, e.status, {"success": False, "error": e.message},
+                                          uuid.uuid4().hex, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                if not await self._dispatch(request, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        """라우팅 및 응답 (연결을 유지할지 반환)"""
+        incoming_id = request.headers.get("x-request-id", "")
+        request_id = incoming_id if _REQUEST_ID_PATTERN.match(incoming_id) else uuid.uuid4().hex
+        started = time.perf_counter()
+        status = 500
+
+        try:
+            route = self.routes.get(request.path)
+            if route is None:
+                raise HTTPError(404, f"알 수 없는 경로입니다: {request.path}")
+            method, handler = route
+            if request.method != method:
+                raise HTTPError(405, f"{request.path}는 {method} 요청만 지원합니다.")
+
+            self.in_flight += 1
+            try:
+                status = await handler(request, writer, request_id)
+            finally:
+                self.in_flight -= 1
+        except HTTPError as e:
+            status = e.status
+            await self._send_json(writer, status, {"success": False, "error": e.message},
+                                  request_id, request.keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status = 499
+            return False
+        except Exception as e:
+            print(f"[{request_id}] API 처리 중 오류: {e}")
+            status = 500
+            await self._send_json(writer, status, {"success": False, "error": "서버 내부 오류가 발생했습니다."},
+                                  request_id, request.keep_alive)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"[{request_id}] {request.method} {request.path} {status} {elapsed:.1f}ms")
+
+        return request.keep_alive
+
+    @staticmethod
+    def _head(status: int, request_id: str, content_type: str, keep_alive: bool,
+              content_length: Optional[int] = None, extra_headers: Optional[Dict[str, str]] = None) -> bytes:
+        lines = [
+            f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'Unknown')}",
+            f"Content-Type: {content_type}",
+            f"X-Request-ID: {request_id}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+        if content_length is None:
+            lines += ["Transfer-Encoding: chunked", "Cache-Control: no-cache"]
+        else:
+            lines.append(f"Content-Length: {content_length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict,
+                         request_id: str, keep_alive: bool = True):
+        payload = {**payload, "request_id": request_id}
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        # 과부하로 거절한 요청은 언제 다시 시도할지 알려줌
+        extra_headers = {"Retry-After": str(payload["retry_after"])} if payload.get("busy") else None
+        writer.write(self._head(status, request_id, "application/json; charset=utf-8", keep_alive, len(body),
+                                extra_headers) + body)
+        await writer.drain()
+
+    @staticmethod
+    def _sse_event(event: str, payload: Dict) -> bytes:
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        event_bytes = f"event: {event}\ndata: {data}\n\n".encode('utf-8')
+        return f"{len(event_bytes):X}\r\n".encode('latin-1') + event_bytes + b"\r\n"
+
+    # ----- 파이프라인 실행 -----
+
+    @staticmethod
+    def _status_for(result: Dict, text_field: str) -> int:
+        """파이프라인 결과에 맞는 HTTP 상태 코드"""
+        if result.get("cancelled"):
+            return 499
+        if result.get("busy"):
+            return 503
+        if not result.get("success"):
+            return 422
+        if isinstance(result.get(text_field), ReviewError) or result.get("errors"):
+            return 502
+        return 200
+
+    async def _run(self, request: Request, writer: asyncio.StreamWriter, request_id: str,
+                   stream: bool, text_field: str, func, *args, cancellable: bool = True, **kwargs) -> int:
+        """
+        파이프라인 호출을 작업 스레드에서 실행하고 응답 전송
+
+        stream이면 작업 스레드의 on_chunk 콜백을 call_soon_threadsafe로 이벤트 루프
+        큐에 넘겨 SSE delta 이벤트로 바로 내보냅니다.
+        cancellable이면 취소 토큰을 request_id로 등록해 넘기고, 응답을 보내기 전에
+        연결이 끊기면 토큰을 취소해 남은 생성을 멈춥니다.
+        """
+        if not cancellable:
+            return await self._execute(request, writer, request_id, stream, text_field, func, *args, **kwargs)
+
+        token = CancellationToken()
+        self._cancel_tokens[request_id] = token
+        finished = False
+        try:
+            status = await self._execute(request, writer, request_id, stream, text_field, func, *args,
+                                         cancel_token=token, **kwargs)
+            finished = True
+            return status
+        finally:
+            if not finished:
+                token.cancel("클라이언트 연결이 끊어져 요청을 취소했습니다.")
+            if self._cancel_tokens.get(request_id) is token:
+                del self._cancel_tokens[request_id]
+
+    async def _execute(self, request: Request, writer: asyncio.StreamWriter, request_id: str,
+                       stream: bool, text_field: str, func, *args, **kwargs) -> int:
+        """_run의 실제 실행 (작업 스레드 호출 및 JSON/SSE 응답)"""
+        loop = asyncio.get_running_loop()
+
+        # CI 같은 비대화형 호출자는 X-Priority: batch로 대화형 요청보다 뒤에 처리
+        workload = request.headers.get("x-priority", "interactive").lower()
+        if workload not in ("interactive", "batch"):
+            raise HTTPError(400, "X-Priority는 interactive 또는 batch여야 합니다.")
+        if workload == "batch":
+            func = functools.partial(run_with_priority, "batch", func)
+
+        if not stream:
+            result = await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+            status = self._status_for(result, text_field)
+            await self._send_json(writer, status, result, request_id, request.keep_alive)
+            return status
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_chunk(text: str):
+            loop.call_soon_threadsafe(queue.put_nowait, text)
+
+        future = loop.run_in_executor(self.executor, functools.partial(func, *args, on_chunk=on_chunk, **kwargs))
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+
+        writer.write(self._head(200, request_id, "text/event-stream; charset=utf-8", request.keep_alive))
+        while True:
+            text = await queue.get()
+            if text is None:
+                break
+            writer.write(self._sse_event("delta", {"text": text}))
+            await writer.drain()
+
+        try:
+            result = future.result()
+        except Exception as e:
+            # 헤더를 이미 보냈으므로 JSON 응답 대신 error 이벤트로 스트림을 마무리
+            print(f"[{request_id}] 스트리밍 처리 중 오류: {e}")
+            status = 500
+            writer.write(self._sse_event("error", {"success": False, "error": "서버 내부 오류가 발생했습니다.",
+                                                   "status": status, "request_id": request_id}))
+        else:
+            status = self._status_for(result, text_field)
+            writer.write(self._sse_event("result", {**result, "status": status, "request_id": request_id}))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return status
+
+    # ----- 엔드포인트 -----
+
+    async def handle_health(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        await self._send_json(writer, 200, {
+            "success": True,
+            "status": "ok",
+            "uptime": round(time.time() - self.started_at, 1),
+            "in_flight": self.in_flight,
+            "backend": self.pipeline.get_backend_usage(),
+            "admission": self.pipeline.get_admission_stats(),
+            "api_keys": self.pipeline.get_key_usage(),
+            "scheduler": self.pipeline.get_scheduler_stats()
+        }, request_id, request.keep_alive)
+        return 200
+
+    async def handle_review(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        review_type = payload.get("review_type", "comprehensive")
+        if review_type not in ("comprehensive", "test_cases"):
+            raise HTTPError(400, "review_type은 comprehensive 또는 test_cases여야 합니다.")
+        categories = payload.get("categories")
+        if categories is not None:
+            if not isinstance(categories, list) or not all(isinstance(c, str) for c in categories):
+                raise HTTPError(400, "'categories'는 카테고리 ID 문자열 배열이어야 합니다.")
+            try:
+                categories = resolve_categories(categories)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+        return await self._run(
+            request, writer, request_id, _wants_stream(request, payload), "review_result",
+            self.pipeline.process_code_review,
+            _require(payload, "code"),
+            payload.get("language", "Python"),
+            review_type,
+            allow_reuse=bool(payload.get("allow_reuse", True)),
+            categories=categories,
+            compress=payload.get("compress"),
+            deadline=_deadline(payload),
+            client_id=_client_id(request, request_id)
+        )
+
+    async def handle_test_cases(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        return await self._run(
+            request, writer, request_id, _wants_stream(request, payload), "review_result",
+            self.pipeline.process_code_review,
+            _require(payload, "code"),
+            payload.get("language", "Python"),
+            "test_cases",
+            allow_reuse=bool(payload.get("allow_reuse", True)),
+            deadline=_deadline(payload),
+            client_id=_client_id(request, request_id)
+        )
+
+    async def handle_quick_fix(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        return await self._run(
+            request, writer, request_id, _wants_stream(request, payload), "fix_result",
+            self.pipeline.process_quick_fix,
+            _require(payload, "code"),
+            _require(payload, "issue"),
+            payload.get("language", "Python")
+        )
+
+    async def handle_diff_review(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        return await self._run(
+            request, writer, request_id, _wants_stream(request, payload), "errors",
+            self.pipeline.process_diff_review,
+            _require(payload, "diff"),
+            language=payload.get("language")
+        )
+
+    async def handle_feedback(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        rating = _require(payload, "rating", int)
+        if not 1 <= rating <= 5:
+            raise HTTPError(400, "rating은 1~5 사이여야 합니다.")
+        archive_id = payload.get("archive_id")
+        if archive_id is not None and not isinstance(archive_id, int):
+            raise HTTPError(400, "archive_id는 정수여야 합니다.")
+        return await self._run(
+            request, writer, request_id, False, "message",
+            self.pipeline.collect_user_feedback,
+            review_result=_require(payload, "review_result"),
+            user_code=_require(payload, "code"),
+            language=payload.get("language", "Python"),
+            rating=rating,
+            helpful=bool(payload.get("helpful", rating >= 4)),
+            suggestions=payload.get("suggestions", ""),
+            review_type=payload.get("review_type", "comprehensive"),
+            archive_id=archive_id,
+            cancellable=False
+        )
+
+    async def handle_cancel(self, request: Request, writer: asyncio.StreamWriter, request_id: str) -> int:
+        payload = request.json()
+        target = _require(payload, "request_id")
+        token = self._cancel_tokens.get(target)
+        if token is None:
+            raise HTTPError(404, f"진행 중인 요청이 없습니다: {target}")
+        token.cancel("클라이언트 요청으로 취소되었습니다.")
+        await self._send_json(writer, 200, {"success": True, "cancelled": target}, request_id, request.keep_alive)
+        return 200
+
+
+def create_pipeline(fake_backend: bool = False, replay: Optional[str] = None, speed: str = Config.CASSETTE_SPEED,
+                    backend: Optional[str] = None):
+    """
+    공유 파이프라인 생성
+
+    Args:
+        fake_backend: 네트워크 없이 가짜 응답 사용
+        replay: 재생할 기록 파일 (cassette.py, 지정 시 네트워크 없이 기록된 응답 사용)
+        speed: 재생 속도
+        backend: LLM 백엔드 이름 (llm_backend.py, 없으면 Config.LLM_BACKEND)
+    """
+    from pipeline import CodeReviewPipeline
+
+    if backend:
+        Config.LLM_BACKEND = backend
+    if replay:
+        from cassette import ReplayClient
+        return CodeReviewPipeline(client=ReplayClient(replay, speed))
+    if fake_backend:
+        from fake_backend import FakeOpenAIClient
+        return CodeReviewPipeline(client=FakeOpenAIClient())
+    return CodeReviewPipeline()
+
+
+async def serve(host: str, port: int, workers: int, fake_backend: bool = False,
+                replay: Optional[str] = None, speed: str = Config.CASSETTE_SPEED, backend: Optional[str] = None):
+    """서버 실행 (중단될 때까지)"""
+    pipeline = create_pipeline(fake_backend, replay, speed, backend)
+    api = ReviewAPIServer(pipeline, max_workers=workers)
+    server = await api.start(host, port)
+    if replay:
+        backend_label = f", 기록 재생 {replay}"
+    elif fake_backend:
+        backend_label = ", 가짜 백엔드"
+    else:
+        backend_label = f", {pipeline.get_backend_usage()['backend']} 백엔드"
+    print(f"🚀 코드 리뷰 API 서버: http://{host}:{port} (작업 스레드 {workers}개{backend_label})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="코드 리뷰 HTTP API 서버")
+    parser.add_argument("--host", default=Config.API_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKER_THREADS, help="파이프라인 작업 스레드 수")
+    parser.add_argument("--fake-backend", action="store_true", help="OpenAI 대신 결정적 가짜 백엔드 사용")
+    parser.add_argument("--backend", choices=BACKEND_NAMES,
+                        help="LLM 백엔드 (llm_backend.py, 없으면 LLM_BACKEND 설정)")
+    parser.add_argument("--record", metavar="CASSETTE", help="API 호출을 기록할 파일 (cassette.py)")
+    parser.add_argument("--replay", metavar="CASSETTE", help="네트워크 없이 재생할 기록 파일")
+    parser.add_argument("--speed", default=Config.CASSETTE_SPEED, help="재생 속도 (original, max 또는 배속)")
+    args = parser.parse_args()
+    if args.record:
+        Config.CASSETTE_MODE = "record"
+        Config.CASSETTE_FILE = args.record
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.fake_backend, args.replay, args.speed,
+                          args.backend))
+    except KeyboardInterrupt:
+        print("\n👋 서버를 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,12 @@ import streamlit as st
 import os
 from datetime import datetime
 import time
+import threading
 
+from cancellation import CancellationToken
 from config import Config
 from pipeline import CodeReviewPipeline
+from review_history import ReviewHistory
 
 # 페이지 설정
 st.set_page_config(
@@ -83,12 +86,18 @@ def initialize_session_state():
             st.error(f"초기화 오류: {e}")
     
     if 'review_history' not in st.session_state:
-        st.session_state.review_history = []
+        st.session_state.review_history = create_review_history()
     
     if 'current_review' not in st.session_state:
         st.session_state.current_review = None
 
 
+def create_review_history():
+    """세션 히스토리 생성 (본문은 파이프라인 아카이브에서 필요할 때 로드)"""
+    pipeline = st.session_state.get('pipeline')
+    return ReviewHistory(archive=pipeline.archive if pipeline else None)
+
+
 def main():
     """메인 애플리케이션"""
     
@@ -146,7 +155,7 @@ def setup_sidebar():
             st.success("✅ 세션 활성화")
             if st.button("🔄 새 세션 시작"):
                 st.session_state.pipeline.start_new_session()
-                st.session_state.review_history = []
+                st.session_state.review_history = create_review_history()
                 st.rerun()
         else:
             st.error("❌ 세션 비활성화")
@@ -176,7 +185,8 @@ def setup_sidebar():
 
 def check_api_key():
     """API 키 확인 및 설정"""
-    if not Config.OPENAI_API_KEY:
+    if (not Config.OPENAI_API_KEY and not Config.OPENAI_API_KEYS and Config.LLM_BACKEND == "openai"
+            and not Config.USE_FAKE_BACKEND and Config.CASSETTE_MODE != "replay"):
         st.error("⚠️ OpenAI API 키가 설정되지 않았습니다.")
         st.info("""
         API 키를 설정하는 방법:
@@ -220,11 +230,27 @@ def show_code_review_page():
             index=0
         )
     
+    # 종합 리뷰 카테고리 선택 (적게 고를수록 프롬프트와 응답이 짧아짐)
+    categories = None
+    if review_type == "종합 리뷰":
+        categories = st.multiselect(
+            "리뷰 카테고리",
+            list(Config.REVIEW_CATEGORY_IDS),
+            default=list(Config.REVIEW_CATEGORY_IDS),
+            format_func=lambda category_id: Config.REVIEW_CATEGORY_IDS[category_id]
+        )
+    
+    compress = st.checkbox(
+        "🗜️ 프롬프트 압축 (주석·빈 줄 제외, 줄 번호는 원래 코드 기준으로 표시)",
+        value=Config.PROMPT_COMPRESSION_ENABLED
+    )
+    
     # 코드 입력
     code_input = st.text_area(
         "코드를 입력하세요",
         height=300,
-        placeholder="여기에 리뷰받고 싶은 코드를 붙여넣으세요..."
+        placeholder="여기에 리뷰받고 싶은 코드를 붙여넣으세요...",
+        on_change=cancel_pending_work
     )
     
     # 리뷰 실행 버튼
@@ -232,10 +258,12 @@ def show_code_review_page():
     
     with col2:
         if st.button("🚀 코드 리뷰 시작", type="primary", use_container_width=True):
-            if code_input.strip():
-                process_code_review(code_input, language, review_type)
-            else:
+            if not code_input.strip():
                 st.error("코드를 입력해주세요!")
+            elif categories == []:
+                st.error("리뷰 카테고리를 하나 이상 선택해주세요!")
+            else:
+                process_code_review(code_input, language, review_type, categories=categories, compress=compress)
     
     # 빠른 수정 섹션
     if st.session_state.current_review:
@@ -247,32 +275,93 @@ def show_code_review_page():
         show_review_result(st.session_state.current_review)
 
 
-def process_code_review(code_input, language, review_type):
+def cancel_pending_work():
+    """코드가 바뀌면 이전 코드로 진행 중인 요청과 미리 생성 중인 결과는 버림"""
+    token = st.session_state.get('cancel_token')
+    if token:
+        token.cancel("코드가 수정되어 요청을 취소했습니다.")
+    if st.session_state.get('pipeline'):
+        st.session_state.pipeline.cancel_speculation()
+
+
+def run_cancellable(func, progress_bar=None, **kwargs):
+    """
+    파이프라인 호출을 백그라운드 스레드에서 실행하며 기다림
+    
+    기다리는 동안 Streamlit이 스크립트를 중단하면(다른 페이지로 이동, 버튼 재클릭, 입력 변경)
+    취소 토큰으로 진행 중인 백엔드 호출도 멈춤. 이전 요청이 남아 있으면 먼저 취소.
+    Streamlit은 스크립트 스레드가 st 요소를 갱신할 때만 중단 요청을 확인하므로,
+    progress_bar가 없어도 경과 시간 표시를 계속 갱신해 중단 지점을 만듦.
+    """
+    previous = st.session_state.get('cancel_token')
+    if previous:
+        previous.cancel("새 요청으로 대체되었습니다.")
+    token = CancellationToken()
+    st.session_state.cancel_token = token
+    
+    outcome = {}
+    
+    def worker():
+        outcome['result'] = func(cancel_token=token, **kwargs)
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    status = st.empty() if progress_bar is None else None
+    started = time.time()
+    try:
+        step = 0
+        while thread.is_alive():
+            thread.join(timeout=0.1)
+            if progress_bar is not None:
+                # 남은 시간을 알 수 없으므로 95%까지 천천히 채움
+                step = min(step + 1, 95)
+                progress_bar.progress(step)
+            else:
+                status.caption(f"⏳ {time.time() - started:.1f}초 경과")
+    finally:
+        if thread.is_alive():
+            token.cancel("화면을 벗어나 요청을 취소했습니다.")
+    if status is not None:
+        status.empty()
+    
+    return outcome.get('result') or {"success": False, "error": "요청 처리 중 오류가 발생했습니다."}
+
+
+# 화면 표시용 리뷰 타입 → 파이프라인 리뷰 타입
+REVIEW_TYPE_MAP = {
+    "종합 리뷰": "comprehensive",
+    "테스트 케이스 생성": "test_cases"
+}
+
+
+def process_code_review(code_input, language, review_type, allow_reuse=True, categories=None, compress=None):
     """코드 리뷰 처리"""
-    review_type_map = {
-        "종합 리뷰": "comprehensive",
-        "테스트 케이스 생성": "test_cases"
-    }
-    
+
     with st.spinner("🤖 AI가 코드를 분석중입니다..."):
         # 프로그레스 바
         progress_bar = st.progress(0)
-        for i in range(100):
-            time.sleep(0.01)
-            progress_bar.progress(i + 1)
         
-        result = st.session_state.pipeline.process_code_review(
+        result = run_cancellable(
+            st.session_state.pipeline.process_code_review,
+            progress_bar,
             code_snippet=code_input,
             language=language,
-            review_type=review_type_map[review_type]
+            review_type=REVIEW_TYPE_MAP[review_type],
+            allow_reuse=allow_reuse,
+            categories=categories,
+            compress=compress
         )
         
         progress_bar.empty()
         
         if result['success']:
             st.session_state.current_review = result
-            st.session_state.review_history.append(result)
+            st.session_state.review_history.add(result)
             st.success("✅ 코드 리뷰가 완료되었습니다!")
+        elif result.get('busy'):
+            st.warning(f"⏳ {result['error']}")
+        elif result.get('cancelled'):
+            st.warning(f"⏹️ {result['error']}")
         else:
             st.error(f"❌ 리뷰 실패: {result.get('error', '알 수 없는 오류')}")
 
@@ -282,6 +371,33 @@ def show_review_result(review_data):
     st.divider()
     st.subheader("📋 리뷰 결과")
     
+    # 재사용된 리뷰 안내
+    if review_data.get('reused'):
+        st.info(
+            f"♻️ 재사용된 리뷰입니다. 이전에 리뷰한 코드(아카이브 #{review_data['reused_from']})와 "
+            f"{review_data['similarity']:.0%} 유사하여 공백·주석·변수명 차이로 판단하고 즉시 표시했습니다."
+        )
+        if st.button("🔄 새로 리뷰 받기"):
+            review_type_label = {v: k for k, v in REVIEW_TYPE_MAP.items()}[review_data['review_type']]
+            process_code_review(
+                review_data['code_snippet'],
+                review_data['language'],
+                review_type_label,
+                allow_reuse=False,
+                categories=review_data.get('categories')
+            )
+            st.rerun()
+    
+    if review_data.get('degraded'):
+        st.warning("⚠️ 요청이 많아 가벼운 리뷰(핵심 카테고리, 빠른 모델)로 처리했습니다. 잠시 후 다시 요청하면 전체 리뷰를 받을 수 있습니다.")
+    
+    if review_data.get('prefetched'):
+        st.caption("⚡ 종합 리뷰 직후 미리 생성해 둔 결과입니다.")
+    
+    if review_data.get('cached_categories'):
+        cached_names = ", ".join(Config.REVIEW_CATEGORY_IDS[c] for c in review_data['cached_categories'])
+        st.caption(f"⚡ 이전에 리뷰한 카테고리는 저장된 결과를 사용했습니다: {cached_names}")
+    
     # 코드 통계
     stats = review_data.get('code_stats', {})
     col1, col2, col3, col4 = st.columns(4)
@@ -295,6 +411,17 @@ def show_review_result(review_data):
     with col4:
         st.metric("복잡도", stats.get('estimated_complexity', 'N/A'))
     
+    if review_data.get('routing'):
+        routing = review_data['routing']
+        st.caption(f"🧭 모델: {routing['model']} ({routing['tier']}) · max_tokens {routing['max_tokens']} · {routing['reason']}")
+    
+    if review_data.get('compression'):
+        saved = review_data['compression']
+        st.caption(
+            f"🗜️ 프롬프트 압축: {saved['original_chars']:,}자 → {saved['compressed_chars']:,}자 "
+            f"({saved['original_lines']}줄 → {saved['compressed_lines']}줄, 약 {saved['estimated_tokens_saved']:,} 토큰 절약)"
+        )
+    
     # 리뷰 내용
     st.markdown(f"""
     <div class="review-container">
@@ -305,6 +432,28 @@ def show_review_result(review_data):
     # 원본 코드
     with st.expander("🔍 원본 코드 보기"):
         st.code(review_data['code_snippet'], language=review_data['language'].lower())
+    
+    # 유사한 과거 리뷰
+    if review_data.get('similar_reviews'):
+        show_similar_reviews(review_data['similar_reviews'])
+
+
+def show_similar_reviews(similar_reviews):
+    """유사한 과거 리뷰와 받은 피드백 표시"""
+    st.subheader("🔗 유사한 과거 리뷰")
+    
+    for item in similar_reviews:
+        feedback = item.get('feedback')
+        feedback_label = (
+            f"⭐ {feedback['average_rating']:.1f} · 👍 {feedback['helpful_percentage']:.0f}% ({feedback['count']}건)"
+            if feedback else "피드백 없음"
+        )
+        with st.expander(
+            f"아카이브 #{item['archive_id']} - {item['language']} "
+            f"(유사도 {item['score']:.0%}, {feedback_label})"
+        ):
+            st.code(item['code_preview'], language=item['language'].lower())
+            st.write(item['review_preview'] + "...")
 
 
 def show_quick_fix_section(code_input, language):
@@ -318,7 +467,8 @@ def show_quick_fix_section(code_input, language):
     
     if st.button("🔧 수정 제안 받기") and issue_description:
         with st.spinner("수정 제안을 생성중입니다..."):
-            fix_result = st.session_state.pipeline.process_quick_fix(
+            fix_result = run_cancellable(
+                st.session_state.pipeline.process_quick_fix,
                 code_snippet=code_input,
                 issue_description=issue_description,
                 language=language
@@ -331,6 +481,8 @@ def show_quick_fix_section(code_input, language):
                     {fix_result['fix_result'].replace('\n', '<br>')}
                 </div>
                 """, unsafe_allow_html=True)
+            elif fix_result.get('cancelled'):
+                st.warning(f"⏹️ {fix_result['error']}")
             else:
                 st.error(f"❌ 수정 제안 실패: {fix_result.get('error')}")
 
@@ -339,49 +491,81 @@ def show_history_page():
     """히스토리 페이지"""
     st.header("📜 리뷰 히스토리")
     
-    if not st.session_state.review_history:
-        st.info("아직 리뷰 히스토리가 없습니다.")
-        return
+    scope = st.radio(
+        "조회 범위",
+        ["session", "archive"],
+        format_func=lambda x: {"session": "현재 세션", "archive": "전체 아카이브"}[x],
+        horizontal=True
+    )
     
-    # 히스토리 필터
-    col1, col2 = st.columns(2)
+    if scope == "session":
+        history = st.session_state.review_history
+        if not len(history):
+            st.info("아직 리뷰 히스토리가 없습니다.")
+            return
+    else:
+        history = st.session_state.pipeline.archive
+    
+    # 히스토리 필터 (인덱스에서 바로 옵션 조회)
+    col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
         language_filter = st.selectbox(
             "언어 필터",
-            ["전체"] + list(set([r['language'] for r in st.session_state.review_history]))
+            ["전체"] + history.languages()
         )
     
     with col2:
         review_type_filter = st.selectbox(
             "리뷰 타입 필터", 
-            ["전체"] + list(set([r['review_type'] for r in st.session_state.review_history]))
+            ["전체"] + history.review_types()
         )
     
-    # 필터링된 히스토리 표시
-    filtered_history = st.session_state.review_history
-    
-    if language_filter != "전체":
-        filtered_history = [r for r in filtered_history if r['language'] == language_filter]
+    with col3:
+        page_size = st.selectbox("페이지당 항목", Config.HISTORY_PAGE_SIZE_OPTIONS, index=1)
+    
+    # 필터링된 히스토리 페이지 조회
+    result = history.query(
+        language=None if language_filter == "전체" else language_filter,
+        review_type=None if review_type_filter == "전체" else review_type_filter,
+        page=st.session_state.get('history_page', 1),
+        page_size=min(page_size, Config.HISTORY_MAX_EXPANDERS)
+    )
     
-    if review_type_filter != "전체":
-        filtered_history = [r for r in filtered_history if r['review_type'] == review_type_filter]
+    if not result['items']:
+        st.info("조건에 맞는 리뷰가 없습니다.")
     
     # 히스토리 아이템 표시
-    for i, review in enumerate(reversed(filtered_history)):
-        with st.expander(f"리뷰 #{len(filtered_history)-i} - {review['language']} ({review['timestamp'][:16]})"):
+    for item in result['items']:
+        with st.expander(f"리뷰 #{item['number']} - {item['language']} ({item['timestamp'][:16]})"):
             
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                st.code(review['code_snippet'][:200] + "..." if len(review['code_snippet']) > 200 else review['code_snippet'])
+                st.code(item['code_preview'])
             
             with col2:
-                st.write(f"**언어**: {review['language']}")
-                st.write(f"**타입**: {review['review_type']}")
-                st.write(f"**시간**: {review['timestamp'][11:16]}")
+                st.write(f"**언어**: {item['language']}")
+                st.write(f"**타입**: {item['review_type']}")
+                st.write(f"**시간**: {item['timestamp'][11:16]}")
             
             st.markdown("**리뷰 결과:**")
-            st.write(review['review_result'][:500] + "..." if len(review['review_result']) > 500 else review['review_result'])
+            
+            # 전체 본문은 사용자가 요청한 항목만 로드
+            if item['truncated'] and st.toggle("전체 보기", key=f"history_full_{scope}_{item['id']}"):
+                review = history.get_review(item['id'])
+                st.code(review['code_snippet'], language=review['language'].lower())
+                st.write(review['review_result'])
+            else:
+                st.write(item['review_preview'])
+    
+    # 필터 변경으로 페이지 수가 줄어든 경우 현재 페이지 보정
+    st.session_state.history_page = result['page']
+    st.number_input(
+        f"페이지 (전체 {result['total_pages']}쪽, {result['total']}건)",
+        min_value=1,
+        max_value=result['total_pages'],
+        key='history_page'
+    )
 
 
 def show_analytics_page():
@@ -441,11 +625,131 @@ def show_analytics_page():
         )
         st.bar_chart(df.set_index('언어'))
     
+    # 시계열 추이
+    show_timeseries_section()
+    
+    # 언어/유형/모델 티어별 상세 분석
+    show_breakdown_section()
+    
+    # 우선순위 클래스별 백엔드 대기 시간
+    scheduler_stats = st.session_state.pipeline.get_scheduler_stats()
+    if scheduler_stats:
+        st.subheader("🚦 우선순위별 대기 시간")
+        st.dataframe(scheduler_stats, hide_index=True, use_container_width=True)
+    
+    # 과부하 시 리뷰 요청 수용 제어
+    admission = st.session_state.pipeline.get_admission_stats()
+    if admission:
+        st.subheader("🛡️ 요청 수용 제어")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("진행 중", f"{admission['in_flight']} / {admission['max_in_flight']}")
+        with col2:
+            st.metric("예상 대기", f"{admission['queue_delay_s']}초")
+        with col3:
+            st.metric("가벼운 리뷰로 처리", admission['degraded'])
+        with col4:
+            st.metric("거절", admission['rejected'])
+    
+    # API 키 풀 사용량 (OPENAI_API_KEYS 설정 시)
+    key_usage = st.session_state.pipeline.get_key_usage()
+    if key_usage:
+        st.subheader("🔑 API 키별 사용량")
+        st.dataframe(key_usage, hide_index=True, use_container_width=True)
+    
     # 최근 제안사항
     if stats.get('recent_suggestions'):
-        st.subheader("💬 최근 사용자 제안사항")
-        for i, suggestion in enumerate(stats['recent_suggestions'], 1):
-            st.write(f"{i}. {suggestion}")
+        show_suggestions_section()
+    
+    # 데이터 관리
+    with st.expander("⚙️ 데이터 관리"):
+        st.caption(
+            f"원시 피드백은 {Config.FEEDBACK_RAW_RETENTION_DAYS}일, "
+            f"시간별 집계는 {Config.ROLLUP_HOURLY_RETENTION_DAYS}일 동안 보존됩니다. 일별 집계는 유지됩니다. "
+            "정리 전에 모든 기록을 컬럼형 분석 파일로 내보냅니다."
+        )
+        if st.button("🗜️ 내보내기 및 오래된 데이터 정리"):
+            result = st.session_state.pipeline.compact_feedback_data()
+            st.success(
+                f"피드백 {result['exported_feedback']}건, 사용량 {result['exported_usage']}건을 내보내고 "
+                f"원시 피드백 {result['removed_records']}건, "
+                f"시간별 집계 {result['pruned_hourly_buckets']}건을 정리했습니다."
+            )
+
+
+def show_breakdown_section():
+    """컬럼형 저장소(메모리 매핑) 기반 상세 분석"""
+    breakdown = st.session_state.pipeline.get_feedback_breakdown()
+    usage = st.session_state.pipeline.get_usage_summary()
+    if not breakdown['total'] and not usage:
+        return
+    
+    st.subheader("🧮 상세 분석 (내보낸 기록 기준)")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**언어별 평점**")
+        st.dataframe(breakdown['by_language'], hide_index=True, use_container_width=True)
+    
+    with col2:
+        st.write("**리뷰 유형별 평점**")
+        st.dataframe(breakdown['by_review_type'], hide_index=True, use_container_width=True)
+    
+    if usage:
+        st.write("**모델 티어별 사용량**")
+        st.dataframe(usage, hide_index=True, use_container_width=True)
+
+
+def show_timeseries_section():
+    """시간 버킷 집계 기반 추이 차트"""
+    st.subheader("🕒 피드백 추이")
+    
+    granularity = st.radio(
+        "집계 단위",
+        ["daily", "hourly"],
+        format_func=lambda x: {"daily": "일별 (최근 30일)", "hourly": "시간별 (최근 48시간)"}[x],
+        horizontal=True
+    )
+    periods = 30 if granularity == "daily" else 48
+    rows = st.session_state.pipeline.get_feedback_timeseries(granularity, periods)
+    
+    if not rows:
+        st.info("해당 기간의 피드백이 없습니다.")
+        return
+    
+    import pandas as pd
+    df = pd.DataFrame(rows)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("언어별 피드백 수")
+        st.line_chart(df.pivot_table(index='bucket', columns='language', values='count', aggfunc='sum'))
+    
+    with col2:
+        st.caption("평균 평점 / 도움됨 비율(%)")
+        totals = df.groupby('bucket')[['count', 'rating_sum', 'helpful_count']].sum()
+        st.line_chart(pd.DataFrame({
+            '평균 평점': totals['rating_sum'] / totals['count'],
+            '도움됨 비율': totals['helpful_count'] / totals['count'] * 100
+        }))
+
+
+def show_suggestions_section():
+    """사용자 제안사항 (페이지 단위 조회)"""
+    st.subheader("💬 사용자 제안사항")
+    
+    page = st.session_state.get('suggestions_page', 1)
+    result = st.session_state.pipeline.get_suggestions_page(page)
+    
+    for i, item in enumerate(result['items'], (result['page'] - 1) * result['page_size'] + 1):
+        st.write(f"{i}. {item['suggestion']} ({item['language']}, ⭐{item['rating']}, {item['timestamp'][:16]})")
+    
+    st.number_input(
+        f"페이지 (전체 {result['total_pages']}쪽, {result['total']}건)",
+        min_value=1,
+        max_value=result['total_pages'],
+        key='suggestions_page'
+    )
 
 
 def show_feedback_page():
@@ -482,7 +786,10 @@ def show_feedback_page():
                 language=st.session_state.current_review['language'],
                 rating=rating,
                 helpful=helpful,
-                suggestions=suggestions
+                suggestions=suggestions,
+                review_type=st.session_state.current_review['review_type'],
+                archive_id=st.session_state.current_review.get('reused_from',
+                                                               st.session_state.current_review.get('archive_id'))
             )
             
             if result['success']:
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+배치 코드 리뷰 CLI
+여러 파일을 한 번에 리뷰하고 리뷰 아카이브를 조회
+"""
+import argparse
+import os
+import sys
+
+from config import Config
+from llm_backend import BACKEND_NAMES
+from review_archive import ReviewArchive
+
+# 파일 확장자별 언어
+EXTENSION_LANGUAGES = {
+    ".py": "Python",
+    ".js": "JavaScript",
+    ".java": "Java",
+    ".cpp": "C++",
+    ".cc": "C++",
+    ".hpp": "C++",
+    ".cs": "C#",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".ts": "TypeScript",
+    ".php": "PHP",
+    ".rb": "Ruby",
+}
+
+
+def detect_language(path: str) -> str:
+    """파일 확장자로 언어 추정"""
+    return EXTENSION_LANGUAGES.get(os.path.splitext(path)[1].lower(), "기타")
+
+
+def review_files(args):
+    """파일 목록 리뷰"""
+    from pipeline import CodeReviewPipeline
+
+    pipeline = CodeReviewPipeline()
+    if args.archive != Config.REVIEW_ARCHIVE_FILE:
+        pipeline.archive = ReviewArchive(args.archive)
+    failures = 0
+
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+
+        language = args.language or detect_language(path)
+        result = pipeline.process_code_review(code, language, args.review_type,
+                                              categories=args.categories, compress=args.compress)
+
+        if result['success']:
+            print(f"✅ {path} ({language}) → 아카이브 #{result.get('archive_id', '-')}")
+            if result.get('compression'):
+                saved = result['compression']
+                print(f"   🗜️ {saved['original_chars']:,}자 → {saved['compressed_chars']:,}자 "
+                      f"(약 {saved['estimated_tokens_saved']:,} 토큰 절약)")
+            if args.verbose:
+                print(result['review_result'])
+                print("-" * 50)
+        else:
+            failures += 1
+            print(f"❌ {path}: {result['error']}")
+
+    return 1 if failures else 0
+
+
+def review_diff(args):
+    """변경 사항(diff) 리뷰"""
+    from pipeline import CodeReviewPipeline
+
+    diff_text = None
+    if args.diff_file:
+        if args.diff_file == "-":
+            diff_text = sys.stdin.read()
+        else:
+            with open(args.diff_file, 'r', encoding='utf-8') as f:
+                diff_text = f.read()
+    elif not args.range:
+        print("❌ --range 또는 --diff-file이 필요합니다.")
+        return 2
+
+    # 로컬 CLI의 diff는 사용자 자신의 작업 트리이므로 파일을 읽어 문맥 구성
+    result = CodeReviewPipeline().process_diff_review(diff_text, args.range, args.repo, args.language,
+                                                      read_sources=True)
+    if not result['success']:
+        print(f"❌ {result['error']}")
+        return 1
+
+    stats = result['diff_stats']
+    print(f"📄 파일 {stats['files']}개, hunk {stats['hunks']}개, 변경 {stats['changed_lines']}줄 → "
+          f"요청 {stats['requests']}건 ({stats['prompt_chars']:,}자)")
+    for finding in result['findings']:
+        print(f"{finding['file']}:{finding['line']}: {finding['message']}")
+    if args.verbose:
+        for batch in result['batches']:
+            print("-" * 50)
+            print(batch['review_result'])
+    for error in result['errors']:
+        print(f"❌ {error}")
+
+    if result['errors']:
+        return 1
+    return 1 if args.fail_on_findings and result['findings'] else 0
+
+
+def list_reviews(args):
+    """아카이브 목록 조회"""
+    archive = ReviewArchive(args.archive)
+    result = archive.query(
+        language=args.language,
+        review_type=args.review_type,
+        page=args.page,
+        page_size=args.page_size
+    )
+
+    for item in result['items']:
+        first_line = item['code_preview'].strip().split('\n')[0]
+        print(f"#{item['id']:<6} {item['timestamp'][:16]}  {item['language']:<10} {item['review_type']:<14} {first_line[:60]}")
+    print(f"({result['page']}/{result['total_pages']}쪽, 전체 {result['total']}건)")
+    return 0
+
+
+def show_review(args):
+    """아카이브 항목 전체 조회"""
+    archive = ReviewArchive(args.archive)
+    review = archive.get(args.id)
+    if review is None:
+        print(f"❌ 아카이브 #{args.id}를 찾을 수 없습니다.")
+        return 1
+
+    print(f"# 아카이브 #{review['archive_id']} - {review['language']} / {review['review_type']} ({review['timestamp'][:16]})")
+    print(review['code_snippet'])
+    print("-" * 50)
+    print(review['review_result'])
+    return 0
+
+
+def train_dictionary(args):
+    """압축 사전 재학습"""
+    archive = ReviewArchive(args.archive)
+    dict_id = archive.train_dictionary(args.samples)
+    if dict_id is None:
+        print("⚠️ 사전을 학습할 만큼 반복되는 내용이 없습니다.")
+        return 1
+    print(f"✅ 압축 사전 #{dict_id}을 학습했습니다.")
+    return 0
+
+
+def show_statistics(args):
+    """아카이브 저장 효율 통계"""
+    stats = ReviewArchive(args.archive).get_statistics()
+    print(f"리뷰 수: {stats['reviews']}")
+    print(f"고유 블롭 수: {stats['blobs']} (사전 {stats['dictionaries']}개)")
+    print(f"논리 크기: {stats['logical_bytes']:,} bytes")
+    print(f"중복 제거 후: {stats['unique_bytes']:,} bytes")
+    print(f"압축 저장 크기: {stats['stored_bytes']:,} bytes (압축률 {stats['compression_ratio']}x)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """CLI 인자 파서 생성"""
+    parser = argparse.ArgumentParser(
+        description="배치 코드 리뷰 CLI",
+        epilog="LLM 호출은 배치 우선순위로 실행되지만 스케줄러는 프로세스 단위이므로, 이 CLI 안의 호출끼리만 "
+               "조절됩니다. 다른 프로세스(Streamlit 앱, API 서버)의 대화형 요청에는 양보하지 않습니다."
+    )
+    parser.add_argument("--archive", default=Config.REVIEW_ARCHIVE_FILE, help="리뷰 아카이브 파일 경로")
+    parser.add_argument("--record", metavar="CASSETTE", help="API 호출을 기록할 파일 (cassette.py)")
+    parser.add_argument("--replay", metavar="CASSETTE", help="네트워크 없이 재생할 기록 파일")
+    parser.add_argument("--speed", default=Config.CASSETTE_SPEED, help="재생 속도 (original, max 또는 배속)")
+    parser.add_argument("--backend", choices=BACKEND_NAMES,
+                        help="LLM 백엔드 (llm_backend.py, 없으면 LLM_BACKEND 설정)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    review_parser = subparsers.add_parser("review", help="파일 리뷰")
+    review_parser.add_argument("files", nargs="+", help="리뷰할 파일 경로")
+    review_parser.add_argument("--language", help="언어 (없으면 확장자로 추정)")
+    review_parser.add_argument("--review-type", default="comprehensive",
+                               choices=["comprehensive", "test_cases"], help="리뷰 유형")
+    review_parser.add_argument("--categories", nargs="+", choices=list(Config.REVIEW_CATEGORY_IDS),
+                               help="종합 리뷰에서 다룰 카테고리 (없으면 전체)")
+    review_parser.add_argument("--compress", action=argparse.BooleanOptionalAction, default=None,
+                               help="주석/빈 줄을 뺀 압축 코드로 요청 (기본: PROMPT_COMPRESSION_ENABLED)")
+    review_parser.add_argument("-v", "--verbose", action="store_true", help="리뷰 결과 출력")
+    review_parser.set_defaults(handler=review_files)
+
+    diff_parser = subparsers.add_parser("diff", help="변경 사항(diff) 리뷰")
+    diff_parser.add_argument("--range", help="git 커밋 범위 (예: main..HEAD, HEAD~3)")
+    diff_parser.add_argument("--diff-file", help="unified diff 파일 경로 (-이면 표준 입력)")
+    diff_parser.add_argument("--repo", default=".", help="git 저장소 경로")
+    diff_parser.add_argument("--language", help="언어 (없으면 확장자로 추정)")
+    diff_parser.add_argument("--fail-on-findings", action="store_true", help="지적 사항이 있으면 종료 코드 1")
+    diff_parser.add_argument("-v", "--verbose", action="store_true", help="리뷰 결과 전체 출력")
+    diff_parser.set_defaults(handler=review_diff)
+
+    list_parser = subparsers.add_parser("list", help="아카이브 목록 조회")
+    list_parser.add_argument("--language", help="언어 필터")
+    list_parser.add_argument("--review-type", help="리뷰 유형 필터")
+    list_parser.add_argument("--page", type=int, default=1)
+    list_parser.add_argument("--page-size", type=int, default=20)
+    list_parser.set_defaults(handler=list_reviews)
+
+    show_parser = subparsers.add_parser("show", help="아카이브 항목 조회")
+    show_parser.add_argument("id", type=int, help="아카이브 ID")
+    show_parser.set_defaults(handler=show_review)
+
+    train_parser = subparsers.add_parser("train-dict", help="압축 사전 재학습")
+    train_parser.add_argument("--samples", type=int, default=500, help="학습에 사용할 최근 리뷰 수")
+    train_parser.set_defaults(handler=train_dictionary)
+
+    stats_parser = subparsers.add_parser("stats", help="아카이브 저장 효율 통계")
+    stats_parser.set_defaults(handler=show_statistics)
+
+    return parser
+
+
+def main():
+    """메인 함수"""
+    args = build_parser().parse_args()
+    if args.record or args.replay:
+        # CodeReviewHelper가 생성될 때 기록/재생 클라이언트를 사용하도록 설정
+        Config.CASSETTE_MODE = "record" if args.record else "replay"
+        Config.CASSETTE_FILE = args.record or args.replay
+        Config.CASSETTE_SPEED = args.speed
+    if args.backend:
+        Config.LLM_BACKEND = args.backend
+    # 배치 호출은 가장 낮은 우선순위로 (스케줄러는 프로세스 단위라 이 프로세스 안에서만 효과가 있고,
+    # 별도 프로세스로 실행 중인 Streamlit 앱/API 서버의 대화형 요청에는 양보하지 않음)
+    from scheduler import priority
+    with priority("batch"):
+        status = args.handler(args)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+요청 취소 모듈
+사용자가 코드를 수정하거나 페이지를 벗어나거나 다시 요청해 버려진 리뷰를
+파이프라인 → 리뷰 도우미 → 스트리밍 응답까지 전달해 중단
+"""
+import threading
+from typing import Optional
+
+
+class Cancelled(Exception):
+    """취소 토큰이 취소되어 작업을 중단할 때 발생"""
+
+    def __init__(self, reason: str = "", partial: str = ""):
+        """
+        Args:
+            reason: 취소 사유
+            partial: 취소 전까지 받은 부분 응답
+        """
+        super().__init__(reason)
+        self.reason = reason
+        self.partial = partial
+
+
+class CancellationToken:
+    """스레드 사이에서 공유하는 취소 신호 클래스"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "요청이 취소되었습니다."):
+        """취소 (여러 번 호출해도 처음 사유 유지)"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self, partial: str = ""):
+        """취소되었으면 Cancelled 발생"""
+        if self._event.is_set():
+            raise Cancelled(self.reason or "", partial)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """취소될 때까지 최대 timeout초 대기 (취소되었으면 True)"""
+        return self._event.wait(timeout)
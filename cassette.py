@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+요청/응답 기록·재생(cassette) 모듈
+실제 chat.completions 호출(요청, 응답, 스트리밍 조각, 시간)을 gzip JSON Lines 파일에 기록하고
+네트워크 없이 원래 속도 또는 최대 속도로 재생
+
+사용법:
+    CASSETTE_MODE=record streamlit run app.py          # 실제 API 호출을 기록
+    CASSETTE_MODE=replay CASSETTE_SPEED=max python batch_review.py review src/*.py
+    python cassette.py stats review_cassette.jsonl.gz
+"""
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from config import Config
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """재생할 기록이 없는 요청일 때 발생"""
+
+
+def _messages_key(messages: List[Dict]) -> str:
+    """메시지 내용 기준 매칭 키"""
+    payload = json.dumps([[m.get("role"), m.get("content")] for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _usage_dict(usage) -> Optional[Dict]:
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None)
+    }
+
+
+def parse_speed(speed) -> float:
+    """
+    재생 속도를 대기 시간 배율로 변환
+
+    Args:
+        speed: "original"(원래 속도), "max"(대기 없음) 또는 배속 숫자 (예: 2.0)
+
+    Returns:
+        기록된 시간에 곱할 배율
+    """
+    if isinstance(speed, str):
+        if speed.lower() == "original":
+            return 1.0
+        if speed.lower() == "max":
+            return 0.0
+        speed = float(speed)
+    if speed <= 0:
+        raise ValueError("재생 배속은 0보다 커야 합니다.")
+    return 1.0 / speed
+
+
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+class CassetteWriter:
+    """
+    기록 파일에 상호작용을 한 줄씩 추가하는 클래스 (같은 경로는 프로세스 내에서 공유)
+
+    상호작용마다 완결된 gzip 멤버로 기록하므로, 기록 중 비정상 종료되어도
+    앞선 기록은 그대로 읽히고 뒤에 이어 쓴 기록도 다시 읽을 수 있습니다.
+    """
+
+    _writers: Dict[str, "CassetteWriter"] = {}
+    _writers_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self.recorded = 0
+        atexit.register(self.close)
+
+    @classmethod
+    def open(cls, path: str) -> "CassetteWriter":
+        """경로별 공유 writer 반환"""
+        key = os.path.abspath(path)
+        with cls._writers_lock:
+            writer = cls._writers.get(key)
+            if writer is None:
+                writer = cls._writers[key] = cls(path)
+            return writer
+
+    def write(self, interaction: Dict):
+        """상호작용 하나를 독립된 gzip 멤버로 기록 (앱이 비정상 종료돼도 남도록 매번 flush)"""
+        line = json.dumps(interaction, ensure_ascii=False, separators=(",", ":"))
+        member = gzip.compress((line + "\n").encode('utf-8'))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(member)
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _read_members(data: bytes) -> str:
+    """
+    gzip 멤버를 차례로 풀어 이어 붙인 텍스트
+
+    기록 중 종료되어 잘리거나 깨진 멤버는 버리고 다음 gzip 헤더부터 계속 읽습니다.
+    (gzip.open은 깨진 멤버에서 EOFError/zlib.error를 내고 뒤의 기록을 모두 잃음)
+    """
+    parts = []
+    position = 0
+    while position < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            text = decompressor.decompress(data[position:])
+        except zlib.error:
+            text = None
+        if text is not None and decompressor.eof:
+            parts.append(text.decode('utf-8', errors='replace'))
+            position = len(data) - len(decompressor.unused_data)
+            continue
+        if text:
+            # 끝이 잘린 멤버: 풀린 부분은 남기고 잘린 마지막 줄은 json 파싱에서 버림
+            parts.append(text.decode('utf-8', errors='replace') + "\n")
+        following = data.find(_GZIP_MAGIC, position + 1)
+        if following < 0:
+            break
+        position = following
+    return "".join(parts)
+
+
+def load_interactions(path: str) -> List[Dict]:
+    """기록 파일의 상호작용 목록 (버전이 다른 줄과 기록 중 종료되어 잘린 기록은 건너뜀)"""
+    with open(path, 'rb') as f:
+        text = _read_members(f.read())
+    interactions = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            interaction = json.loads(line)
+        except json.JSONDecodeError:
+            # 이전 형식(파일 전체가 한 멤버)에서 잘린 마지막 줄
+            continue
+        if interaction.get("version") == CASSETTE_VERSION:
+            interactions.append(interaction)
+    return interactions
+
+
+class _RecordingCompletions:
+    """client.chat.completions를 감싸 호출을 기록"""
+
+    def __init__(self, inner, writer: CassetteWriter):
+        self._inner = inner
+        self._writer = writer
+
+    @property
+    def call_count(self) -> int:
+        return getattr(self._inner, "call_count", self._writer.recorded)
+
+    def create(self, model: str, messages: List[Dict], temperature: float = 1.0,
+               max_tokens: int = 1000, stream: bool = False, **kwargs):
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream
+        }
+        started = time.perf_counter()
+        response = self._inner.create(model=model, messages=messages, temperature=temperature,
+                                      max_tokens=max_tokens, stream=stream, **kwargs)
+        if stream:
+            return _RecordingStream(response, request, started, self._writer)
+
+        choice = response.choices[0]
+        self._writer.write({
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now().isoformat(),
+            "request": request,
+            "response": {
+                "model": getattr(response, "model", model),
+                "content": choice.message.content,
+                "finish_reason": getattr(choice, "finish_reason", None),
+                "usage": _usage_dict(getattr(response, "usage", None)),
+                "latency": round(time.perf_counter() - started, 4),
+                "chunks": None
+            }
+        })
+        return response
+
+
+class _RecordingStream:
+    """스트리밍 응답을 그대로 전달하면서 조각과 도착 시각 기록"""
+
+    def __init__(self, inner, request: Dict, started: float, writer: CassetteWriter):
+        self._inner = inner
+        self._request = request
+        self._started = started
+        self._writer = writer
+        self._chunks = []
+        self._finish_reason = None
+        self._model = request["model"]
+
+    def __iter__(self):
+        for chunk in self._inner:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    offset = round(time.perf_counter() - self._started, 4)
+                    self._chunks.append([offset, choice.delta.content])
+                if getattr(choice, "finish_reason", None):
+                    self._finish_reason = choice.finish_reason
+            self._model = getattr(chunk, "model", self._model)
+            yield chunk
+        # 끝까지 받은 스트림만 기록 (중간에 취소된 응답은 재생용으로 쓸 수 없음)
+        self._writer.write({
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now().isoformat(),
+            "request": self._request,
+            "response": {
+                "model": self._model,
+                "content": "".join(text for _, text in self._chunks),
+                "finish_reason": self._finish_reason,
+                "usage": None,
+                "latency": round(time.perf_counter() - self._started, 4),
+                "chunks": self._chunks
+            }
+        })
+
+    def close(self):
+        self._inner.close()
+
+
+class RecordingClient:
+    """기존 클라이언트 호출을 기록하는 openai.OpenAI 모양의 래퍼"""
+
+    def __init__(self, inner, path: str = Config.CASSETTE_FILE):
+        """
+        Args:
+            inner: 실제 호출을 수행할 클라이언트 (openai.OpenAI 또는 FakeOpenAIClient)
+            path: 기록 파일 경로 (있으면 뒤에 추가)
+        """
+        self.inner = inner
+        self.chat = SimpleNamespace(completions=_RecordingCompletions(inner.chat.completions, CassetteWriter.open(path)))
+
+
+class _ReplayStream:
+    """기록된 조각을 기록된 시각에 맞춰 돌려주는 스트림"""
+
+    def __init__(self, response: Dict, started: float, scale: float):
+        self._response = response
+        self._started = started
+        self._scale = scale
+        self.closed = False
+
+    def __iter__(self):
+        response = self._response
+        chunks = response["chunks"]
+        if chunks is None:
+            # 비스트리밍 기록은 전체 응답 시간 뒤 한 조각으로 재생
+            chunks = [[response["latency"], response["content"]]]
+        for offset, text in chunks:
+            if self.closed:
+                return
+            delay = self._started + offset * self._scale - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield SimpleNamespace(
+                model=response["model"],
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=text), finish_reason=None)]
+            )
+        yield SimpleNamespace(
+            model=response["model"],
+            choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None),
+                                     finish_reason=response.get("finish_reason") or "stop")]
+        )
+
+    def close(self):
+        self.closed = True
+
+
+class _ReplayCompletions:
+    """client.chat.completions 대체 (기록된 응답 재생)"""
+
+    def __init__(self, interactions: List[Dict], scale: float):
+        self._scale = scale
+        self._lock = threading.Lock()
+        self._by_messages = defaultdict(list)
+        for interaction in interactions:
+            self._by_messages[_messages_key(interaction["request"]["messages"])].append(interaction)
+        self._cursors = defaultdict(int)
+        self.call_count = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _find(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Dict:
+        """
+        같은 메시지의 기록 중 생성 파라미터까지 같은 것을 우선 선택
+        (라우팅 지연이 기록 때와 달라 티어가 바뀌어도 같은 프롬프트면 재생)
+        """
+        key = _messages_key(messages)
+        with self._lock:
+            self.call_count += 1
+            candidates = self._by_messages.get(key)
+            if not candidates:
+                self.misses += 1
+                raise CassetteMiss(f"기록에 없는 요청입니다 (모델 {model}, 메시지 {key[:12]})")
+            params = (model, temperature, max_tokens)
+            exact = [c for c in candidates
+                     if (c["request"]["model"], c["request"]["temperature"], c["request"]["max_tokens"]) == params]
+            pool = exact or candidates
+            # 같은 요청이 여러 번 기록됐으면 순서대로 돌아가며 재생
+            cursor_key = (key, bool(exact))
+            interaction = pool[self._cursors[cursor_key] % len(pool)]
+            self._cursors[cursor_key] += 1
+            self.hits += 1
+            return interaction
+
+    def create(self, model: str, messages: List[Dict], temperature: float = 1.0,
+               max_tokens: int = 1000, stream: bool = False, **kwargs):
+        started = time.perf_counter()
+        response = self._find(model, messages, temperature, max_tokens)["response"]
+
+        if stream:
+            return _ReplayStream(response, started, self._scale)
+
+        time.sleep(response["latency"] * self._scale)
+        usage = response.get("usage") or {}
+        return SimpleNamespace(
+            model=response["model"],
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role="assistant", content=response["content"]),
+                finish_reason=response.get("finish_reason") or "stop"
+            )],
+            usage=SimpleNamespace(**usage) if usage else None
+        )
+
+
+class ReplayClient:
+    """기록 파일을 재생하는 openai.OpenAI 모양의 클라이언트 (네트워크 불필요)"""
+
+    def __init__(self, path: str = Config.CASSETTE_FILE, speed=Config.CASSETTE_SPEED):
+        """
+        Args:
+            path: 기록 파일 경로
+            speed: "original", "max" 또는 배속 숫자
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"기록 파일이 없습니다: {path}")
+        self.path = path
+        self.chat = SimpleNamespace(completions=_ReplayCompletions(load_interactions(path), parse_speed(speed)))
+
+
+def cassette_statistics(path: str) -> Dict:
+    """기록 파일 요약 (상호작용 수, 고유 프롬프트 수, 응답 크기/시간)"""
+    interactions = load_interactions(path)
+    latencies = sorted(i["response"]["latency"] for i in interactions)
+    return {
+        "interactions": len(interactions),
+        "unique_prompts": len({_messages_key(i["request"]["messages"]) for i in interactions}),
+        "streamed": sum(1 for i in interactions if i["response"]["chunks"] is not None),
+        "models": sorted({i["request"]["model"] for i in interactions}),
+        "response_chars": sum(len(i["response"]["content"] or "") for i in interactions),
+        "total_latency": round(sum(latencies), 2),
+        "p50_latency": latencies[len(latencies) // 2] if latencies else 0.0,
+        "file_bytes": os.path.getsize(path)
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="요청/응답 기록 파일 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats_parser = subparsers.add_parser("stats", help="기록 파일 요약")
+    stats_parser.add_argument("path", nargs="?", default=Config.CASSETTE_FILE)
+    args = parser.parse_args()
+
+    stats = cassette_statistics(args.path)
+    print(f"상호작용: {stats['interactions']}개 (고유 프롬프트 {stats['unique_prompts']}개, 스트리밍 {stats['streamed']}개)")
+    print(f"모델: {', '.join(stats['models']) or '-'}")
+    print(f"응답 크기: {stats['response_chars']:,}자")
+    print(f"기록된 응답 시간: 합계 {stats['total_latency']}s, 중앙값 {stats['p50_latency']}s")
+    print(f"파일 크기: {stats['file_bytes']:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,102 +2,397 @@
 코드 리뷰 도우미 모듈
 AI를 활용한 코드 분석 및 리뷰 기능 제공
 """
-from openai import OpenAI
-from typing import Dict, List, Optional
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from cancellation import Cancelled, CancellationToken
 from config import Config
+from llm_backend import BACKEND_NAMES, DeterministicBackend, LLMBackend, LocalBackend, OpenAIBackend
+from scheduler import Preempted, current_priority, shared_scheduler
+
+
+class ReviewError(str):
+    """API 호출 실패 시 반환되는 오류 메시지 (기존처럼 문자열로 다룰 수 있음)"""
+
+
+class ReviewCancelled(ReviewError):
+    """취소된 요청의 메시지 (취소 전까지 받은 부분 응답은 partial)"""
+    
+    def __new__(cls, message: str, partial: str = ""):
+        obj = super().__new__(cls, message)
+        obj.partial = partial
+        return obj
+
+
+# measure_backend_time 블록 안에서 실제 백엔드 호출 시간을 모으는 타이머
+_backend_timer = contextvars.ContextVar("backend_timer", default=None)
+
+
+@contextmanager
+def measure_backend_time():
+    """
+    이 블록 안의 백엔드 호출 시간 합계 측정 (스케줄러 슬롯 대기는 제외)
+    
+    Yields:
+        {"seconds": 호출 시간 합계, "calls": 호출 수} (블록이 끝난 뒤 읽음)
+    """
+    timer = {"seconds": 0.0, "calls": 0}
+    token = _backend_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _backend_timer.reset(token)
+
+
+# 종합 리뷰 카테고리별 세부 항목 (선택한 카테고리만 프롬프트에 포함)
+CATEGORY_GUIDES = {
+    "bugs": [
+        "논리적 오류, 런타임 에러 가능성",
+        "예외 처리 누락",
+        "경계 조건 처리 문제"
+    ],
+    "style": [
+        "코딩 스타일 가이드 준수",
+        "네이밍 컨벤션",
+        "코드 가독성 개선점"
+    ],
+    "performance": [
+        "알고리즘 효율성",
+        "메모리 사용량 최적화",
+        "불필요한 연산 제거"
+    ],
+    "refactoring": [
+        "코드 구조 개선",
+        "중복 코드 제거",
+        "함수/클래스 분리"
+    ],
+    "tests": [
+        "단위 테스트 제안",
+        "엣지 케이스 테스트",
+        "테스트 시나리오"
+    ],
+    "complexity": [
+        "시간 복잡도: O(?)",
+        "공간 복잡도: O(?)",
+        "순환 복잡도 평가"
+    ]
+}
+
+
+def resolve_categories(categories: Optional[List[str]] = None) -> List[str]:
+    """
+    선택한 카테고리를 정해진 순서의 ID 목록으로 변환
+    
+    Args:
+        categories: 카테고리 ID 또는 표시 이름 목록 (없으면 전체)
+        
+    Returns:
+        Config.REVIEW_CATEGORY_IDS 순서의 카테고리 ID 목록
+        
+    Raises:
+        ValueError: 알 수 없는 카테고리가 있을 때
+    """
+    if not categories:
+        return list(Config.REVIEW_CATEGORY_IDS)
+    
+    names = {name: category_id for category_id, name in Config.REVIEW_CATEGORY_IDS.items()}
+    selected = set()
+    for category in categories:
+        category_id = category if category in Config.REVIEW_CATEGORY_IDS else names.get(category)
+        if category_id is None:
+            raise ValueError(
+                f"알 수 없는 리뷰 카테고리: {category} "
+                f"(사용 가능: {', '.join(Config.REVIEW_CATEGORY_IDS)})"
+            )
+        selected.add(category_id)
+    return [category_id for category_id in Config.REVIEW_CATEGORY_IDS if category_id in selected]
+
+
+def scale_token_budget(max_tokens: int, category_count: int) -> int:
+    """전체 카테고리 기준 max_tokens를 선택한 카테고리 비율만큼 축소"""
+    total = len(Config.REVIEW_CATEGORY_IDS)
+    if category_count >= total:
+        return max_tokens
+    scaled = max_tokens * category_count // total
+    return min(max_tokens, max(scaled, Config.REVIEW_CATEGORY_MIN_TOKENS))
+
+
+def split_review_sections(review_text: str, categories: List[str]) -> Optional[Dict[str, str]]:
+    """
+    종합 리뷰 응답을 카테고리별 섹션으로 분리
+    
+    Args:
+        review_text: analyze_code 결과
+        categories: 요청한 카테고리 ID 목록
+        
+    Returns:
+        카테고리 ID → 섹션 텍스트 (제목을 찾지 못한 카테고리가 있으면 None)
+    """
+    starts = []
+    for category_id in categories:
+        index = review_text.find(Config.REVIEW_CATEGORY_IDS[category_id])
+        if index < 0:
+            return None
+        # 제목 줄의 처음부터 (마크다운 **, ## 등 포함)
+        starts.append((review_text.rfind("\n", 0, index) + 1, category_id))
+    
+    starts.sort()
+    sections = {}
+    for i, (start, category_id) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(review_text)
+        if end <= start:
+            return None
+        sections[category_id] = review_text[start:end].strip()
+    return sections
+
+
+# 압축된 코드를 보낼 때 덧붙이는 안내 (줄 번호는 prompt_compression.remap_line_references로 되돌림)
+COMPRESSED_CODE_NOTE = (
+    "코드는 토큰 절약을 위해 주석과 빈 줄을 제거해 압축되어 있습니다. "
+    "줄 번호를 언급할 때는 주어진 코드의 첫 줄을 1로 센 번호를 `줄 N` 형식으로 써주세요."
+)
 
 
 class CodeReviewHelper:
     """AI 기반 코드 리뷰 도우미 클래스"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client=None, scheduler=None,
+                 backend: Optional[LLMBackend] = None):
         """
         코드 리뷰 도우미 초기화
         
         Args:
             api_key: OpenAI API 키 (없으면 환경변수에서 가져옴)
+            client: chat.completions.create를 제공하는 클라이언트 (테스트/대체 백엔드용, OpenAIBackend로 감쌈)
+            scheduler: 백엔드 호출 슬롯을 나누는 스케줄러 (없으면 설정에 따라 프로세스 공유 스케줄러)
+            backend: 사용할 LLM 백엔드 (없으면 client 또는 Config.LLM_BACKEND 설정으로 생성)
         """
-        self.api_key = api_key or Config.OPENAI_API_KEY
-        if not self.api_key:
-            raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
-        
-        # OpenAI 클라이언트 초기화
-        self.client = OpenAI(api_key=self.api_key)
         self.model = Config.OPENAI_MODEL
+        self.scheduler = scheduler or (shared_scheduler if Config.SCHEDULER_ENABLED else None)
+        self.api_key = api_key
+        self.backend = backend or self._create_backend(api_key, client)
+    
+    def _create_backend(self, api_key: Optional[str], client) -> LLMBackend:
+        """설정에 맞는 백엔드 생성 (재생 > 가짜 클라이언트 > LLM_BACKEND > 키 풀 > OpenAI 순)"""
+        if client is None and Config.CASSETTE_MODE == "replay":
+            from cassette import ReplayClient
+            client = ReplayClient(Config.CASSETTE_FILE, Config.CASSETTE_SPEED)
+        elif client is None and Config.USE_FAKE_BACKEND:
+            from fake_backend import FakeOpenAIClient
+            client = FakeOpenAIClient()
+        
+        if client is None and Config.LLM_BACKEND not in BACKEND_NAMES:
+            raise ValueError(f"알 수 없는 LLM 백엔드: {Config.LLM_BACKEND} (사용 가능: {', '.join(BACKEND_NAMES)})")
+        if client is None and Config.LLM_BACKEND == "deterministic":
+            # 네트워크 호출이 없으므로 기록할 것도 없음
+            return DeterministicBackend()
+        
+        if client is None and Config.LLM_BACKEND == "local":
+            backend = LocalBackend()
+        else:
+            if client is None and not api_key and Config.OPENAI_API_KEYS:
+                # 여러 키가 설정되어 있으면 프로세스 공유 키 풀로 분산
+                from key_pool import PooledClient, shared_key_pool
+                client = PooledClient(shared_key_pool())
+            
+            if client is None:
+                self.api_key = api_key or Config.OPENAI_API_KEY
+                if not self.api_key:
+                    raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
+                
+                # OpenAI 클라이언트 초기화 (openai 패키지는 첫 사용 시점에 지연 로드)
+                from openai import OpenAI
+                
+                client = OpenAI(api_key=self.api_key)
+            backend = OpenAIBackend(client)
+        
+        if Config.CASSETTE_MODE == "record":
+            from cassette import RecordingClient
+            if not isinstance(backend.client, RecordingClient):
+                backend.client = RecordingClient(backend.client, Config.CASSETTE_FILE)
+        
+        return backend
+    
+    @property
+    def client(self):
+        """OpenAI 모양 클라이언트를 쓰는 백엔드의 클라이언트 (결정적 백엔드는 None)"""
+        return getattr(self.backend, "client", None)
     
-    def analyze_code(self, code_snippet: str, language: str = "Python") -> str:
+    @client.setter
+    def client(self, client):
+        self.backend = OpenAIBackend(client)
+    
+    def _complete(self, 
+                  messages: List[Dict], 
+                  model: Optional[str], 
+                  temperature: float, 
+                  max_tokens: int,
+                  on_chunk: Optional[Callable[[str], None]] = None,
+                  default_priority: str = "review",
+                  cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        채팅 완성 요청 실행
+        
+        Args:
+            messages: 요청 메시지
+            model: 사용할 모델 (없으면 기본 모델)
+            temperature: 생성 temperature
+            max_tokens: 최대 생성 토큰 수
+            on_chunk: 지정하면 스트리밍으로 받으며 조각마다 호출
+            default_priority: 호출자가 우선순위(배치/추측 실행)를 지정하지 않았을 때의 클래스
+            cancel_token: 취소되면 슬롯 대기/응답 수신을 멈추고 Cancelled 발생
+            
+        Returns:
+            생성된 전체 텍스트
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        if self.scheduler is None:
+            return self._request(messages, model, temperature, max_tokens, on_chunk, cancel_token=cancel_token)
+        
+        priority_class = current_priority(default_priority)
+        # 이미 호출자에게 보낸 조각은 되돌릴 수 없으므로 스트리밍 호출은 추측 실행만 선점
+        preemptible = on_chunk is None or priority_class == "speculative"
+        while True:
+            with self.scheduler.slot(priority_class, cost=max_tokens / 1000, preemptible=preemptible,
+                                     cancel_token=cancel_token) as ticket:
+                try:
+                    return self._request(messages, model, temperature, max_tokens, on_chunk, ticket, cancel_token)
+                except Preempted:
+                    # 대화형 요청에 슬롯을 양보했으므로 다시 줄을 서서 처음부터 생성
+                    continue
+    
+    def _request(self, 
+                 messages: List[Dict], 
+                 model: Optional[str], 
+                 temperature: float, 
+                 max_tokens: int,
+                 on_chunk: Optional[Callable[[str], None]] = None,
+                 ticket=None,
+                 cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        백엔드 호출
+        (선점 가능한 슬롯이거나 취소 토큰이 있으면 조각마다 양보/취소를 확인하도록 스트리밍)
+        """
+        timer = _backend_timer.get()
+        started = time.perf_counter()
+        try:
+            return self._call_backend(messages, model, temperature, max_tokens, on_chunk, ticket, cancel_token)
+        finally:
+            if timer is not None:
+                timer["seconds"] += time.perf_counter() - started
+                timer["calls"] += 1
+    
+    def _call_backend(self, 
+                      messages: List[Dict], 
+                      model: Optional[str], 
+                      temperature: float, 
+                      max_tokens: int,
+                      on_chunk: Optional[Callable[[str], None]],
+                      ticket,
+                      cancel_token: Optional[CancellationToken]) -> str:
+        preemptible = ticket is not None and ticket.preemptible
+        if on_chunk is None and not preemptible and cancel_token is None:
+            return self.backend.complete(messages, model or self.model, temperature, max_tokens).text
+        
+        stream = self.backend.stream(messages, model or self.model, temperature, max_tokens)
+        parts = []
+        try:
+            for delta in stream:
+                if cancel_token is not None and cancel_token.cancelled:
+                    # 더 읽지 않고 스트림을 닫아 남은 생성 토큰을 아낌
+                    raise Cancelled(cancel_token.reason or "", "".join(parts))
+                if preemptible and ticket.preempted.is_set():
+                    raise Preempted()
+                parts.append(delta)
+                if on_chunk:
+                    on_chunk(delta)
+        finally:
+            stream.close()
+        return "".join(parts)
+    
+    def analyze_code(self, 
+                     code_snippet: str, 
+                     language: str = "Python",
+                     model: Optional[str] = None,
+                     temperature: float = 0.7,
+                     max_tokens: Optional[int] = None,
+                     on_chunk: Optional[Callable[[str], None]] = None,
+                     categories: Optional[List[str]] = None,
+                     compressed: bool = False,
+                     cancel_token: Optional[CancellationToken] = None) -> str:
         """
         코드 스니펫을 분석하고 종합적인 리뷰 제공
         
         Args:
             code_snippet: 분석할 코드
             language: 프로그래밍 언어
+            model: 사용할 모델 (없으면 기본 모델)
+            temperature: 생성 temperature
+            max_tokens: 최대 생성 토큰 수 (없으면 2000을 카테고리 비율만큼 축소)
+            on_chunk: 스트리밍 조각 콜백 (지정 시 스트리밍 응답 사용)
+            categories: 리뷰할 카테고리 ID 목록 (없으면 전체)
+            compressed: code_snippet이 prompt_compression으로 압축된 코드인지 여부
+            cancel_token: 취소되면 응답 수신을 멈추고 ReviewCancelled 반환
             
         Returns:
             분석 결과 문자열
         """
         try:
-            messages = self._create_review_messages(code_snippet, language)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=2000
-            )
+            categories = resolve_categories(categories)
+            messages = self._create_review_messages(code_snippet, language, categories, compressed)
+            if max_tokens is None:
+                max_tokens = scale_token_budget(2000, len(categories))
             
-            return response.choices[0].message.content
+            return self._complete(messages, model, temperature, max_tokens, on_chunk,
+                                  cancel_token=cancel_token)
             
+        except Cancelled as e:
+            return ReviewCancelled(e.reason, e.partial)
         except Exception as e:
-            return f"코드 분석 중 오류가 발생했습니다: {str(e)}"
-    
-    def _create_review_messages(self, code_snippet: str, language: str) -> List[Dict]:
-        """리뷰 요청을 위한 메시지 생성"""
-        
-        system_prompt = f"""
-        당신은 {language} 전문가이자 시니어 개발자입니다.
-        주어진 코드에 대해 다음 카테고리별로 상세하고 건설적인 피드백을 제공해주세요:
-
-        **🚨 오류 및 버그**
-        - 논리적 오류, 런타임 에러 가능성
-        - 예외 처리 누락
-        - 경계 조건 처리 문제
-
-        **📝 스타일 및 컨벤션**
-        - 코딩 스타일 가이드 준수
-        - 네이밍 컨벤션
-        - 코드 가독성 개선점
-
-        **⚡ 성능 최적화**
-        - 알고리즘 효율성
-        - 메모리 사용량 최적화
-        - 불필요한 연산 제거
-
-        **🔧 리팩토링 제안**
-        - 코드 구조 개선
-        - 중복 코드 제거
-        - 함수/클래스 분리
-
-        **🧪 테스트 케이스**
-        - 단위 테스트 제안
-        - 엣지 케이스 테스트
-        - 테스트 시나리오
-
-        **📊 복잡도 분석**
-        - 시간 복잡도: O(?)
-        - 공간 복잡도: O(?)
-        - 순환 복잡도 평가
-
-        각 섹션은 이모지와 함께 명확히 구분하고, 구체적인 개선 코드 예시도 포함해주세요.
-        한국어로 응답해주세요.
-        """
+            return ReviewError(f"코드 분석 중 오류가 발생했습니다: {str(e)}")
+    
+    def _create_review_messages(self, 
+                                code_snippet: str, 
+                                language: str, 
+                                categories: Optional[List[str]] = None,
+                                compressed: bool = False) -> List[Dict]:
+        """리뷰 요청을 위한 메시지 생성 (선택한 카테고리만 포함)"""
+        categories = resolve_categories(categories)
+        
+        sections = "\n\n".join(
+            f"**{Config.REVIEW_CATEGORY_IDS[category_id]}**\n"
+            + "\n".join(f"- {item}" for item in CATEGORY_GUIDES[category_id])
+            for category_id in categories
+        )
+        scope = "" if len(categories) == len(CATEGORY_GUIDES) else "\n위 카테고리만 다루고 다른 카테고리는 생략해주세요."
+        
+        system_prompt = f"""당신은 {language} 전문가이자 시니어 개발자입니다.
+주어진 코드에 대해 다음 카테고리별로 상세하고 건설적인 피드백을 제공해주세요:
+
+{sections}
+{scope}
+각 섹션은 이모지가 포함된 제목을 그대로 사용해 명확히 구분하고, 구체적인 개선 코드 예시도 포함해주세요.
+한국어로 응답해주세요.
+"""
+        if compressed:
+            system_prompt += COMPRESSED_CODE_NOTE + "\n"
         
         return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"다음 {language} 코드를 리뷰해주세요:\n\n```{language.lower()}\n{code_snippet}\n```"}
         ]
     
-    def get_quick_fix(self, code_snippet: str, issue_description: str, language: str = "Python") -> str:
+    def get_quick_fix(self, 
+                      code_snippet: str, 
+                      issue_description: str, 
+                      language: str = "Python",
+                      model: Optional[str] = None,
+                      temperature: float = 0.3,
+                      max_tokens: int = 1500,
+                      on_chunk: Optional[Callable[[str], None]] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> str:
         """
         특정 이슈에 대한 빠른 수정 제안
         
@@ -105,6 +400,11 @@ class CodeReviewHelper:
             code_snippet: 원본 코드
             issue_description: 수정이 필요한 이슈 설명
             language: 프로그래밍 언어
+            model: 사용할 모델 (없으면 기본 모델)
+            temperature: 생성 temperature
+            max_tokens: 최대 생성 토큰 수
+            on_chunk: 스트리밍 조각 콜백 (지정 시 스트리밍 응답 사용)
+            cancel_token: 취소되면 응답 수신을 멈추고 ReviewCancelled 반환
             
         Returns:
             수정된 코드 및 설명
@@ -127,25 +427,35 @@ class CodeReviewHelper:
                 """}
             ]
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-                max_tokens=1500
-            )
-            
-            return response.choices[0].message.content
+            return self._complete(messages, model, temperature, max_tokens, on_chunk,
+                                  default_priority="quick_fix", cancel_token=cancel_token)
             
+        except Cancelled as e:
+            return ReviewCancelled(e.reason, e.partial)
         except Exception as e:
-            return f"코드 수정 제안 중 오류가 발생했습니다: {str(e)}"
+            return ReviewError(f"코드 수정 제안 중 오류가 발생했습니다: {str(e)}")
     
-    def generate_test_cases(self, code_snippet: str, language: str = "Python") -> str:
+    def generate_test_cases(self, 
+                            code_snippet: str, 
+                            language: str = "Python",
+                            model: Optional[str] = None,
+                            temperature: float = 0.5,
+                            max_tokens: int = 1500,
+                            on_chunk: Optional[Callable[[str], None]] = None,
+                            compressed: bool = False,
+                            cancel_token: Optional[CancellationToken] = None) -> str:
         """
         코드에 대한 테스트 케이스 생성
         
         Args:
             code_snippet: 테스트할 코드
             language: 프로그래밍 언어
+            model: 사용할 모델 (없으면 기본 모델)
+            temperature: 생성 temperature
+            max_tokens: 최대 생성 토큰 수
+            on_chunk: 스트리밍 조각 콜백 (지정 시 스트리밍 응답 사용)
+            compressed: code_snippet이 prompt_compression으로 압축된 코드인지 여부
+            cancel_token: 취소되면 응답 수신을 멈추고 ReviewCancelled 반환
             
         Returns:
             테스트 케이스 코드
@@ -157,6 +467,7 @@ class CodeReviewHelper:
                 주어진 코드에 대해 포괄적인 단위 테스트를 작성해주세요.
                 다양한 엣지 케이스를 포함하고, {language}의 표준 테스트 프레임워크를 사용해주세요.
                 한국어 주석으로 설명을 추가해주세요.
+                {COMPRESSED_CODE_NOTE if compressed else ""}
                 """},
                 {"role": "user", "content": f"""
                 다음 {language} 코드에 대한 테스트 케이스를 작성해주세요:
@@ -167,14 +478,54 @@ class CodeReviewHelper:
                 """}
             ]
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.5,
-                max_tokens=1500
-            )
+            return self._complete(messages, model, temperature, max_tokens, on_chunk,
+                                  cancel_token=cancel_token)
+            
+        except Cancelled as e:
+            return ReviewCancelled(e.reason, e.partial)
+        except Exception as e:
+            return ReviewError(f"테스트 케이스 생성 중 오류가 발생했습니다: {str(e)}")
+    
+    def review_diff(self, 
+                    diff_snippet: str, 
+                    model: Optional[str] = None,
+                    temperature: float = 0.3,
+                    max_tokens: int = 1500,
+                    on_chunk: Optional[Callable[[str], None]] = None,
+                    cancel_token: Optional[CancellationToken] = None) -> str:
+        """
+        변경 사항(diff hunk + 문맥)만 리뷰
+        
+        Args:
+            diff_snippet: diff_review.render_file_chunk로 만든 줄 번호 포함 변경 내용
+            model: 사용할 모델 (없으면 기본 모델)
+            temperature: 생성 temperature
+            max_tokens: 최대 생성 토큰 수
+            on_chunk: 스트리밍 조각 콜백 (지정 시 스트리밍 응답 사용)
+            cancel_token: 취소되면 응답 수신을 멈추고 ReviewCancelled 반환
+            
+        Returns:
+            파일:줄 위치가 붙은 리뷰 결과
+        """
+        try:
+            messages = [
+                {"role": "system", "content": """
+                당신은 머지 전 변경 사항을 검토하는 시니어 리뷰어입니다.
+                각 파일은 "### 경로" 아래에 새 리비전 줄 번호와 함께 주어집니다.
+                '+' 줄은 추가/변경된 줄, '-' 줄은 삭제된 줄, 나머지는 문맥입니다.
+                변경된 줄과 그 영향만 검토하고, 문제가 없는 부분은 언급하지 마세요.
+                각 지적 사항은 한 줄로 `경로:줄번호` - [오류/성능/스타일/리팩토링] 설명 형식으로 시작하고,
+                필요하면 다음 줄들에 수정 예시를 덧붙여 주세요.
+                문제가 없으면 "지적 사항 없음"이라고만 답해주세요.
+                한국어로 응답해주세요.
+                """},
+                {"role": "user", "content": f"다음 변경 사항을 리뷰해주세요:\n\n{diff_snippet}"}
+            ]
             
-            return response.choices[0].message.content
+            return self._complete(messages, model, temperature, max_tokens, on_chunk,
+                                  cancel_token=cancel_token)
             
+        except Cancelled as e:
+            return ReviewCancelled(e.reason, e.partial)
         except Exception as e:
-            return f"테스트 케이스 생성 중 오류가 발생했습니다: {str(e)}"
+            return ReviewError(f"변경 사항 리뷰 중 오류가 발생했습니다: {str(e)}")
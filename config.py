@@ -13,20 +13,140 @@ class Config:
     # OpenAI API 설정
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = "gpt-3.5-turbo"
+    # 여러 키에 요청을 나눌 때 쉼표로 구분해 지정 (key_pool.py, 지정하면 OPENAI_API_KEY 대신 사용)
+    OPENAI_API_KEYS = [key.strip() for key in os.getenv('OPENAI_API_KEYS', '').split(',') if key.strip()]
+    KEY_POOL_COOLDOWN_SECONDS = 5.0       # 오류 난 키를 제외할 기본 시간 (연속 오류마다 두 배)
+    KEY_POOL_MAX_COOLDOWN_SECONDS = 300.0
+    # 네트워크 없이 fake_backend.FakeOpenAIClient 사용 (부하 테스트/로컬 개발용)
+    USE_FAKE_BACKEND = os.getenv('USE_FAKE_BACKEND', 'false').lower() == 'true'
+    # API 호출 기록/재생 (cassette.py): "record"이면 호출을 기록, "replay"이면 네트워크 없이 기록 재생
+    CASSETTE_MODE = os.getenv('CASSETTE_MODE', '').lower()
+    CASSETTE_FILE = os.getenv('CASSETTE_FILE', "review_cassette.jsonl.gz")
+    CASSETTE_SPEED = os.getenv('CASSETTE_SPEED', "original")    # "original", "max" 또는 배속 (예: 2)
+    # LLM 백엔드 (llm_backend.py): "openai", "deterministic" (프로세스 내 결정적 응답), "local" (OpenAI 호환 로컬 서버)
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai').lower()
+    LOCAL_LLM_BASE_URL = os.getenv('LOCAL_LLM_BASE_URL', 'http://localhost:8000/v1')   # vLLM, llama.cpp, Ollama 등
+    LOCAL_LLM_API_KEY = os.getenv('LOCAL_LLM_API_KEY', 'local')
+    LOCAL_LLM_MODEL = os.getenv('LOCAL_LLM_MODEL', '')   # 지정하면 라우팅된 모델 이름 대신 항상 사용
+
+    # 모델 라우팅 설정 (코드 통계/리뷰 유형/지연 시간에 따라 티어 선택)
+    # 켜면 티어별 모델(fast/strong은 OPENAI_MODEL과 다름)과 max_tokens가 적용되므로 기본은 꺼 둠
+    MODEL_ROUTING_ENABLED = os.getenv('MODEL_ROUTING_ENABLED', 'false').lower() == 'true'
+    MODEL_TIERS = {
+        "fast": {
+            "model": os.getenv('MODEL_TIER_FAST', "gpt-4o-mini"),
+            "max_tokens": 1200,
+            "latency_budget": 8.0       # 이동 평균 지연(초)이 예산을 넘으면 한 단계 낮은 티어 사용
+        },
+        "balanced": {
+            "model": os.getenv('MODEL_TIER_BALANCED', OPENAI_MODEL),
+            "max_tokens": 2000,
+            "latency_budget": 20.0
+        },
+        "strong": {
+            "model": os.getenv('MODEL_TIER_STRONG', "gpt-4o"),
+            "max_tokens": 3000,
+            "latency_budget": 40.0
+        }
+    }
+    ROUTING_LOG_FILE = "routing_log.jsonl"
+    ROUTING_LOG_MAX_BYTES = 10 * 1024 * 1024  # 넘으면 routing_log.jsonl.1로 교체 (이전 교체본은 삭제)
+    ROUTING_LATENCY_MAX_AGE_SECONDS = 300.0   # 새 관측이 없으면 티어 지연 이동 평균을 버리는 시간
+    ROUTING_PROBE_INTERVAL = 20               # 예산 초과 티어도 이 횟수마다 한 번은 사용해 지연 재측정
     
     # Streamlit 앱 설정
     APP_TITLE = "🤖 AI 코드 리뷰 챗봇"
     APP_DESCRIPTION = "AI가 제공하는 전문적인 코드 리뷰 서비스"
     
-    # 코드 리뷰 카테고리
-    REVIEW_CATEGORIES = [
-        "🚨 오류 및 버그",
-        "📝 스타일 및 컨벤션", 
-        "⚡ 성능 최적화",
-        "🔧 리팩토링 제안",
-        "🧪 테스트 케이스",
-        "📊 복잡도 분석"
-    ]
+    # 코드 리뷰 카테고리 (ID → 표시 이름, 종합 리뷰에서 일부만 선택 가능)
+    REVIEW_CATEGORY_IDS = {
+        "bugs": "🚨 오류 및 버그",
+        "style": "📝 스타일 및 컨벤션",
+        "performance": "⚡ 성능 최적화",
+        "refactoring": "🔧 리팩토링 제안",
+        "tests": "🧪 테스트 케이스",
+        "complexity": "📊 복잡도 분석"
+    }
+    REVIEW_CATEGORIES = list(REVIEW_CATEGORY_IDS.values())
+    REVIEW_CATEGORY_MIN_TOKENS = 300      # 카테고리를 줄여도 보장할 최소 max_tokens
+    
+    # 피드백 데이터 보존 설정
+    FEEDBACK_RAW_RETENTION_DAYS = 30      # 원시 피드백 보존 기간 (집계는 유지)
+    ROLLUP_HOURLY_RETENTION_DAYS = 14     # 시간 단위 집계 보존 기간 (일 단위 집계는 영구 보존)
+    SUGGESTIONS_PAGE_SIZE = 10
+    COLUMN_STORE_DIR = "analytics_columns"   # 피드백/사용량 Arrow 컬럼 파일 (정리 시 내보냄)
+    
+    # 리뷰 히스토리 페이지 설정
+    HISTORY_PAGE_SIZE_OPTIONS = [10, 20, 50]
+    HISTORY_MAX_EXPANDERS = 50            # 한 번에 렌더링할 최대 expander 수
+    
+    # 리뷰 아카이브 설정
+    REVIEW_ARCHIVE_FILE = "review_archive.db"
+    ARCHIVE_DICT_TRAIN_MIN_SAMPLES = 50   # 압축 사전 자동 학습에 필요한 리뷰 수
+    
+    # 유사 코드 리뷰 재사용 설정
+    NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.9'))
+    NEAR_DUPLICATE_INDEX_FILE = "near_duplicate_index.jsonl"
+    
+    # 유사 리뷰 검색 설정
+    REVIEW_SEARCH_INDEX_PATH = "review_vectors"
+    SIMILAR_REVIEWS_TOP_K = 3
+    SIMILAR_REVIEWS_MIN_SCORE = 0.3
+    
+    # 프롬프트 압축 (주석/빈 줄 제거 후 응답의 줄 번호를 원래 코드 기준으로 복원)
+    PROMPT_COMPRESSION_ENABLED = os.getenv('PROMPT_COMPRESSION_ENABLED', 'false').lower() == 'true'
+    
+    # 결과 캐시 / 추측 실행 설정
+    RESULT_CACHE_SIZE = 256
+    RESULT_CACHE_TTL = 1800.0             # 초
+    SPECULATIVE_PREFETCH_ENABLED = os.getenv('SPECULATIVE_PREFETCH_ENABLED', 'false').lower() == 'true'
+    SPECULATIVE_MAX_CALLS_PER_HOUR = int(os.getenv('SPECULATIVE_MAX_CALLS_PER_HOUR', '30'))
+    SPECULATIVE_MAX_TOKENS_PER_HOUR = int(os.getenv('SPECULATIVE_MAX_TOKENS_PER_HOUR', '60000'))
+    SPECULATIVE_MAX_QUEUE = 4             # 시작 전 대기 가능한 추측 작업 수
+    SPECULATIVE_WAIT_SECONDS = 60.0       # 사용자가 요청했을 때 진행 중인 추측 작업을 기다릴 최대 시간
+    
+    # 백엔드 호출 스케줄러 설정 (scheduler.py)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
+    SCHEDULER_MAX_CONCURRENT = int(os.getenv('SCHEDULER_MAX_CONCURRENT', '8'))   # 동시 백엔드 호출 수
+    SCHEDULER_WEIGHTS = {                 # 우선순위 클래스별 가중 공정 큐 몫
+        "quick_fix": 8.0,
+        "review": 4.0,
+        "speculative": 2.0,
+        "batch": 1.0
+    }
+    SCHEDULER_AGING_SECONDS = 10.0        # 대기 시간이 길수록 순서를 앞당기는 정도
+    SCHEDULER_BATCH_PAUSE_LOAD = 2        # 대화형 요청(진행+대기)이 이 수 이상이면 배치 시작 보류
+    SCHEDULER_MAX_PAUSE_SECONDS = 120.0   # 배치 최대 보류 시간 (기아 방지)
+
+    # 리뷰 요청 수용 제어 설정 (admission.py, 프로세스 단위)
+    ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', '32'))        # 넘으면 바로 거절
+    ADMISSION_DEADLINE_SECONDS = float(os.getenv('ADMISSION_DEADLINE_SECONDS', '60'))   # 예상 대기+처리 시간 한도
+    ADMISSION_DEFAULT_SERVICE_SECONDS = {   # 관측 전 리뷰 유형별 예상 처리 시간 (초)
+        "comprehensive": 15.0,
+        "test_cases": 10.0
+    }
+    ADMISSION_FIXED_LATENCY_RATIO = 0.2       # 기본 처리 시간 중 비용(카테고리 수)과 무관한 고정 지연 비율
+    ADMISSION_SERVICE_HALF_LIFE_SECONDS = 300.0   # 관측이 없으면 학습한 처리 시간이 기본값으로 돌아가는 반감기
+    ADMISSION_DEGRADED_CATEGORIES = ["bugs"]  # 과부하 시 종합 리뷰에서 남길 카테고리
+    ADMISSION_DEGRADED_COST_RATIO = 0.5       # 가벼운 모델(fast 티어) 처리 시간 비율 추정
+
+    # Diff 리뷰 설정 (diff_review.py)
+    DIFF_REVIEW_BATCH_CHARS = 6000        # 요청 하나에 담을 최대 diff 글자 수
+    DIFF_REVIEW_MAX_CONTEXT_LINES = 60    # 감싸는 함수/클래스 전체를 문맥으로 넣을 최대 줄 수
+    DIFF_REVIEW_CONTEXT_PADDING = 3       # 블록이 클 때 변경 앞뒤로 넣을 줄 수
+    
+    # HTTP API 서버 설정 (api_server.py)
+    API_SERVER_HOST = os.getenv('API_SERVER_HOST', "127.0.0.1")
+    API_SERVER_PORT = int(os.getenv('API_SERVER_PORT', '8080'))
+    API_WORKER_THREADS = int(os.getenv('API_WORKER_THREADS', '16'))   # 동시에 실행할 파이프라인 호출 수
+    API_MAX_BODY_BYTES = 1024 * 1024
+    API_KEEPALIVE_TIMEOUT = 30.0          # 유휴 연결 유지 시간 (초)
+    
+    # 세션 설정 (feedback_collector.SessionManager)
+    SESSION_MAX_SESSIONS = 100            # 메모리에 유지할 세션 수 (넘으면 오래된 세션부터 제거)
+    SESSION_MAX_REVIEWS = 200             # 세션당 유지할 리뷰 수 (넘으면 오래된 리뷰부터 제거)
     
     # 지원 언어
     SUPPORTED_LANGUAGES = [
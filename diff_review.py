@@ -0,0 +1,447 @@
+"""
+Diff 리뷰 모듈
+unified diff / git 커밋 범위에서 변경 hunk만 뽑아 최소한의 함수·클래스 문맥을 붙이고
+요청 크기 제한에 맞게 묶어, 프롬프트 크기가 파일이 아니라 변경량에 비례하도록 함
+"""
+import ast
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+
+# Python 외 언어에서 함수/클래스 선언으로 볼 줄
+_DECLARATION_PATTERN = re.compile(
+    r"^\s*(?!(?:if|else|for|while|switch|catch|return|do|try|with|elif|except)\b)"
+    r"(?:(?:public|private|protected|internal|static|final|abstract|async|export|default|"
+    r"virtual|override|inline|pub(?:\([^)]*\))?|unsafe|extern)\s+)*"
+    r"(?:function\b|func\b|fn\b|def\b|class\b|struct\b|interface\b|impl\b|trait\b|enum\b|module\b|"
+    r"\w[\w<>\[\],:*&\s]*\s+[\w:~]+\s*\([^;]*$)"
+)
+
+# 리뷰 결과에서 "`path:line`" 형식의 위치 참조 추출
+_FINDING_PATTERN = re.compile(r"`?([\w./\-]+):(\d+)(?:-\d+)?`?\s*[-–—:]?\s*(.*)")
+
+
+def parse_unified_diff(diff_text: str) -> List[Dict]:
+    """
+    unified diff 파싱
+
+    Args:
+        diff_text: `git diff` / `diff -u` 출력
+
+    Returns:
+        [{"path", "hunks": [{"new_start", "new_count", "added", "removed", "lines", "section"}]}]
+        (삭제된 파일과 바이너리 파일은 제외, lines는 (표시, 새 줄 번호, 내용) 목록,
+        section은 "@@ ... @@" 뒤의 감싸는 함수/클래스 줄)
+    """
+    files = []
+    current = None
+    hunk = None
+    new_line = 0
+
+    for raw in diff_text.splitlines():
+        if raw.startswith("diff --git "):
+            current, hunk = None, None
+            continue
+        if raw.startswith("+++ "):
+            path = raw[4:].split("\t")[0].strip()
+            if path == "/dev/null":
+                current = None
+            else:
+                current = {"path": path[2:] if path.startswith("b/") else path, "hunks": []}
+                files.append(current)
+            hunk = None
+            continue
+        if raw.startswith("--- ") and hunk is None:
+            continue
+
+        match = _HUNK_HEADER.match(raw)
+        if match:
+            if current is None:
+                continue
+            new_line = int(match.group(3))
+            new_count = int(match.group(4) or 1)
+            hunk = {
+                "new_start": new_line,
+                "new_count": new_count,
+                "added": [],
+                "removed": [],
+                "lines": [],
+                "section": match.group(5).strip()
+            }
+            if new_count == 0:
+                # 새 쪽 길이 0(-U0 순수 삭제)은 "new_start 줄 다음"을 뜻하므로 다음 줄에 고정
+                new_line += 1
+            current["hunks"].append(hunk)
+            continue
+
+        if hunk is None or not raw or raw.startswith("\\"):
+            continue
+        marker, text = raw[0], raw[1:]
+        if marker == "+":
+            hunk["added"].append(new_line)
+            hunk["lines"].append(("+", new_line, text))
+            new_line += 1
+        elif marker == "-":
+            # 삭제된 줄은 새 리비전에서 바로 다음 줄 위치에 고정
+            hunk["removed"].append(new_line)
+            hunk["lines"].append(("-", new_line, text))
+        elif marker == " ":
+            hunk["lines"].append((" ", new_line, text))
+            new_line += 1
+
+    return [f for f in files if f["hunks"]]
+
+
+def changed_range(hunk: Dict) -> Tuple[int, int]:
+    """hunk가 바꾼 새 리비전의 줄 범위 (순수 삭제는 삭제 위치 한 줄)"""
+    lines = hunk["added"] or hunk["removed"] or [hunk["new_start"]]
+    return min(lines), max(lines)
+
+
+def _python_enclosing(source: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """start~end를 감싸는 가장 작은 Python 함수/클래스 범위"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    best = None
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        if first <= start and node.end_lineno >= end:
+            if best is None or node.end_lineno - first < best[1] - best[0]:
+                best = (first, node.end_lineno)
+    return best
+
+
+def _declaration_line(source_lines: List[str], start: int) -> Optional[int]:
+    """Python 외 언어: start 위쪽에서 들여쓰기가 더 얕은 가장 가까운 선언 줄"""
+    if start > len(source_lines):
+        return None
+    target = source_lines[start - 1]
+    indent = len(target) - len(target.lstrip())
+    for number in range(start - 1, 0, -1):
+        line = source_lines[number - 1]
+        if not line.strip():
+            continue
+        line_indent = len(line) - len(line.lstrip())
+        if line_indent < indent:
+            if _DECLARATION_PATTERN.match(line):
+                return number
+            indent = line_indent
+    return None
+
+
+def context_ranges(source: Optional[str],
+                   hunk: Dict,
+                   language: str,
+                   max_context_lines: int = Config.DIFF_REVIEW_MAX_CONTEXT_LINES,
+                   padding: int = Config.DIFF_REVIEW_CONTEXT_PADDING) -> List[Tuple[int, int]]:
+    """
+    hunk에 붙일 새 리비전 문맥 범위
+
+    감싸는 함수/클래스 전체가 max_context_lines 이하이면 그 범위를,
+    아니면 선언 줄 + 변경 주변 padding줄만 사용합니다.
+
+    Args:
+        source: 새 리비전 파일 내용 (없으면 hunk에 포함된 변경/문맥 줄만 사용)
+        hunk: parse_unified_diff의 hunk
+        language: 프로그래밍 언어
+        max_context_lines: 감싸는 블록 전체를 포함할 최대 줄 수
+        padding: 변경 앞뒤로 붙일 줄 수
+
+    Returns:
+        (시작, 끝) 줄 범위 목록 (1부터, 양끝 포함)
+    """
+    start, end = changed_range(hunk)
+    if source is None:
+        # 파일을 읽지 않는 경우: hunk의 ' ' 문맥 줄까지 포함 (선언 줄은 section으로 표시)
+        numbers = [number for _, number, _ in hunk["lines"]] or [start]
+        return [(min(numbers), max(numbers))]
+
+    source_lines = source.splitlines()
+    total = max(len(source_lines), 1)
+    local = (max(1, start - padding), min(total, end + padding))
+
+    if language == "Python":
+        enclosing = _python_enclosing(source, start, end)
+        if enclosing is None:
+            return [local]
+        if enclosing[1] - enclosing[0] + 1 <= max_context_lines:
+            return [enclosing]
+        header = enclosing[0]
+    else:
+        header = _declaration_line(source_lines, start)
+        if header is None:
+            return [local]
+
+    if header >= local[0]:
+        return [(header, local[1])]
+    return [(header, header), local]
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def render_file_chunk(path: str,
+                      hunks: List[Dict],
+                      source: Optional[str],
+                      language: str) -> Dict:
+    """
+    한 파일의 hunk들을 줄 번호가 붙은 리뷰용 텍스트로 변환
+
+    source가 없으면 범위 밖의 감싸는 선언 대신 hunk의 section("@@ ... @@ 선언")을
+    범위 앞에 표시합니다.
+
+    Returns:
+        {"path", "language", "text", "lines": [변경된 새 줄 번호], "ranges"}
+    """
+    ranges = _merge_ranges([r for hunk in hunks for r in context_ranges(source, hunk, language)])
+    source_lines = source.splitlines() if source is not None else []
+    added = {line for hunk in hunks for line in hunk["added"]}
+    removed: Dict[int, List[str]] = {}
+    diff_lines: Dict[int, str] = {}
+    sections: Dict[int, str] = {}
+    for hunk in hunks:
+        if source is None and hunk.get("section"):
+            first = min([number for _, number, _ in hunk["lines"]] or [hunk["new_start"]])
+            sections.setdefault(first, hunk["section"])
+        for marker, number, text in hunk["lines"]:
+            if marker == "-":
+                removed.setdefault(number, []).append(text)
+            else:
+                diff_lines[number] = text
+
+    width = len(str(ranges[-1][1]))
+    out = [f"### {path}"]
+    previous_end = None
+    for start, end in ranges:
+        if previous_end is not None and start > previous_end + 1:
+            out.append(f"{'':>{width + 2}} ...")
+        range_sections = [sections[n] for n in sorted(sections) if start <= n <= end]
+        shown = {diff_lines.get(n, "").strip() for n in range(start, end + 1)}
+        for section in dict.fromkeys(range_sections):
+            if section.strip() not in shown:
+                out.append(f"@@ {section}")
+        for number in range(start, end + 1):
+            for text in removed.get(number, []):
+                out.append(f"- {'':>{width}} | {text}")
+            if number <= len(source_lines):
+                text = source_lines[number - 1]
+            elif number in diff_lines:
+                text = diff_lines[number]
+            else:
+                continue
+            marker = "+" if number in added else " "
+            out.append(f"{marker} {number:>{width}} | {text}")
+        previous_end = end
+    # 파일 끝에서 삭제된 줄
+    for number in sorted(n for n in removed if n > previous_end):
+        for text in removed[number]:
+            out.append(f"- {'':>{width}} | {text}")
+
+    return {
+        "path": path,
+        "language": language,
+        "text": "\n".join(out),
+        "lines": sorted(added | set(removed)),
+        "ranges": ranges
+    }
+
+
+def batch_chunks(chunks: List[Dict], max_chars: int = Config.DIFF_REVIEW_BATCH_CHARS) -> List[List[Dict]]:
+    """파일 청크를 요청당 최대 글자 수에 맞게 묶음 (한 청크가 더 크면 단독 요청)"""
+    batches: List[List[Dict]] = []
+    size = 0
+    for chunk in chunks:
+        length = len(chunk["text"])
+        if batches and size + length <= max_chars:
+            batches[-1].append(chunk)
+            size += length
+        else:
+            batches.append([chunk])
+            size = length
+    return batches
+
+
+def extract_findings(review_text: str, batch: List[Dict]) -> List[Dict]:
+    """
+    리뷰 결과에서 새 리비전 file:line 위치가 붙은 지적 사항 추출
+
+    Args:
+        review_text: 모델 응답
+        batch: 해당 요청에 포함된 파일 청크
+
+    Returns:
+        [{"file", "line", "message"}] (요청에 포함된 범위를 가리키는 것만)
+    """
+    by_path = {chunk["path"]: chunk for chunk in batch}
+    by_name = {os.path.basename(chunk["path"]): chunk for chunk in batch}
+    findings = []
+    for raw in review_text.splitlines():
+        line = raw.strip().lstrip("-*• ").strip()
+        match = _FINDING_PATTERN.match(line)
+        if not match:
+            continue
+        chunk = by_path.get(match.group(1)) or by_name.get(os.path.basename(match.group(1)))
+        number = int(match.group(2))
+        if chunk is None or not any(start <= number <= end for start, end in chunk["ranges"]):
+            continue
+        findings.append({"file": chunk["path"], "line": number, "message": match.group(3).strip()})
+    return findings
+
+
+def _run_git(repo_dir: str, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", repo_dir, *args],
+        capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    if result.returncode != 0:
+        raise ValueError(result.stderr.strip() or f"git {' '.join(args)} 실패")
+    return result.stdout
+
+
+def git_diff(rev_range: str, repo_dir: str = ".") -> str:
+    """git 커밋 범위의 diff (문맥은 직접 붙이므로 -U0)"""
+    return _run_git(repo_dir, "diff", "--no-color", "--no-ext-diff", "-U0", rev_range)
+
+
+def _new_revision(rev_range: Optional[str]) -> Optional[str]:
+    """diff의 새 리비전 (None이면 작업 트리)"""
+    if not rev_range:
+        return None
+    for separator in ("...", ".."):
+        if separator in rev_range:
+            return rev_range.split(separator, 1)[1] or "HEAD"
+    return None
+
+
+def _resolve_repo_path(path: str, repo_dir: str) -> Optional[str]:
+    """저장소 안의 상대 경로만 실제 경로로 변환 (절대 경로, "..", 저장소 밖을 가리키는 링크는 None)"""
+    if not path or os.path.isabs(path) or ".." in path.replace("\\", "/").split("/"):
+        return None
+    root = os.path.realpath(repo_dir)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full_path]) != root:
+        return None
+    return full_path
+
+
+def load_new_source(path: str, repo_dir: str = ".", revision: Optional[str] = None) -> Optional[str]:
+    """새 리비전의 파일 내용 (구할 수 없거나 저장소 밖 경로면 None)"""
+    full_path = _resolve_repo_path(path, repo_dir)
+    if full_path is None:
+        return None
+    try:
+        if revision:
+            return _run_git(repo_dir, "show", f"{revision}:{path}")
+        with open(full_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+
+
+def build_review_batches(diff_text: Optional[str] = None,
+                         rev_range: Optional[str] = None,
+                         repo_dir: str = ".",
+                         language: Optional[str] = None,
+                         max_chars: int = Config.DIFF_REVIEW_BATCH_CHARS,
+                         read_sources: bool = False) -> Dict:
+    """
+    diff를 리뷰 요청 묶음으로 변환
+
+    Args:
+        diff_text: unified diff 텍스트 (없으면 rev_range로 git diff 실행,
+                   read_sources가 아니면 파일을 읽지 않고 hunk의 문맥 줄과 section만으로 문맥 구성)
+        rev_range: git 커밋 범위 (예: "main..HEAD", "HEAD~3")
+        repo_dir: git 저장소 / 파일 기준 디렉터리 (rev_range나 read_sources일 때만 사용)
+        language: 모든 파일에 사용할 언어 (없으면 확장자로 추정)
+        max_chars: 요청당 최대 글자 수
+        read_sources: diff_text의 경로로 repo_dir의 파일을 읽어 문맥 구성
+                      (사용자 자신의 작업 트리를 리뷰하는 로컬 CLI 전용, API 요청에는 사용 금지)
+
+    Returns:
+        {"batches": [[청크]], "files", "hunks", "changed_lines", "prompt_chars"}
+    """
+    from batch_review import detect_language
+
+    # 외부에서 받은 diff의 경로는 신뢰할 수 없으므로 호출자가 명시한 경우에만 파일을 읽음
+    read_sources = read_sources or diff_text is None
+    if diff_text is None:
+        if not rev_range:
+            raise ValueError("diff 텍스트나 git 커밋 범위가 필요합니다.")
+        diff_text = git_diff(rev_range, repo_dir)
+
+    revision = _new_revision(rev_range)
+    file_diffs = parse_unified_diff(diff_text)
+    chunks = []
+    for file_diff in file_diffs:
+        file_language = language or detect_language(file_diff["path"])
+        source = load_new_source(file_diff["path"], repo_dir, revision) if read_sources else None
+        chunks.append(render_file_chunk(file_diff["path"], file_diff["hunks"], source, file_language))
+
+    batches = batch_chunks(chunks, max_chars)
+    return {
+        "batches": batches,
+        "files": len(chunks),
+        "hunks": sum(len(f["hunks"]) for f in file_diffs),
+        "changed_lines": sum(len(chunk["lines"]) for chunk in chunks),
+        "prompt_chars": sum(len(chunk["text"]) for chunk in chunks)
+    }
+
+
+# (diff, 기대 결과: [(added, removed)] hunk 순) — git diff -U0의 순수 삽입/삭제 포함
+CHECK_CASES = [
+    ("--- a/m.py\n+++ b/m.py\n@@ -7,0 +8,2 @@ def f():\n+    a()\n+    b()\n", [([8, 9], [])]),
+    ("--- a/m.py\n+++ b/m.py\n@@ -8 +7,0 @@ def f():\n-    a()\n", [([], [8])]),
+    ("--- a/m.py\n+++ b/m.py\n@@ -8,2 +7,0 @@\n-    a()\n-    b()\n", [([], [8, 8])]),
+    ("--- a/m.py\n+++ b/m.py\n@@ -3 +3 @@ def f():\n-    a()\n+    b()\n", [([3], [3])]),
+    ("--- a/m.py\n+++ b/m.py\n@@ -1,3 +1,3 @@\n x = 1\n-y = 2\n+y = 3\n z = 4\n", [([2], [2])]),
+]
+
+
+def check_parser() -> List[str]:
+    """CHECK_CASES의 파싱 결과(변경 줄 번호)가 기대와 다른 항목 목록"""
+    failures = []
+    for index, (diff_text, expected) in enumerate(CHECK_CASES):
+        files = parse_unified_diff(diff_text)
+        actual = [(hunk["added"], hunk["removed"]) for f in files for hunk in f["hunks"]]
+        if actual != expected:
+            failures.append(f"#{index} 결과 {actual} (기대: {expected})")
+    return failures
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="diff 파싱 점검")
+    parser.add_argument("command", choices=["check"], help="check: -U0 삽입/삭제 등 줄 번호 파싱 점검")
+    parser.parse_args()
+
+    failures = check_parser()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ 점검 {len(CHECK_CASES)}건 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+리뷰 설정 평가 하네스
+고정된 코드 스니펫 묶음을 모델 × temperature × max_tokens × 프롬프트 변형 조합으로 실행해
+지연 시간, 토큰 수, 루브릭 기반 품질 점수를 측정하고 (지연, 품질) 파레토 최적 설정을 출력
+
+사용법:
+    # 실제 API로 한 번 실행하며 기록
+    python eval_harness.py --record eval_cassette.jsonl.gz
+    # 이후에는 네트워크 없이 기록을 원래 속도로 재생해 같은 조합 비교
+    python eval_harness.py --replay eval_cassette.jsonl.gz --min-quality 70
+    # 로컬 추론 서버 (vLLM, llama.cpp, Ollama 등)
+    python eval_harness.py --backend local --models qwen2.5-coder
+"""
+import argparse
+import itertools
+import json
+import re
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+from llm_backend import BACKEND_NAMES
+
+TASKS = ("review", "test_cases", "quick_fix")
+
+# 현재 CodeReviewHelper 기본 temperature (리뷰 0.7, 빠른 수정 0.3, 테스트 케이스 0.5)
+DEFAULT_TEMPERATURES = "0.3,0.5,0.7"
+DEFAULT_MAX_TOKENS = "800,1200,2000"
+
+# 프롬프트 변형: 다룰 카테고리(종합 리뷰만 적용)와 코드 압축 여부
+PROMPT_VARIANTS = {
+    "full": {"categories": None, "compress": False},
+    "focused": {"categories": ["bugs", "performance", "refactoring"], "compress": False},
+    "compressed": {"categories": None, "compress": True}
+}
+
+# 루브릭 항목별 가중치 (합 1.0, 점수는 0~100)
+RUBRIC_WEIGHTS = {
+    "coverage": 0.5,       # 스니펫에 심어 둔 문제를 짚었는지
+    "structure": 0.2,      # 작업별 형식 (요청한 카테고리 제목, 테스트 함수, 수정 코드)
+    "code_example": 0.15,  # 코드 블록 예시 포함
+    "complete": 0.15       # 토큰 한도에 잘리지 않고 한국어로 응답
+}
+
+# 출력이 max_tokens의 이 비율 이상이면 잘린 것으로 봄
+TRUNCATION_RATIO = 0.95
+
+_HANGUL = re.compile(r"[가-힣]")
+
+# 기본 평가 코드 묶음 (expected: 응답에 나와야 할 문제, 각 항목은 대체 표현 목록)
+EVAL_CORPUS = [
+    {
+        "id": "py-average",
+        "language": "Python",
+        "issue": "빈 목록에서 ZeroDivisionError 발생",
+        "code": '''def average(values):
+    total = 0
+    for i in range(len(values)):
+        total = total + values[i]
+    return total / len(values)
+''',
+        "expected": [["ZeroDivision", "0으로 나누", "빈 리스트", "빈 목록", "empty"],
+                     ["sum(", "enumerate", "range(len"]]
+    },
+    {
+        "id": "py-find-duplicates",
+        "language": "Python",
+        "issue": "큰 입력에서 너무 느림",
+        "code": '''def find_duplicates(items):
+    duplicates = []
+    for i in range(len(items)):
+        for j in range(len(items)):
+            if i != j and items[i] == items[j] and items[i] not in duplicates:
+                duplicates.append(items[i])
+    return duplicates
+''',
+        "expected": [["O(n^2)", "O(n²)", "O(n**2)", "이중 반복", "중첩"],
+                     ["set", "Counter", "집합", "딕셔너리"]]
+    },
+    {
+        "id": "py-read-config",
+        "language": "Python",
+        "issue": "파일이 닫히지 않고 잘못된 JSON에서 예외 처리 누락",
+        "code": '''import json
+
+def read_config(path, cache={}):
+    if path in cache:
+        return cache[path]
+    f = open(path)
+    data = json.loads(f.read())
+    cache[path] = data
+    return data
+''',
+        "expected": [["with open", "with 문", "close", "닫"],
+                     ["JSONDecodeError", "예외", "try"],
+                     ["기본 인자", "기본값", "mutable", "가변"]]
+    },
+    {
+        "id": "js-fetch-users",
+        "language": "JavaScript",
+        "issue": "요청 실패 시 처리되지 않은 예외",
+        "code": '''async function fetchUsers(ids) {
+  var users = [];
+  for (var i = 0; i < ids.length; i++) {
+    const res = await fetch("/api/users/" + ids[i]);
+    users.push(await res.json());
+  }
+  return users;
+}
+''',
+        "expected": [["Promise.all", "병렬", "동시"],
+                     ["try", "catch", "res.ok", "오류 처리", "에러 처리"],
+                     ["let", "const", "var"]]
+    },
+    {
+        "id": "java-parse-port",
+        "language": "Java",
+        "issue": "잘못된 입력에서 NumberFormatException",
+        "code": '''public class PortParser {
+    public static int parsePort(String value) {
+        int port = Integer.parseInt(value.trim());
+        if (port > 65535) {
+            return -1;
+        }
+        return port;
+    }
+}
+''',
+        "expected": [["NumberFormatException", "예외"],
+                     ["null", "NullPointer"],
+                     ["음수", "0 이하", "< 0", "<= 0", "범위"]]
+    }
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """백분위수 (최근접 순위)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def load_corpus(path: Optional[str]) -> List[Dict]:
+    """평가 코드 묶음 로드 (없으면 기본 묶음, 파일은 EVAL_CORPUS와 같은 형식의 JSON 배열)"""
+    if not path:
+        return EVAL_CORPUS
+    with open(path, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    for item in corpus:
+        missing = {"id", "language", "code"} - set(item)
+        if missing:
+            raise ValueError(f"평가 항목에 필수 필드가 없습니다: {sorted(missing)} ({item.get('id', '?')})")
+    return corpus
+
+
+def score_response(text: str, item: Dict, task: str, categories: List[str],
+                   completion_tokens: int, max_tokens: int) -> Dict:
+    """
+    루브릭으로 응답 품질 채점
+
+    Args:
+        text: 모델 응답
+        item: 평가 항목 (expected 목록 포함)
+        task: TASKS 중 하나
+        categories: 종합 리뷰에서 요청한 카테고리 ID 목록
+        completion_tokens: 생성 토큰 수
+        max_tokens: 요청한 최대 생성 토큰 수
+
+    Returns:
+        {"score": 0~100, "criteria": 항목별 0~1 점수}
+    """
+    lowered = text.lower()
+    expected = item.get("expected") or []
+    if expected:
+        found = sum(1 for group in expected if any(term.lower() in lowered for term in group))
+        coverage = found / len(expected)
+    else:
+        coverage = 1.0
+
+    if task == "review":
+        headings = [Config.REVIEW_CATEGORY_IDS[category_id] for category_id in categories]
+        structure = sum(1 for heading in headings if heading in text) / len(headings)
+    elif task == "test_cases":
+        structure = 1.0 if re.search(r"def test|assert|@Test|test\(|it\(", text) else 0.0
+    else:
+        structure = 1.0 if "```" in text and "수정" in text else 0.0
+
+    truncated = completion_tokens >= max_tokens * TRUNCATION_RATIO
+    criteria = {
+        "coverage": coverage,
+        "structure": structure,
+        "code_example": 1.0 if "```" in text else 0.0,
+        "complete": 1.0 if not truncated and _HANGUL.search(text) else 0.0
+    }
+    score = sum(RUBRIC_WEIGHTS[name] * value for name, value in criteria.items()) * 100
+    return {"score": round(score, 1), "criteria": {name: round(value, 2) for name, value in criteria.items()}}
+
+
+def run_case(helper, item: Dict, task: str, model: str, temperature: float,
+             max_tokens: int, variant: str) -> Dict:
+    """설정 하나로 평가 항목 하나 실행"""
+    from code_reviewer import ReviewError, resolve_categories
+    from prompt_compression import compress_code
+
+    options = PROMPT_VARIANTS[variant]
+    code = item["code"]
+    if options["compress"]:
+        code = compress_code(code, item["language"])["text"]
+    categories = resolve_categories(options["categories"])
+
+    before = helper.backend.get_usage()
+    start = time.perf_counter()
+    if task == "review":
+        text = helper.analyze_code(code, item["language"], model=model, temperature=temperature,
+                                   max_tokens=max_tokens, categories=categories,
+                                   compressed=options["compress"])
+    elif task == "test_cases":
+        text = helper.generate_test_cases(code, item["language"], model=model, temperature=temperature,
+                                          max_tokens=max_tokens, compressed=options["compress"])
+    else:
+        text = helper.get_quick_fix(code, item.get("issue", "주요 문제"), item["language"], model=model,
+                                    temperature=temperature, max_tokens=max_tokens)
+    latency = time.perf_counter() - start
+    after = helper.backend.get_usage()
+
+    prompt_tokens = after["prompt_tokens"] - before["prompt_tokens"]
+    completion_tokens = after["completion_tokens"] - before["completion_tokens"]
+    case = {
+        "item": item["id"],
+        "latency_s": round(latency, 3),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens
+    }
+    if isinstance(text, ReviewError):
+        case.update({"error": str(text), "score": 0.0})
+        return case
+    case.update(score_response(text, item, task, categories, completion_tokens, max_tokens))
+    return case
+
+
+def summarize(setting: Dict, cases: List[Dict]) -> Dict:
+    """설정별 지연/토큰/품질 요약"""
+    latencies = [case["latency_s"] for case in cases]
+    scores = [case["score"] for case in cases]
+    return {
+        **setting,
+        "calls": len(cases),
+        "errors": sum(1 for case in cases if "error" in case),
+        "latency_p50_s": round(statistics.median(latencies), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+        "prompt_tokens": round(statistics.mean(case["prompt_tokens"] for case in cases), 1),
+        "completion_tokens": round(statistics.mean(case["completion_tokens"] for case in cases), 1),
+        "quality": round(statistics.mean(scores), 1),
+        "quality_min": round(min(scores), 1),
+        "cases": cases
+    }
+
+
+def pareto_frontier(results: List[Dict]) -> List[Dict]:
+    """
+    (지연 p50 최소, 품질 최대) 기준으로 다른 설정에 지배되지 않는 설정 목록 (빠른 순)
+    지연과 품질이 같으면 생성 토큰이 적은 설정을 남김
+    """
+    ordered = sorted(results, key=lambda r: (r["latency_p50_s"], -r["quality"], r["completion_tokens"]))
+    frontier = []
+    best_quality = None
+    for result in ordered:
+        if best_quality is None or result["quality"] > best_quality:
+            frontier.append(result)
+            best_quality = result["quality"]
+    return frontier
+
+
+def create_helper(args):
+    """인자에 맞는 백엔드로 CodeReviewHelper 생성 (기록/재생/가짜/LLM_BACKEND)"""
+    if args.record or args.replay:
+        Config.CASSETTE_MODE = "record" if args.record else "replay"
+        Config.CASSETTE_FILE = args.record or args.replay
+        Config.CASSETTE_SPEED = args.speed
+    if args.backend:
+        Config.LLM_BACKEND = args.backend
+
+    from code_reviewer import CodeReviewHelper
+    if args.fake and not args.replay:
+        from fake_backend import FakeOpenAIClient
+        return CodeReviewHelper(client=FakeOpenAIClient())
+    return CodeReviewHelper()
+
+
+def _parse_list(value: str, cast=str) -> list:
+    return [cast(part.strip()) for part in value.split(",") if part.strip()]
+
+
+def main():
+    """메인 함수"""
+    default_models = ",".join(dict.fromkeys(tier["model"] for tier in Config.MODEL_TIERS.values()))
+    parser = argparse.ArgumentParser(description="리뷰 설정 지연/품질 평가 하네스")
+    parser.add_argument("--task", choices=TASKS, default="review", help="평가할 작업")
+    parser.add_argument("--models", default=default_models, help="모델 목록 (쉼표 구분)")
+    parser.add_argument("--temperatures", default=DEFAULT_TEMPERATURES, help="temperature 목록 (쉼표 구분)")
+    parser.add_argument("--max-tokens", default=DEFAULT_MAX_TOKENS, help="max_tokens 목록 (쉼표 구분)")
+    parser.add_argument("--variants", default=",".join(PROMPT_VARIANTS),
+                        help=f"프롬프트 변형 목록 ({', '.join(PROMPT_VARIANTS)})")
+    parser.add_argument("--corpus", help="평가 코드 묶음 JSON 파일 (없으면 기본 묶음)")
+    parser.add_argument("--repeat", type=int, default=1, help="항목별 반복 횟수 (temperature 편차 반영)")
+    parser.add_argument("--min-quality", type=float, default=70.0, help="허용 최소 평균 품질 점수 (0~100)")
+    parser.add_argument("--record", metavar="CASSETTE", help="API 호출을 기록할 파일 (cassette.py)")
+    parser.add_argument("--replay", metavar="CASSETTE", help="네트워크 없이 재생할 기록 파일")
+    parser.add_argument("--speed", default="original",
+                        help="재생 속도 (지연 측정을 위해 기본은 기록된 원래 속도)")
+    parser.add_argument("--backend", choices=BACKEND_NAMES,
+                        help="LLM 백엔드 (llm_backend.py, 없으면 LLM_BACKEND 설정)")
+    parser.add_argument("--fake", action="store_true", help="네트워크 없는 가짜 백엔드 (하네스 동작 확인용)")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    variants = _parse_list(args.variants)
+    unknown = [variant for variant in variants if variant not in PROMPT_VARIANTS]
+    if unknown:
+        parser.error(f"알 수 없는 프롬프트 변형: {', '.join(unknown)}")
+
+    corpus = load_corpus(args.corpus)
+    grid = list(itertools.product(
+        _parse_list(args.models),
+        _parse_list(args.temperatures, float),
+        _parse_list(args.max_tokens, int),
+        variants
+    ))
+    helper = create_helper(args)
+
+    print("=" * 50)
+    print("🧪 리뷰 설정 평가 하네스")
+    print("=" * 50)
+    print(f"• 작업: {args.task}, 백엔드: {helper.backend.get_usage()['backend']}, "
+          f"설정 {len(grid)}개 × 항목 {len(corpus)}개 × {args.repeat}회 = {len(grid) * len(corpus) * args.repeat}회 호출")
+
+    results = []
+    for model, temperature, max_tokens, variant in grid:
+        setting = {"model": model, "temperature": temperature, "max_tokens": max_tokens, "variant": variant}
+        cases = [run_case(helper, item, args.task, model, temperature, max_tokens, variant)
+                 for item in corpus for _ in range(args.repeat)]
+        result = summarize(setting, cases)
+        results.append(result)
+        print(f"  · {model} t={temperature} max={max_tokens} {variant}: "
+              f"p50 {result['latency_p50_s']:.2f}s, 출력 {result['completion_tokens']:.0f}토큰, "
+              f"품질 {result['quality']:.1f}" + (f" (오류 {result['errors']})" if result["errors"] else ""))
+
+    frontier = pareto_frontier(results)
+    print("\n⭐ 파레토 최적 설정 (빠른 순)")
+    for result in frontier:
+        print(f"• {result['model']} t={result['temperature']} max={result['max_tokens']} {result['variant']}: "
+              f"p50 {result['latency_p50_s']:.2f}s / p95 {result['latency_p95_s']:.2f}s, "
+              f"입력 {result['prompt_tokens']:.0f} + 출력 {result['completion_tokens']:.0f}토큰, "
+              f"품질 {result['quality']:.1f} (최저 {result['quality_min']:.1f})")
+
+    acceptable = [result for result in frontier if result["quality"] >= args.min_quality and not result["errors"]]
+    recommended = acceptable[0] if acceptable else None
+
+    report = {
+        "task": args.task,
+        "backend": helper.backend.get_usage()["backend"],
+        "corpus": [item["id"] for item in corpus],
+        "rubric_weights": RUBRIC_WEIGHTS,
+        "min_quality": args.min_quality,
+        "results": results,
+        "frontier": [{key: value for key, value in result.items() if key != "cases"} for result in frontier],
+        "recommended": {key: value for key, value in recommended.items() if key != "cases"} if recommended else None
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if recommended is None:
+        print(f"❌ 품질 {args.min_quality:.0f}점 이상인 설정이 없습니다.")
+        sys.exit(1)
+
+    print(f"✅ 추천: {recommended['model']} t={recommended['temperature']} "
+          f"max_tokens={recommended['max_tokens']} {recommended['variant']} "
+          f"(p50 {recommended['latency_p50_s']:.2f}s, 품질 {recommended['quality']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+가짜 OpenAI 백엔드 모듈
+네트워크 없이 파이프라인/API 서버를 실행하기 위한 결정적 chat.completions 대체 클라이언트
+"""
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+
+from config import Config
+
+
+class _FakeStream:
+    """스트리밍 응답 (openai Stream처럼 반복 및 close 지원)"""
+
+    def __init__(self, chunks: Iterator):
+        self._chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self.closed:
+                break
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def render_fake_review(model: str, messages: List[Dict], max_tokens: int) -> str:
+    """요청 내용으로부터 결정적인 리뷰 텍스트 생성 (llm_backend.DeterministicBackend와 공유)"""
+    prompt = "\n".join(message["content"] for message in messages)
+    digest = hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+    # 시스템 프롬프트에 있는 카테고리만 응답 (없으면 전체)
+    categories = [category for category in Config.REVIEW_CATEGORIES
+                  if category in messages[0]["content"]] or Config.REVIEW_CATEGORIES
+    sections = [
+        f"**{category}**\n- 가짜 백엔드 응답 ({digest[i * 8:(i + 1) * 8]})"
+        for i, category in enumerate(categories)
+    ]
+    text = "\n\n".join(sections)
+    # 한 토큰을 약 4자로 보고 max_tokens에 맞춰 자름
+    return text[:max_tokens * 4]
+
+
+class _FakeCompletions:
+    """client.chat.completions 대체"""
+
+    def __init__(self, latency: float, tokens_per_second: float):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.call_count = 0
+
+    def create(self,
+               model: str,
+               messages: List[Dict],
+               temperature: float = 1.0,
+               max_tokens: int = 1000,
+               stream: bool = False,
+               **kwargs):
+        self.call_count += 1
+        text = render_fake_review(model, messages, max_tokens)
+        prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+        completion_tokens = max(len(text) // 4, 1)
+        time.sleep(self.latency)
+
+        if not stream:
+            time.sleep(completion_tokens / self.tokens_per_second)
+            return SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(
+                    index=0,
+                    message=SimpleNamespace(role="assistant", content=text),
+                    finish_reason="stop"
+                )],
+                usage=SimpleNamespace(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens
+                )
+            )
+
+        def chunks():
+            # 약 4토큰(16자) 단위로 나누어 전송
+            for start in range(0, len(text), 16):
+                time.sleep(4 / self.tokens_per_second)
+                yield SimpleNamespace(
+                    model=model,
+                    choices=[SimpleNamespace(
+                        index=0,
+                        delta=SimpleNamespace(content=text[start:start + 16]),
+                        finish_reason=None
+                    )]
+                )
+            yield SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=None), finish_reason="stop")]
+            )
+
+        return _FakeStream(chunks())
+
+
+class FakeOpenAIClient:
+    """openai.OpenAI와 같은 모양의 가짜 클라이언트"""
+
+    def __init__(self, latency: float = 0.05, tokens_per_second: float = 2000.0):
+        """
+        Args:
+            latency: 첫 응답까지의 지연 (초)
+            tokens_per_second: 생성 속도 (토큰/초)
+        """
+        self.chat = SimpleNamespace(completions=_FakeCompletions(latency, tokens_per_second))
@@ -4,39 +4,90 @@
 """
 import json
 import os
-from datetime import datetime
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import pandas as pd
+
+from config import Config
+from feedback_columns import ColumnStore
 
 
 class FeedbackCollector:
     """사용자 피드백 수집 및 관리 클래스"""
     
-    def __init__(self, feedback_file: str = "feedback_data.json"):
+    def __init__(self, 
+                 feedback_file: str = "feedback_data.json",
+                 rollup_file: str = "feedback_rollup.db",
+                 column_dir: str = Config.COLUMN_STORE_DIR):
         """
         피드백 수집기 초기화
         
         Args:
-            feedback_file: 피드백 데이터를 저장할 파일 경로
+            feedback_file: 피드백 원시 데이터를 저장할 파일 경로 (JSON Lines)
+            rollup_file: 시간 버킷 집계를 저장할 SQLite 파일 경로
+            column_dir: 정리 시 원시 기록을 내보낼 컬럼형(Arrow) 저장소 디렉터리
         """
         self.feedback_file = feedback_file
-        self.feedback_data = self._load_feedback_data()
+        self._feedback_data = None
+        self.rollup = FeedbackRollup(rollup_file)
+        self.columns = ColumnStore(column_dir)
+        
+        # 집계가 비어 있으면 기존 원시 데이터로 한 번 채움
+        if self.rollup.is_empty() and os.path.exists(self.feedback_file):
+            self.rollup.add_entries(self.feedback_data)
+    
+    @property
+    def feedback_data(self) -> List[Dict]:
+        """원시 피드백 데이터 (통계는 집계를 사용하므로 필요할 때만 로드)"""
+        if self._feedback_data is None:
+            self._feedback_data = self._load_feedback_data()
+        return self._feedback_data
     
     def _load_feedback_data(self) -> List[Dict]:
-        """저장된 피드백 데이터 로드"""
+        """저장된 피드백 데이터 로드 (JSON Lines 및 기존 JSON 배열 형식 지원)"""
         if os.path.exists(self.feedback_file):
             try:
                 with open(self.feedback_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    if self._is_legacy_file():
+                        return json.load(f)
+                    return [json.loads(line) for line in f if line.strip()]
             except (json.JSONDecodeError, FileNotFoundError):
                 return []
         return []
     
+    def _is_legacy_file(self) -> bool:
+        """JSON 배열 형식의 기존 피드백 파일인지 확인"""
+        try:
+            with open(self.feedback_file, 'r', encoding='utf-8') as f:
+                return f.read(1) == '['
+        except FileNotFoundError:
+            return False
+    
     def _save_feedback_data(self):
-        """피드백 데이터 저장"""
+        """피드백 데이터 전체 저장 (JSON Lines)"""
         try:
             with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump(self.feedback_data, f, ensure_ascii=False, indent=2)
+                for entry in self.feedback_data:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"피드백 저장 중 오류: {e}")
+    
+    def _store_feedback_entry(self, feedback_entry: Dict):
+        """피드백 한 건 저장 (파일 전체를 다시 쓰지 않고 추가)"""
+        if self._is_legacy_file():
+            # 기존 JSON 배열 파일은 한 번만 JSON Lines로 변환
+            self.feedback_data.append(feedback_entry)
+            self._save_feedback_data()
+            return
+        
+        if self._feedback_data is not None:
+            self._feedback_data.append(feedback_entry)
+        
+        try:
+            with open(self.feedback_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(feedback_entry, ensure_ascii=False) + "\n")
         except Exception as e:
             print(f"피드백 저장 중 오류: {e}")
     
@@ -46,7 +97,9 @@ class FeedbackCollector:
                         language: str,
                         rating: int, 
                         helpful: bool, 
-                        suggestions: str = "") -> Dict:
+                        suggestions: str = "",
+                        review_type: str = "comprehensive",
+                        archive_id: Optional[int] = None) -> Dict:
         """
         사용자 피드백 수집
         
@@ -57,6 +110,8 @@ class FeedbackCollector:
             rating: 평점 (1-5)
             helpful: 도움됨 여부
             suggestions: 개선 제안사항
+            review_type: 리뷰 유형
+            archive_id: 피드백 대상 리뷰의 아카이브 ID
             
         Returns:
             수집된 피드백 데이터
@@ -64,6 +119,7 @@ class FeedbackCollector:
         feedback_entry = {
             "timestamp": datetime.now().isoformat(),
             "language": language,
+            "review_type": review_type,
             "code_length": len(user_code),
             "review_length": len(review_result),
             "rating": rating,
@@ -71,9 +127,11 @@ class FeedbackCollector:
             "suggestions": suggestions,
             "session_id": self._generate_session_id()
         }
+        if archive_id is not None:
+            feedback_entry["archive_id"] = archive_id
         
-        self.feedback_data.append(feedback_entry)
-        self._save_feedback_data()
+        self._store_feedback_entry(feedback_entry)
+        self.rollup.add_entries([feedback_entry])
         
         return feedback_entry
     
@@ -82,8 +140,11 @@ class FeedbackCollector:
         return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
     def get_feedback_statistics(self) -> Dict:
-        """피드백 통계 정보 반환"""
-        if not self.feedback_data:
+        """피드백 통계 정보 반환 (일 단위 집계 기반)"""
+        totals = self.rollup.get_totals()
+        total_reviews = totals["count"]
+        
+        if not total_reviews:
             return {
                 "total_reviews": 0,
                 "average_rating": 0,
@@ -92,27 +153,111 @@ class FeedbackCollector:
                 "recent_suggestions": []
             }
         
-        df = pd.DataFrame(self.feedback_data)
-        
         # 기본 통계
-        total_reviews = len(df)
-        avg_rating = df['rating'].mean()
-        helpful_percentage = (df['helpful'].sum() / total_reviews) * 100
-        
-        # 언어별 분포
-        language_dist = df['language'].value_counts().to_dict()
+        avg_rating = totals["rating_sum"] / total_reviews
+        helpful_percentage = (totals["helpful_count"] / total_reviews) * 100
         
-        # 최근 제안사항 (빈 문자열이 아닌 것만)
-        recent_suggestions = df[df['suggestions'] != '']['suggestions'].tail(5).tolist()
+        # 최근 제안사항 (오래된 순서로 최대 5개)
+        recent = self.rollup.get_suggestions(limit=5)
+        recent_suggestions = [item["suggestion"] for item in reversed(recent)]
         
         return {
             "total_reviews": total_reviews,
             "average_rating": round(avg_rating, 2),
             "helpful_percentage": round(helpful_percentage, 2),
-            "language_distribution": language_dist,
+            "language_distribution": self.rollup.get_language_distribution(),
             "recent_suggestions": recent_suggestions
         }
     
+    def get_review_feedback(self, archive_ids: List[int]) -> Dict[int, Dict]:
+        """리뷰(아카이브 ID)별 피드백 요약"""
+        return self.rollup.get_review_feedback(archive_ids)
+    
+    def get_suggestions_page(self, page: int = 1, page_size: int = Config.SUGGESTIONS_PAGE_SIZE) -> Dict:
+        """
+        개선 제안사항 페이지 조회 (최신순)
+        
+        Args:
+            page: 페이지 번호 (1부터 시작)
+            page_size: 페이지당 항목 수
+            
+        Returns:
+            제안사항 목록과 페이지 정보
+        """
+        page = max(page, 1)
+        total = self.rollup.count_suggestions()
+        return {
+            "items": self.rollup.get_suggestions(limit=page_size, offset=(page - 1) * page_size),
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": max((total + page_size - 1) // page_size, 1)
+        }
+    
+    def get_feedback_timeseries(self, granularity: str = "daily", periods: int = 30) -> List[Dict]:
+        """
+        시간 버킷별 피드백 집계 반환
+        
+        Args:
+            granularity: 집계 단위 ("hourly", "daily")
+            periods: 조회할 최근 버킷 수
+            
+        Returns:
+            (버킷, 언어, 리뷰 유형)별 집계 목록
+        """
+        return self.rollup.get_timeseries(granularity, periods)
+    
+    def compact_feedback_data(self, retention_days: Optional[int] = None) -> Dict:
+        """
+        보존 기간이 지난 원시 피드백과 시간 단위 집계 정리
+        
+        원시 데이터는 이미 집계에 반영되어 있고, 지우기 전에 컬럼형 저장소로
+        내보내므로 통계와 행 단위 분석 데이터는 그대로 유지됩니다.
+        
+        Args:
+            retention_days: 원시 피드백 보존 기간 (없으면 설정값 사용)
+            
+        Returns:
+            정리 결과
+        """
+        if retention_days is None:
+            retention_days = Config.FEEDBACK_RAW_RETENTION_DAYS
+        
+        before = len(self.feedback_data)
+        exported = {}
+        try:
+            exported = self.columns.export_and_compact(self.feedback_data)
+        except Exception as e:
+            print(f"컬럼형 내보내기 중 오류: {e}")
+        
+        # 내보내기에 실패하면 원시 데이터를 지우지 않음
+        if exported:
+            cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+            self._feedback_data = [
+                entry for entry in self.feedback_data if entry["timestamp"] >= cutoff
+            ]
+        if len(self._feedback_data) != before or self._is_legacy_file():
+            self._save_feedback_data()
+        
+        hourly_cutoff = datetime.now() - timedelta(days=Config.ROLLUP_HOURLY_RETENTION_DAYS)
+        pruned = self.rollup.prune("hourly", FeedbackRollup.bucket_key("hourly", hourly_cutoff.isoformat()))
+        
+        return {
+            "removed_records": before - len(self._feedback_data),
+            "remaining_records": len(self._feedback_data),
+            "pruned_hourly_buckets": pruned,
+            "exported_feedback": exported.get("feedback_exported", 0),
+            "exported_usage": exported.get("usage_exported", 0)
+        }
+    
+    def get_feedback_breakdown(self) -> Dict:
+        """언어/리뷰 유형별 평점 분석 (내보낸 컬럼 파일 기반)"""
+        return self.columns.feedback_breakdown()
+    
+    def get_usage_summary(self) -> List[Dict]:
+        """모델 티어별 사용량/지연 분석 (내보낸 컬럼 파일 기반)"""
+        return self.columns.usage_summary()
+    
     def get_improvement_insights(self) -> List[str]:
         """개선 인사이트 제공"""
         stats = self.get_feedback_statistics()
@@ -140,28 +285,250 @@ class FeedbackCollector:
         return insights
 
 
+class FeedbackRollup:
+    """시간 버킷(시간/일)별 피드백 집계 관리 클래스"""
+    
+    GRANULARITIES = ("hourly", "daily")
+    
+    def __init__(self, rollup_file: str = "feedback_rollup.db"):
+        """
+        집계 저장소 초기화
+        
+        Args:
+            rollup_file: 집계를 저장할 SQLite 파일 경로
+        """
+        self.rollup_file = rollup_file
+        self._lock = threading.Lock()
+        # Streamlit은 재실행마다 다른 스레드를 사용하므로 스레드 검사 비활성화 후 락으로 보호
+        self._conn = sqlite3.connect(rollup_file, check_same_thread=False)
+        with self._lock, self._conn:
+            if rollup_file != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    granularity TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    review_type TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    rating_sum INTEGER NOT NULL DEFAULT 0,
+                    helpful_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket, language, review_type)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS review_feedback (
+                    archive_id INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    rating_sum INTEGER NOT NULL DEFAULT 0,
+                    helpful_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS suggestions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    review_type TEXT NOT NULL,
+                    rating INTEGER NOT NULL,
+                    suggestion TEXT NOT NULL
+                )
+            """)
+    
+    @staticmethod
+    def bucket_key(granularity: str, timestamp: str) -> str:
+        """ISO 타임스탬프를 버킷 키로 변환"""
+        if granularity == "hourly":
+            return f"{timestamp[:13]}:00"
+        return timestamp[:10]
+    
+    def is_empty(self) -> bool:
+        """집계 데이터가 없는지 확인"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone()
+        return row is None
+    
+    def add_entries(self, entries: List[Dict]):
+        """피드백 항목들을 시간/일 단위 집계에 반영"""
+        rollup_rows = []
+        review_rows = []
+        suggestion_rows = []
+        for entry in entries:
+            language = entry.get("language", "기타")
+            review_type = entry.get("review_type", "comprehensive")
+            helpful = 1 if entry.get("helpful") else 0
+            for granularity in self.GRANULARITIES:
+                rollup_rows.append((
+                    granularity,
+                    self.bucket_key(granularity, entry["timestamp"]),
+                    language,
+                    review_type,
+                    entry["rating"],
+                    helpful
+                ))
+            if entry.get("archive_id") is not None:
+                review_rows.append((entry["archive_id"], entry["rating"], helpful))
+            if entry.get("suggestions"):
+                suggestion_rows.append((
+                    entry["timestamp"], language, review_type, entry["rating"], entry["suggestions"]
+                ))
+        
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO rollups VALUES (?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (granularity, bucket, language, review_type) DO UPDATE SET
+                    count = count + 1,
+                    rating_sum = rating_sum + excluded.rating_sum,
+                    helpful_count = helpful_count + excluded.helpful_count
+            """, rollup_rows)
+            self._conn.executemany("""
+                INSERT INTO review_feedback VALUES (?, 1, ?, ?)
+                ON CONFLICT (archive_id) DO UPDATE SET
+                    count = count + 1,
+                    rating_sum = rating_sum + excluded.rating_sum,
+                    helpful_count = helpful_count + excluded.helpful_count
+            """, review_rows)
+            self._conn.executemany("""
+                INSERT INTO suggestions (timestamp, language, review_type, rating, suggestion)
+                VALUES (?, ?, ?, ?, ?)
+            """, suggestion_rows)
+    
+    def get_totals(self) -> Dict:
+        """전체 기간 합계 반환"""
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT COALESCE(SUM(count), 0), COALESCE(SUM(rating_sum), 0), COALESCE(SUM(helpful_count), 0)
+                FROM rollups WHERE granularity = 'daily'
+            """).fetchone()
+        return {"count": row[0], "rating_sum": row[1], "helpful_count": row[2]}
+    
+    def get_language_distribution(self) -> Dict[str, int]:
+        """언어별 피드백 수 (많은 순)"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT language, SUM(count) AS total FROM rollups
+                WHERE granularity = 'daily'
+                GROUP BY language ORDER BY total DESC
+            """).fetchall()
+        return {language: total for language, total in rows}
+    
+    def get_timeseries(self, granularity: str, periods: int) -> List[Dict]:
+        """최근 버킷들의 (언어, 리뷰 유형)별 집계 반환"""
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"지원하지 않는 집계 단위입니다: {granularity}")
+        
+        step = timedelta(hours=1) if granularity == "hourly" else timedelta(days=1)
+        since = self.bucket_key(granularity, (datetime.now() - step * (periods - 1)).isoformat())
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT bucket, language, review_type, count, rating_sum, helpful_count
+                FROM rollups WHERE granularity = ? AND bucket >= ?
+                ORDER BY bucket
+            """, (granularity, since)).fetchall()
+        
+        return [
+            {
+                "bucket": bucket,
+                "language": language,
+                "review_type": review_type,
+                "count": count,
+                "rating_sum": rating_sum,
+                "helpful_count": helpful_count
+            }
+            for bucket, language, review_type, count, rating_sum, helpful_count in rows
+        ]
+    
+    def get_review_feedback(self, archive_ids: List[int]) -> Dict[int, Dict]:
+        """아카이브 ID별 피드백 요약 (피드백이 없는 리뷰는 제외)"""
+        if not archive_ids:
+            return {}
+        placeholders = ", ".join("?" * len(archive_ids))
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT archive_id, count, rating_sum, helpful_count FROM review_feedback
+                WHERE archive_id IN ({placeholders})
+            """, list(archive_ids)).fetchall()
+        
+        return {
+            archive_id: {
+                "count": count,
+                "average_rating": round(rating_sum / count, 2),
+                "helpful_percentage": round(helpful_count / count * 100, 2)
+            }
+            for archive_id, count, rating_sum, helpful_count in rows
+        }
+    
+    def count_suggestions(self) -> int:
+        """저장된 제안사항 수"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+    
+    def get_suggestions(self, limit: int, offset: int = 0) -> List[Dict]:
+        """제안사항 조회 (최신순)"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT timestamp, language, review_type, rating, suggestion FROM suggestions
+                ORDER BY id DESC LIMIT ? OFFSET ?
+            """, (limit, offset)).fetchall()
+        
+        return [
+            {
+                "timestamp": timestamp,
+                "language": language,
+                "review_type": review_type,
+                "rating": rating,
+                "suggestion": suggestion
+            }
+            for timestamp, language, review_type, rating, suggestion in rows
+        ]
+    
+    def prune(self, granularity: str, before_bucket: str) -> int:
+        """지정한 버킷 이전의 집계 삭제, 삭제된 행 수 반환"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM rollups WHERE granularity = ? AND bucket < ?",
+                (granularity, before_bucket)
+            )
+        return cursor.rowcount
+
+
 class SessionManager:
-    """사용자 세션 관리 클래스"""
+    """
+    사용자 세션 관리 클래스
+
+    API 서버처럼 오래 살아 있는 파이프라인에서도 메모리가 끝없이 늘지 않도록
+    세션 수와 세션당 리뷰 수를 제한합니다 (넘치면 가장 오래된 것부터 제거).
+    """
     
-    def __init__(self):
+    def __init__(self, max_sessions: Optional[int] = None, max_reviews: Optional[int] = None):
+        self.max_sessions = max_sessions if max_sessions is not None else Config.SESSION_MAX_SESSIONS
+        self.max_reviews = max_reviews if max_reviews is not None else Config.SESSION_MAX_REVIEWS
         self.session_data = {}
+        self._lock = threading.Lock()
     
     def start_session(self, session_id: str) -> Dict:
         """새 세션 시작"""
-        self.session_data[session_id] = {
-            "start_time": datetime.now(),
-            "code_reviews": [],
-            "feedback_submitted": False
-        }
-        return self.session_data[session_id]
+        with self._lock:
+            self.session_data.pop(session_id, None)
+            self.session_data[session_id] = {
+                "start_time": datetime.now(),
+                "code_reviews": deque(maxlen=self.max_reviews),
+                "feedback_submitted": False
+            }
+            # dict는 삽입 순서를 유지하므로 앞쪽이 가장 오래된 세션
+            while len(self.session_data) > self.max_sessions:
+                del self.session_data[next(iter(self.session_data))]
+            return self.session_data[session_id]
     
     def add_review_to_session(self, session_id: str, review_data: Dict):
-        """세션에 리뷰 데이터 추가"""
-        if session_id in self.session_data:
-            self.session_data[session_id]["code_reviews"].append(review_data)
+        """세션에 리뷰 데이터 추가 (max_reviews를 넘으면 가장 오래된 리뷰 제거)"""
+        with self._lock:
+            if session_id in self.session_data:
+                self.session_data[session_id]["code_reviews"].append(review_data)
     
     def get_session_history(self, session_id: str) -> List[Dict]:
         """세션 히스토리 반환"""
-        if session_id in self.session_data:
-            return self.session_data[session_id]["code_reviews"]
-        return []
+        with self._lock:
+            if session_id in self.session_data:
+                return list(self.session_data[session_id]["code_reviews"])
+            return []
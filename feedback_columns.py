@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+컬럼형 분석 저장소 모듈
+피드백/사용량(라우팅 로그) 기록을 딕셔너리 인코딩된 타입 컬럼의 Arrow IPC 파일로 내보내고,
+메모리 매핑된 컬럼 위에서 행 전체를 불러오지 않고 분석
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import Config
+from file_lock import locked_path
+
+
+# 데이터셋별 컬럼 정의: (이름, 타입, 원본 기록에서 값을 꺼내는 함수)
+# 타입 "category"는 dictionary<int16, string>으로 저장
+DATASETS = {
+    "feedback": [
+        ("timestamp", "timestamp", lambda e: e["timestamp"]),
+        ("language", "category", lambda e: e.get("language")),
+        ("review_type", "category", lambda e: e.get("review_type", "comprehensive")),
+        ("rating", "int8", lambda e: e.get("rating")),
+        ("helpful", "bool", lambda e: e.get("helpful")),
+        ("code_length", "int32", lambda e: e.get("code_length")),
+        ("review_length", "int32", lambda e: e.get("review_length")),
+        ("archive_id", "int64", lambda e: e.get("archive_id")),
+        ("suggestions", "string", lambda e: e.get("suggestions") or None),
+    ],
+    "usage": [
+        ("timestamp", "timestamp", lambda e: e["timestamp"]),
+        ("review_type", "category", lambda e: e.get("review_type")),
+        ("tier", "category", lambda e: e.get("tier")),
+        ("model", "category", lambda e: e.get("model")),
+        ("complexity", "category", lambda e: e.get("code_stats", {}).get("estimated_complexity")),
+        ("code_lines", "int32", lambda e: e.get("code_stats", {}).get("non_empty_lines")),
+        ("max_tokens", "int32", lambda e: e.get("max_tokens")),
+        ("temperature", "float32", lambda e: e.get("temperature")),
+        ("latency", "float32", lambda e: e.get("latency")),
+        ("success", "bool", lambda e: e.get("success")),
+    ],
+}
+
+
+def _arrow_type(kind: str):
+    import pyarrow as pa
+
+    return {
+        "timestamp": pa.timestamp("us"),
+        "category": pa.dictionary(pa.int16(), pa.string()),
+        "int8": pa.int8(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float32": pa.float32(),
+        "bool": pa.bool_(),
+        "string": pa.string(),
+    }[kind]
+
+
+def schema(dataset: str):
+    """데이터셋의 Arrow 스키마"""
+    import pyarrow as pa
+
+    return pa.schema([(name, _arrow_type(kind)) for name, kind, _ in DATASETS[dataset]])
+
+
+def to_table(dataset: str, entries: List[Dict]):
+    """
+    기록(dict) 목록을 타입이 지정된 Arrow 테이블로 변환
+
+    Args:
+        dataset: "feedback" 또는 "usage"
+        entries: JSON 기록 목록
+
+    Returns:
+        pyarrow.Table
+    """
+    import pyarrow as pa
+
+    columns = []
+    for name, kind, getter in DATASETS[dataset]:
+        values = [getter(entry) for entry in entries]
+        if kind == "timestamp":
+            array = pa.array([datetime.fromisoformat(v) for v in values], type=pa.timestamp("us"))
+        elif kind == "category":
+            array = pa.array(values, type=pa.string()).dictionary_encode().cast(_arrow_type(kind))
+        else:
+            array = pa.array(values, type=_arrow_type(kind))
+        columns.append(array)
+    return pa.Table.from_arrays(columns, schema=schema(dataset))
+
+
+def read_jsonl(path: str) -> Iterable[Dict]:
+    """JSON Lines 파일 순회 (없으면 빈 목록)"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+class ColumnStore:
+    """Arrow IPC 파일 기반 컬럼형 분석 저장소 클래스"""
+
+    def __init__(self, directory: str = Config.COLUMN_STORE_DIR):
+        """
+        저장소 초기화
+
+        데이터셋마다 압축된 기본 파일(<dataset>.arrow)과 내보내기마다 추가되는
+        세그먼트 파일(<dataset>-<시각>.arrow)을 두고, 읽을 때 모두 메모리 매핑합니다.
+        내보내기/압축은 디렉터리 단위 잠금(file_lock.locked_path)으로 직렬화하므로
+        여러 세션의 저장소 인스턴스나 다른 프로세스가 같은 행을 두 번 내보내지 않습니다.
+
+        Args:
+            directory: Arrow 파일을 저장할 디렉터리
+        """
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, "manifest.json")
+
+    # ----- 파일 관리 -----
+
+    def _manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict):
+        tmp = self.manifest_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.manifest_file)
+
+    def _base_file(self, dataset: str) -> str:
+        return os.path.join(self.directory, f"{dataset}.arrow")
+
+    def _segment_files(self, dataset: str) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        prefix = f"{dataset}-"
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(".arrow")
+        )
+
+    def files(self, dataset: str) -> List[str]:
+        """데이터셋을 구성하는 파일 (기본 파일 + 세그먼트, 오래된 순)"""
+        base = self._base_file(dataset)
+        return ([base] if os.path.exists(base) else []) + self._segment_files(dataset)
+
+    @staticmethod
+    def _write(path: str, table):
+        """IPC 파일로 원자적 기록 (무압축이어야 메모리 매핑 시 복사가 없음)"""
+        import pyarrow as pa
+
+        # IPC 파일은 배치마다 다른 사전을 허용하지 않으므로 사전을 통합
+        table = table.unify_dictionaries().combine_chunks()
+        tmp = path + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=64 * 1024)
+        os.replace(tmp, path)
+
+    # ----- 내보내기 / 압축 -----
+
+    def export(self, dataset: str, entries: Iterable[Dict]) -> int:
+        """
+        마지막 내보내기 이후의 기록을 새 세그먼트로 추가
+
+        Args:
+            dataset: "feedback" 또는 "usage"
+            entries: 원본 기록 (timestamp 순)
+
+        Returns:
+            내보낸 행 수
+        """
+        with locked_path(self.directory):
+            manifest = self._manifest()
+            watermark = manifest.get(dataset, {}).get("watermark", "")
+            pending = [entry for entry in entries if entry.get("timestamp", "") > watermark]
+            if not pending:
+                return 0
+
+            os.makedirs(self.directory, exist_ok=True)
+            segment = os.path.join(self.directory, f"{dataset}-{time.time_ns()}.arrow")
+            self._write(segment, to_table(dataset, pending))
+
+            manifest.setdefault(dataset, {})["watermark"] = max(entry["timestamp"] for entry in pending)
+            manifest[dataset]["exported_rows"] = manifest[dataset].get("exported_rows", 0) + len(pending)
+            self._save_manifest(manifest)
+            return len(pending)
+
+    def compact(self, dataset: str) -> Dict:
+        """
+        세그먼트를 기본 파일 하나로 합침
+
+        Returns:
+            {"segments", "rows"}
+        """
+        import pyarrow as pa
+
+        with locked_path(self.directory):
+            segments = self._segment_files(dataset)
+            if not segments:
+                base = self._base_file(dataset)
+                return {"segments": 0, "rows": self._read(base, []).num_rows if os.path.exists(base) else 0}
+
+            table = pa.concat_tables([self._read(path) for path in self.files(dataset)])
+            self._write(self._base_file(dataset), table)
+            for path in segments:
+                os.remove(path)
+            return {"segments": len(segments), "rows": table.num_rows}
+
+    def export_and_compact(self,
+                           feedback_entries: Iterable[Dict],
+                           usage_file: str = Config.ROUTING_LOG_FILE) -> Dict:
+        """피드백/사용량 기록 내보내기 후 압축 (정리 작업용)"""
+        result = {
+            "feedback_exported": self.export("feedback", feedback_entries),
+            # 크기 제한으로 교체된 이전 로그(.1)에 아직 내보내지 않은 기록이 있을 수 있음
+            "usage_exported": self.export("usage", itertools.chain(read_jsonl(usage_file + ".1"),
+                                                                   read_jsonl(usage_file))),
+        }
+        for dataset in DATASETS:
+            result[f"{dataset}_rows"] = self.compact(dataset)["rows"]
+        return result
+
+    # ----- 읽기 -----
+
+    @staticmethod
+    def _read(path: str, columns: Optional[List[str]] = None):
+        """IPC 파일을 메모리 매핑으로 읽기 (필요한 컬럼 버퍼만 실제로 접근)"""
+        import pyarrow as pa
+
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table.select(columns) if columns is not None else table
+
+    def load(self, dataset: str, columns: Optional[List[str]] = None):
+        """
+        데이터셋 테이블 (메모리 매핑, 파일이 여럿이면 청크로 연결)
+
+        파일마다 사전(dictionary)이 다르므로 연결한 뒤 사전을 통합하고, 압축이
+        세그먼트를 지우는 도중에 읽지 않도록 내보내기/압축과 같은 잠금을 잡습니다.
+
+        Args:
+            dataset: "feedback" 또는 "usage"
+            columns: 읽을 컬럼 (없으면 전체)
+
+        Returns:
+            pyarrow.Table
+        """
+        import pyarrow as pa
+
+        target = schema(dataset)
+        if columns is not None:
+            target = pa.schema([target.field(name) for name in columns])
+        with locked_path(self.directory):
+            tables = [self._read(path, columns) for path in self.files(dataset)]
+        return pa.concat_tables(tables).unify_dictionaries() if tables else target.empty_table()
+
+    # ----- 분석 -----
+
+    def feedback_breakdown(self) -> Dict:
+        """
+        언어/리뷰 유형별 평점·도움됨 비율과 평점 분포
+
+        Returns:
+            {"total", "by_language", "by_review_type", "rating_histogram"}
+        """
+        import pyarrow.compute as pc
+
+        table = self.load("feedback", ["language", "review_type", "rating", "helpful"])
+        if not table.num_rows:
+            return {"total": 0, "by_language": [], "by_review_type": [], "rating_histogram": {}}
+
+        table = table.set_column(3, "helpful", pc.cast(table["helpful"], "int8"))
+
+        def group(key: str) -> List[Dict]:
+            rows = table.group_by(key).aggregate([
+                ("rating", "count"), ("rating", "mean"), ("helpful", "mean")
+            ]).to_pylist()
+            return sorted((
+                {
+                    key: row[key],
+                    "count": row["rating_count"],
+                    "average_rating": round(row["rating_mean"], 2),
+                    "helpful_percentage": round(row["helpful_mean"] * 100, 1)
+                }
+                for row in rows
+            ), key=lambda row: -row["count"])
+
+        histogram = pc.value_counts(table["rating"]).to_pylist()
+        return {
+            "total": table.num_rows,
+            "by_language": group("language"),
+            "by_review_type": group("review_type"),
+            "rating_histogram": {item["values"]: item["counts"] for item in sorted(histogram, key=lambda x: x["values"])}
+        }
+
+    def usage_summary(self) -> List[Dict]:
+        """
+        모델 티어별 호출 수, 성공률, 지연 백분위수, 평균 max_tokens
+
+        Returns:
+            티어별 요약 목록
+        """
+        import pyarrow.compute as pc
+
+        table = self.load("usage", ["tier", "model", "latency", "success", "max_tokens"])
+        if not table.num_rows:
+            return []
+
+        table = table.set_column(3, "success", pc.cast(table["success"], "int8"))
+        rows = table.group_by(["tier", "model"]).aggregate([
+            ("latency", "count"),
+            ("latency", "tdigest", pc.TDigestOptions(q=[0.5, 0.95])),
+            ("success", "mean"),
+            ("max_tokens", "mean"),
+        ]).to_pylist()
+        return sorted((
+            {
+                "tier": row["tier"],
+                "model": row["model"],
+                "calls": row["latency_count"],
+                "success_rate": round(row["success_mean"] * 100, 1),
+                "latency_p50": round(row["latency_tdigest"][0], 3),
+                "latency_p95": round(row["latency_tdigest"][1], 3),
+                "average_max_tokens": round(row["max_tokens_mean"])
+            }
+            for row in rows
+        ), key=lambda row: -row["calls"])
+
+
+def check_segments() -> List[str]:
+    """
+    세그먼트가 여러 개인 상태(압축 전)에서 분석이 동작하는지 점검
+
+    언어가 다른 피드백을 두 번 내보내 파일마다 사전이 다르게 만든 뒤
+    feedback_breakdown/usage_summary를 호출하고, 문제 목록 반환
+    """
+    import tempfile
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        store = ColumnStore(os.path.join(directory, "columns"))
+        batches = [("2026-01-01T00:00:0", "Python", "fast"), ("2026-01-02T00:00:0", "Go", "strong")]
+        for prefix, language, tier in batches:
+            store.export("feedback", [
+                {"timestamp": f"{prefix}{index}", "language": language, "rating": 4, "helpful": True}
+                for index in range(3)
+            ])
+            store.export("usage", [
+                {"timestamp": f"{prefix}{index}", "tier": tier, "model": f"model-{tier}",
+                 "latency": 0.5, "success": True, "max_tokens": 1000}
+                for index in range(3)
+            ])
+        if len(store.files("feedback")) != 2:
+            failures.append(f"세그먼트 수 {len(store.files('feedback'))} (기대: 2)")
+
+        breakdown = store.feedback_breakdown()
+        languages = sorted(row["language"] for row in breakdown["by_language"])
+        if breakdown["total"] != 6 or languages != ["Go", "Python"]:
+            failures.append(f"피드백 분석 결과가 다름: 전체 {breakdown['total']}, 언어 {languages}")
+        tiers = sorted(row["tier"] for row in store.usage_summary())
+        if tiers != ["fast", "strong"]:
+            failures.append(f"사용량 분석 결과가 다름: 티어 {tiers}")
+
+        for dataset in DATASETS:
+            rows = store.compact(dataset)["rows"]
+            if rows != 6:
+                failures.append(f"{dataset} 압축 후 {rows}행 (기대: 6)")
+    return failures
+
+
+def main():
+    """메인 함수 (내보내기/압축 작업 및 요약 출력)"""
+    parser = argparse.ArgumentParser(description="피드백/사용량 컬럼형 내보내기")
+    parser.add_argument("command", choices=["export", "stats", "check"],
+                        help="export: 내보내기+압축, stats: 요약 출력, check: 여러 세그먼트 분석 점검")
+    parser.add_argument("--dir", default=Config.COLUMN_STORE_DIR, help="Arrow 파일 디렉터리")
+    parser.add_argument("--feedback-file", default="feedback_data.json")
+    parser.add_argument("--usage-file", default=Config.ROUTING_LOG_FILE)
+    args = parser.parse_args()
+
+    if args.command == "check":
+        failures = check_segments()
+        if failures:
+            for failure in failures:
+                print(f"❌ {failure}")
+            sys.exit(1)
+        print("✅ 여러 세그먼트 분석 점검 통과")
+        return
+
+    store = ColumnStore(args.dir)
+    if args.command == "export":
+        from feedback_collector import FeedbackCollector
+
+        collector = FeedbackCollector(feedback_file=args.feedback_file)
+        result = store.export_and_compact(collector.feedback_data, args.usage_file)
+        print(f"✅ 피드백 {result['feedback_exported']}건, 사용량 {result['usage_exported']}건 내보냄 "
+              f"(전체 {result['feedback_rows']}/{result['usage_rows']}행)")
+        return
+
+    breakdown = store.feedback_breakdown()
+    print(f"피드백 {breakdown['total']}건")
+    for row in breakdown["by_language"]:
+        print(f"  {row['language']:<12} {row['count']:>6}건  평점 {row['average_rating']:.2f}  도움됨 {row['helpful_percentage']}%")
+    for row in store.usage_summary():
+        print(f"  {row['tier']:<9} {row['model']:<16} {row['calls']:>6}회  성공 {row['success_rate']}%  "
+              f"p50 {row['latency_p50']}s  p95 {row['latency_p95']}s")
+
+
+if __name__ == "__main__":
+    main()
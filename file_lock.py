@@ -0,0 +1,48 @@
+"""
+파일 잠금 모듈
+같은 파일을 여러 세션(스레드)과 프로세스가 함께 쓸 때 경로 단위로 직렬화
+(프로세스 안에서는 경로별 공유 락, 프로세스 사이에서는 .lock 파일의 fcntl.flock)
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안의 락만 사용
+    fcntl = None
+
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    """경로별 프로세스 공유 락 (인스턴스가 달라도 같은 파일이면 같은 락)"""
+    key = os.path.realpath(path)
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+@contextmanager
+def locked_path(path: str):
+    """
+    경로 단위 배타 잠금
+
+    Args:
+        path: 보호할 파일/디렉터리 경로 (잠금 파일은 path + ".lock")
+    """
+    lock_file = f"{path}.lock"
+    with _thread_lock(path):
+        directory = os.path.dirname(lock_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(lock_file, 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
@@ -0,0 +1,307 @@
+"""
+API 키 풀 모듈
+여러 OpenAI API 키에 요청을 나누어 보내고 키별 사용량/레이트 리밋을 추적
+"""
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+
+
+# 다른 키로 다시 시도할 오류 (레이트 리밋, 인증, 서버 오류)
+RETRYABLE_STATUS = {401, 403, 408, 409, 429, 500, 502, 503, 504}
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class NoAvailableKeyError(RuntimeError):
+    """모든 키가 대기(쿨다운) 중이거나 한도를 소진했을 때 발생"""
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """x-ratelimit-reset-* 헤더 값 (예: "1s", "6m0s", "20ms")을 초로 변환"""
+    if not value:
+        return None
+    parts = _DURATION_PATTERN.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def mask_key(api_key: str) -> str:
+    """보고용 키 표시 (앞 3자와 끝 4자만)"""
+    if len(api_key) <= 8:
+        return "***"
+    return f"{api_key[:3]}...{api_key[-4:]}"
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _error_headers(error: Exception) -> Dict:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    return headers or {}
+
+
+class _KeyState:
+    """키 하나의 상태"""
+
+    def __init__(self, api_key: str, client):
+        self.api_key = api_key
+        self.label = mask_key(api_key)
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.tokens = 0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self.remaining_requests = None
+        self.remaining_tokens = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.last_error = None
+
+    def available(self, now: float) -> bool:
+        if self.cooldown_until > now:
+            return False
+        # 헤더상 한도를 다 쓴 키는 리셋 시각까지 제외
+        if self.remaining_requests == 0 and self.requests_reset_at > now:
+            return False
+        if self.remaining_tokens == 0 and self.tokens_reset_at > now:
+            return False
+        return True
+
+
+class ApiKeyPool:
+    """여러 API 키 중 가장 여유 있는 키를 골라 쓰는 스레드 안전 키 풀 클래스"""
+
+    def __init__(self,
+                 api_keys: List[str],
+                 client_factory: Optional[Callable[[str], object]] = None,
+                 cooldown: float = Config.KEY_POOL_COOLDOWN_SECONDS,
+                 max_cooldown: float = Config.KEY_POOL_MAX_COOLDOWN_SECONDS):
+        """
+        Args:
+            api_keys: 사용할 API 키 목록 (중복 제거)
+            client_factory: 키로 클라이언트를 만드는 함수 (없으면 openai.OpenAI)
+            cooldown: 오류 난 키를 제외할 기본 시간 (초, 연속 오류마다 두 배)
+            max_cooldown: 최대 제외 시간 (초)
+        """
+        keys = list(dict.fromkeys(key.strip() for key in api_keys if key and key.strip()))
+        if not keys:
+            raise ValueError("API 키 풀에 키가 없습니다.")
+
+        if client_factory is None:
+            # 재시도는 풀이 다른 키로 하므로 SDK 자체 재시도는 끔
+            from openai import OpenAI
+            client_factory = lambda api_key: OpenAI(api_key=api_key, max_retries=0)
+
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._states = [_KeyState(key, client_factory(key)) for key in keys]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def acquire(self, exclude: Optional[set] = None) -> _KeyState:
+        """
+        사용할 키 선택 (진행 중 요청이 가장 적은 키, 같으면 남은 한도가 많은 키)
+
+        Raises:
+            NoAvailableKeyError: 쓸 수 있는 키가 없을 때
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [state for state in self._states
+                          if state.available(now) and state not in (exclude or ())]
+            if not candidates:
+                waits = [max(state.cooldown_until, state.requests_reset_at, state.tokens_reset_at) - now
+                         for state in self._states]
+                raise NoAvailableKeyError(
+                    f"사용 가능한 API 키가 없습니다 (약 {max(min(waits), 0):.0f}초 후 재시도)"
+                )
+            state = min(candidates, key=lambda s: (
+                s.in_flight,
+                -(s.remaining_requests if s.remaining_requests is not None else float("inf")),
+                s.requests
+            ))
+            state.in_flight += 1
+            state.requests += 1
+            return state
+
+    def release(self, state: _KeyState, headers: Optional[Dict] = None, tokens: int = 0):
+        """성공한 요청 반영 (응답 헤더의 레이트 리밋 정보 갱신)"""
+        with self._lock:
+            state.in_flight -= 1
+            state.tokens += tokens
+            state.consecutive_errors = 0
+            self._update_limits(state, headers or {})
+
+    def fail(self, state: _KeyState, error: Exception):
+        """실패한 요청 반영 (재시도할 오류면 키를 일정 시간 제외)"""
+        status = _status_code(error)
+        headers = _error_headers(error)
+        with self._lock:
+            state.in_flight -= 1
+            state.errors += 1
+            state.last_error = f"{status or type(error).__name__}: {str(error)[:120]}"
+            self._update_limits(state, headers)
+            if status is not None and status not in RETRYABLE_STATUS:
+                # 잘못된 요청(400 등)은 키 문제가 아님
+                return
+            state.consecutive_errors += 1
+            backoff = min(self.cooldown * 2 ** (state.consecutive_errors - 1), self.max_cooldown)
+            if status == 429:
+                retry_after = parse_reset_duration(headers.get("retry-after")) or 0.0
+                reset = max(retry_after, parse_reset_duration(headers.get("x-ratelimit-reset-requests")) or 0.0)
+                backoff = max(min(reset, self.max_cooldown), 1.0) if reset else backoff
+            elif status in (401, 403):
+                backoff = self.max_cooldown
+            state.cooldown_until = time.monotonic() + backoff
+
+    @staticmethod
+    def _update_limits(state: _KeyState, headers: Dict):
+        now = time.monotonic()
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None:
+            state.remaining_requests = int(remaining)
+            state.requests_reset_at = now + (parse_reset_duration(headers.get("x-ratelimit-reset-requests")) or 0.0)
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if remaining is not None:
+            state.remaining_tokens = int(remaining)
+            state.tokens_reset_at = now + (parse_reset_duration(headers.get("x-ratelimit-reset-tokens")) or 0.0)
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """다른 키로 다시 보낼 만한 오류인지 (상태 코드가 없으면 연결 오류로 봄)"""
+        status = _status_code(error)
+        return status is None or status in RETRYABLE_STATUS
+
+    def get_stats(self) -> List[Dict]:
+        """키별 사용량 보고 (키는 가려서 표시)"""
+        with self._lock:
+            now = time.monotonic()
+            return [{
+                "key": state.label,
+                "requests": state.requests,
+                "errors": state.errors,
+                "in_flight": state.in_flight,
+                "tokens": state.tokens,
+                "remaining_requests": state.remaining_requests,
+                "remaining_tokens": state.remaining_tokens,
+                "cooldown_s": round(max(state.cooldown_until - now, 0.0), 1),
+                "last_error": state.last_error
+            } for state in self._states]
+
+
+class _PooledStream:
+    """스트림이 끝나거나 닫힐 때 키를 반납하는 스트림 래퍼"""
+
+    def __init__(self, pool: ApiKeyPool, state: _KeyState, stream, headers: Dict):
+        self._pool = pool
+        self._state = state
+        self._stream = stream
+        self._headers = headers
+        self._chars = 0
+        self._released = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    self._chars += len(chunk.choices[0].delta.content)
+                yield chunk
+        except Exception as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    def _finish(self, error: Optional[Exception] = None):
+        if self._released:
+            return
+        self._released = True
+        if error is not None:
+            self._pool.fail(self._state, error)
+        else:
+            # 스트리밍 응답에는 usage가 없으므로 글자 수로 토큰 추정
+            self._pool.release(self._state, self._headers, self._chars // 4)
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._finish()
+
+
+class _PooledCompletions:
+    """client.chat.completions 대체 (키 풀에서 키를 골라 호출)"""
+
+    def __init__(self, pool: ApiKeyPool):
+        self._pool = pool
+        self.call_count = 0
+
+    def create(self, **kwargs):
+        self.call_count += 1
+        tried = set()
+        while True:
+            state = self._pool.acquire(exclude=tried)
+            tried.add(state)
+            try:
+                response, headers = self._create(state.client, kwargs)
+            except Exception as e:
+                self._pool.fail(state, e)
+                if not self._pool.is_retryable(e) or len(tried) >= len(self._pool):
+                    raise
+                continue
+
+            if kwargs.get("stream"):
+                return _PooledStream(self._pool, state, response, headers)
+            usage = getattr(response, "usage", None)
+            self._pool.release(state, headers, getattr(usage, "total_tokens", 0) or 0)
+            return response
+
+    @staticmethod
+    def _create(client, kwargs):
+        """헤더를 읽을 수 있으면 raw 응답으로 호출 (openai SDK의 with_raw_response)"""
+        completions = client.chat.completions
+        raw = getattr(completions, "with_raw_response", None)
+        if raw is None:
+            return completions.create(**kwargs), {}
+        response = raw.create(**kwargs)
+        return response.parse(), {k.lower(): v for k, v in response.headers.items()}
+
+
+class PooledClient:
+    """키 풀을 사용하는 openai.OpenAI 모양의 클라이언트"""
+
+    def __init__(self, pool: ApiKeyPool):
+        self.pool = pool
+        self.chat = SimpleNamespace(completions=_PooledCompletions(pool))
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_key_pool() -> Optional[ApiKeyPool]:
+    """Config.OPENAI_API_KEYS로 만든 프로세스 공유 키 풀 (키가 없으면 None)"""
+    global _shared_pool
+    if not Config.OPENAI_API_KEYS:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ApiKeyPool(Config.OPENAI_API_KEYS)
+        return _shared_pool
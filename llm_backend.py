@@ -0,0 +1,251 @@
+"""
+LLM 백엔드 모듈
+CodeReviewHelper가 사용하는 생성 백엔드 공통 인터페이스 (동기/비동기/스트리밍 + 사용량 보고)와 구현
+
+- OpenAIBackend: openai.OpenAI 모양의 클라이언트 (키 풀, 기록/재생, 가짜 클라이언트 포함)
+- LocalBackend: OpenAI 호환 로컬 추론 서버 (vLLM, llama.cpp, Ollama 등)
+- DeterministicBackend: 네트워크/지연 없는 프로세스 내 결정적 응답 (파이프라인 자체 프로파일링용)
+"""
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from config import Config
+
+BACKEND_NAMES = ("openai", "deterministic", "local")
+
+
+def estimate_tokens(text: str) -> int:
+    """사용량을 알려주지 않는 응답의 토큰 수 추정 (약 4자당 1토큰)"""
+    return len(text) // 4
+
+
+def _prompt_tokens(messages: List[Dict]) -> int:
+    return estimate_tokens("".join(message["content"] for message in messages))
+
+
+class Completion:
+    """생성 결과 하나"""
+
+    def __init__(self, text: str, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        self.text = text
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        # 응답에 usage가 없어 글자 수로 추정한 값인지 여부
+        self.estimated = estimated
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class CompletionStream:
+    """텍스트 조각을 내보내는 스트리밍 응답 (다 읽거나 닫으면 사용량을 백엔드에 반영)"""
+
+    def __init__(self, backend: "LLMBackend", chunks: Iterator[str], model: str, prompt_tokens: int, close=None):
+        self._backend = backend
+        self._chunks = chunks
+        self._close = close
+        self._parts: List[str] = []
+        self._finished = False
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for text in self._chunks:
+            self._parts.append(text)
+            yield text
+        self._finish()
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 텍스트"""
+        return "".join(self._parts)
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        # 중간에 닫혀도 실제로 받은 만큼은 사용량에 포함
+        self.completion_tokens = self.completion_tokens or estimate_tokens(self.text)
+        self._backend._record(self.prompt_tokens, self.completion_tokens, estimated=True)
+
+    def close(self):
+        try:
+            if self._close:
+                self._close()
+        finally:
+            self._finish()
+
+
+class LLMBackend:
+    """
+    생성 백엔드 기본 클래스
+
+    구현은 complete와 stream을 제공하고, 비동기 버전은 기본적으로 작업 스레드에서 동기 버전을 실행.
+    사용량(요청/토큰 수)은 _record로 누적되어 get_usage로 보고됨.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._usage_lock = threading.Lock()
+        self._usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_requests": 0}
+
+    def complete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Completion:
+        """전체 응답을 한 번에 생성"""
+        raise NotImplementedError
+
+    def stream(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> CompletionStream:
+        """응답을 텍스트 조각으로 스트리밍 (다 읽지 않을 때는 close 호출)"""
+        raise NotImplementedError
+
+    async def acomplete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Completion:
+        """complete의 비동기 버전"""
+        import asyncio
+        return await asyncio.to_thread(self.complete, messages, model, temperature, max_tokens)
+
+    async def astream(self, messages: List[Dict], model: str, temperature: float,
+                      max_tokens: int) -> AsyncIterator[str]:
+        """stream의 비동기 버전 (조각마다 작업 스레드에서 다음 조각을 읽음)"""
+        import asyncio
+        stream = await asyncio.to_thread(self.stream, messages, model, temperature, max_tokens)
+        chunks = iter(stream)
+        done = object()
+        try:
+            while True:
+                text = await asyncio.to_thread(next, chunks, done)
+                if text is done:
+                    return
+                yield text
+        finally:
+            stream.close()
+
+    def _record(self, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        with self._usage_lock:
+            self._usage["requests"] += 1
+            self._usage["prompt_tokens"] += prompt_tokens
+            self._usage["completion_tokens"] += completion_tokens
+            if estimated:
+                self._usage["estimated_requests"] += 1
+
+    def get_usage(self) -> Dict:
+        """누적 사용량"""
+        with self._usage_lock:
+            usage = dict(self._usage)
+        usage["backend"] = self.name
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return usage
+
+
+class OpenAIBackend(LLMBackend):
+    """chat.completions.create를 제공하는 OpenAI 모양 클라이언트 백엔드"""
+
+    name = "openai"
+
+    def __init__(self, client, model: Optional[str] = None):
+        """
+        Args:
+            client: openai.OpenAI 또는 같은 모양의 클라이언트 (PooledClient, RecordingClient 등)
+            model: 지정하면 요청한 모델 이름 대신 항상 사용
+        """
+        super().__init__()
+        self.client = client
+        self.model = model
+
+    def complete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Completion:
+        model = self.model or model
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        text = response.choices[0].message.content or ""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            completion = Completion(text, model, usage.prompt_tokens, usage.completion_tokens)
+        else:
+            completion = Completion(text, model, _prompt_tokens(messages), estimate_tokens(text), estimated=True)
+        self._record(completion.prompt_tokens, completion.completion_tokens, completion.estimated)
+        return completion
+
+    def stream(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> CompletionStream:
+        model = self.model or model
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        def chunks():
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        return CompletionStream(self, chunks(), model, _prompt_tokens(messages), close=response.close)
+
+
+class LocalBackend(OpenAIBackend):
+    """OpenAI 호환 API를 제공하는 로컬 추론 서버 백엔드"""
+
+    name = "local"
+
+    def __init__(self,
+                 base_url: str = Config.LOCAL_LLM_BASE_URL,
+                 api_key: str = Config.LOCAL_LLM_API_KEY,
+                 model: Optional[str] = Config.LOCAL_LLM_MODEL or None,
+                 client=None):
+        """
+        Args:
+            base_url: 서버 주소 (예: http://localhost:8000/v1)
+            api_key: 서버가 요구하는 키 (대부분 아무 값)
+            model: 서버에 올린 모델 이름 (없으면 라우팅된 모델 이름 그대로 전송)
+            client: 미리 만든 클라이언트 (기록 래퍼 등)
+        """
+        if client is None:
+            # openai 패키지는 첫 사용 시점에 지연 로드, 로컬 서버는 재시도 없이 바로 실패를 알림
+            from openai import OpenAI
+            client = OpenAI(base_url=base_url, api_key=api_key, max_retries=0)
+        super().__init__(client, model)
+        self.base_url = base_url
+
+
+class DeterministicBackend(LLMBackend):
+    """네트워크와 지연 없이 요청 내용으로 결정적인 응답을 만드는 프로세스 내 백엔드"""
+
+    name = "deterministic"
+
+    # 스트리밍 조각 크기 (약 4토큰)
+    CHUNK_CHARS = 16
+
+    def _render(self, messages: List[Dict], model: str, max_tokens: int) -> str:
+        from fake_backend import render_fake_review
+        return render_fake_review(model, messages, max_tokens)
+
+    def complete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Completion:
+        text = self._render(messages, model, max_tokens)
+        completion = Completion(text, model, _prompt_tokens(messages), max(estimate_tokens(text), 1))
+        self._record(completion.prompt_tokens, completion.completion_tokens)
+        return completion
+
+    def stream(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> CompletionStream:
+        text = self._render(messages, model, max_tokens)
+        chunks = (text[start:start + self.CHUNK_CHARS] for start in range(0, len(text), self.CHUNK_CHARS))
+        return CompletionStream(self, chunks, model, _prompt_tokens(messages))
+
+    async def acomplete(self, messages: List[Dict], model: str, temperature: float, max_tokens: int) -> Completion:
+        # 기다릴 I/O가 없으므로 스레드를 거치지 않음
+        return self.complete(messages, model, temperature, max_tokens)
+
+    async def astream(self, messages: List[Dict], model: str, temperature: float,
+                      max_tokens: int) -> AsyncIterator[str]:
+        stream = self.stream(messages, model, temperature, max_tokens)
+        try:
+            for text in stream:
+                yield text
+        finally:
+            stream.close()
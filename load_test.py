@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+동시 사용자 부하 테스트 스크립트
+가짜 백엔드로 N개 세션이 리뷰 → 히스토리 → 분석 → 피드백 흐름을 동시에 실행하며
+처리량, 지연 백분위수, 세션당 메모리 증가, 락 경합을 측정하고 파드 용량 보고서를 생성
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# 락 경합을 측정할 저장소 모듈 (이 모듈에 정의된 객체의 락만 계측)
+INSTRUMENTED_MODULES = {
+    "pipeline", "code_reviewer", "feedback_collector", "review_archive",
+    "near_duplicate", "review_search", "model_router", "review_history",
+    "scheduler", "admission"
+}
+
+FLOW_STEPS = ["review", "history", "analytics", "feedback"]
+
+SAMPLE_CODE = '''
+def {name}(items, limit={limit}):
+    result = []
+    for i in range(len(items)):
+        if items[i] > limit:
+            result.append(items[i] * {factor})
+    total = 0
+    for value in result:
+        total = total + value
+    return total / len(result)
+'''
+
+APP_REVIEW_BUTTON = "🚀 코드 리뷰 시작"
+APP_FEEDBACK_BUTTON = "📝 피드백 제출"
+
+
+# ----- 측정 도구 -----
+
+def current_rss_mb() -> float:
+    """현재 프로세스 RSS (MB, /proc가 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """백분위수 (최근접 순위)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class ContentionStats:
+    """락별 획득 횟수/경합 횟수/대기 시간 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.locks: Dict[str, Dict] = {}
+
+    def record(self, name: str, contended: bool, wait: float):
+        with self._lock:
+            entry = self.locks.setdefault(name, {"acquisitions": 0, "contended": 0, "wait_ms": 0.0, "max_wait_ms": 0.0})
+            entry["acquisitions"] += 1
+            if contended:
+                entry["contended"] += 1
+                entry["wait_ms"] += wait * 1000
+                entry["max_wait_ms"] = max(entry["max_wait_ms"], wait * 1000)
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {**entry,
+                       "wait_ms": round(entry["wait_ms"], 2),
+                       "max_wait_ms": round(entry["max_wait_ms"], 2),
+                       "contention_rate": round(entry["contended"] / entry["acquisitions"], 4)}
+                for name, entry in sorted(self.locks.items(), key=lambda item: -item[1]["wait_ms"])
+            }
+
+
+class TimedLock:
+    """threading.Lock 대체 (대기가 필요했던 획득만 경합으로 기록)"""
+
+    def __init__(self, name: str, lock, stats: ContentionStats):
+        self.name = name
+        self._lock = lock
+        self._stats = stats
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self._stats.record(self.name, False, 0.0)
+            return True
+        if not blocking:
+            self._stats.record(self.name, True, 0.0)
+            return False
+        started = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        self._stats.record(self.name, True, time.perf_counter() - started)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def _is_owned(self) -> bool:
+        # threading.Condition의 소유 확인 (Lock에 대한 기본 동작과 같되 획득으로 기록하지 않음)
+        if self._lock.acquire(False):
+            self._lock.release()
+            return False
+        return True
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+_LOCK_TYPES = (type(threading.Lock()), type(threading.RLock()))
+
+
+def instrument_locks(root, stats: ContentionStats, depth: int = 3, _seen: Optional[set] = None):
+    """
+    객체 그래프에서 저장소 모듈 객체의 Lock 속성을 TimedLock으로 교체
+
+    Args:
+        root: 계측할 객체 (보통 CodeReviewPipeline)
+        stats: 결과를 모을 ContentionStats
+        depth: 따라갈 속성 깊이
+    """
+    _seen = _seen if _seen is not None else set()
+    if id(root) in _seen or depth < 0 or type(root).__module__ not in INSTRUMENTED_MODULES:
+        return
+    _seen.add(id(root))
+
+    for attr, value in list(vars(root).items()):
+        name = f"{type(root).__name__}.{attr}"
+        if isinstance(value, _LOCK_TYPES):
+            setattr(root, attr, TimedLock(name, value, stats))
+        elif isinstance(value, TimedLock):
+            # 프로세스 공유 객체는 이전 측정에서 이미 계측됨 → 이번 측정 결과로 기록
+            value._stats = stats
+        elif isinstance(value, threading.Condition):
+            # 스케줄러의 Condition은 내부 락을 계측한 새 Condition으로 교체 (대기자가 없는 측정 전에만 호출)
+            if isinstance(value._lock, TimedLock):
+                value._lock._stats = stats
+            else:
+                setattr(root, attr, threading.Condition(TimedLock(name, value._lock, stats)))
+        else:
+            instrument_locks(value, stats, depth - 1, _seen)
+
+
+def instrument_shared_locks(stats: ContentionStats):
+    """파이프라인 객체 그래프에서 닿지 않는 프로세스 공유 싱글턴(스케줄러, 수용 제어, 지연 추적기)의 락 계측"""
+    from admission import shared_admission
+    from model_router import shared_latency_tracker
+    from scheduler import shared_scheduler
+
+    for shared in (shared_scheduler, shared_admission, shared_latency_tracker):
+        instrument_locks(shared, stats)
+
+
+class LatencyRecorder:
+    """단계별 지연/오류 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def measure(self, step: str, func: Callable) -> bool:
+        started = time.perf_counter()
+        try:
+            ok = func() is not False
+        except Exception as e:
+            print(f"⚠️ {step} 실패: {e}")
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.samples.setdefault(step, []).append(elapsed)
+            if not ok:
+                self.errors[step] = self.errors.get(step, 0) + 1
+        return ok
+
+    def summary(self, duration: float) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                step: {
+                    "count": len(samples),
+                    "errors": self.errors.get(step, 0),
+                    "throughput_per_s": round(len(samples) / duration, 2) if duration else 0.0,
+                    "p50_ms": round(percentile(samples, 50), 1),
+                    "p95_ms": round(percentile(samples, 95), 1),
+                    "p99_ms": round(percentile(samples, 99), 1),
+                    "max_ms": round(max(samples), 1)
+                }
+                for step, samples in self.samples.items()
+            }
+
+
+# ----- 가상 세션 -----
+
+def make_code(session: int, iteration: int, duplicate_ratio: float, rng: random.Random) -> str:
+    """세션별 리뷰 코드 (일부는 공통 코드로 재사용 경로도 측정)"""
+    if rng.random() < duplicate_ratio:
+        return SAMPLE_CODE.format(name="shared_average", limit=10, factor=2)
+    return SAMPLE_CODE.format(name=f"average_{session}_{iteration}", limit=session % 50, factor=iteration + 2)
+
+
+class PipelineSession:
+    """Streamlit 세션 하나처럼 자기 파이프라인을 가진 가상 사용자"""
+
+    def __init__(self, index: int, client, stats: ContentionStats):
+        from pipeline import CodeReviewPipeline
+        from review_history import ReviewHistory
+
+        self.index = index
+        self.pipeline = CodeReviewPipeline(client=client)
+        self.pipeline.start_new_session()
+        self.history = ReviewHistory(archive=self.pipeline.archive)
+        self.current_review = None
+        instrument_locks(self.pipeline, stats)
+
+    def review(self, code: str) -> bool:
+        result = self.pipeline.process_code_review(code, "Python", "comprehensive")
+        if result["success"]:
+            self.current_review = result
+            self.history.add(result)
+        return result["success"]
+
+    def history_page(self) -> bool:
+        self.history.query(page=1, page_size=10)
+        self.pipeline.archive.query(page=1, page_size=10)
+        return True
+
+    def analytics(self) -> bool:
+        self.pipeline.get_feedback_statistics()
+        self.pipeline.get_improvement_insights()
+        self.pipeline.get_feedback_timeseries("daily", 30)
+        self.pipeline.get_suggestions_page(1)
+        return True
+
+    def feedback(self, rng: random.Random) -> bool:
+        if not self.current_review:
+            return False
+        review = self.current_review
+        result = self.pipeline.collect_user_feedback(
+            review_result=review["review_result"],
+            user_code=review["code_snippet"],
+            language=review["language"],
+            rating=rng.randint(1, 5),
+            helpful=rng.random() < 0.7,
+            suggestions=rng.choice(["", "", "더 짧게 요약해 주세요", "예시 코드가 더 필요합니다"]),
+            review_type=review["review_type"],
+            archive_id=review.get("reused_from", review.get("archive_id"))
+        )
+        return result["success"]
+
+
+# AppTest는 프로세스 전역 Streamlit 런타임을 쓰므로 rerun을 한 번에 하나씩 실행
+# (대기 시간이 단계 지연에 포함되어 GIL에 묶인 단일 프로세스의 rerun 적체로 나타남)
+_APP_RERUN_LOCK = threading.Lock()
+
+
+class AppSession:
+    """Streamlit AppTest로 app.py 재실행(rerun)을 구동하는 가상 사용자"""
+
+    def __init__(self, index: int, client, stats: ContentionStats, timeout: int):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self._rerun_lock = TimedLock("AppTest.rerun", _APP_RERUN_LOCK, stats)
+        self.app = AppTest.from_file("app.py", default_timeout=timeout)
+        with self._rerun_lock:
+            self.app.run()
+        pipeline = self.app.session_state["pipeline"]
+        pipeline.reviewer.client = client
+        instrument_locks(pipeline, stats)
+
+    def _check(self) -> bool:
+        return not self.app.exception
+
+    def _click(self, label: str):
+        with self._rerun_lock:
+            next(button for button in self.app.button if button.label == label).click().run()
+
+    def _goto(self, page: str):
+        with self._rerun_lock:
+            self.app.selectbox(key="current_page").select(page).run()
+
+    def review(self, code: str) -> bool:
+        self._goto("review")
+        self.app.text_area[0].input(code)
+        self._click(APP_REVIEW_BUTTON)
+        return self._check()
+
+    def history_page(self) -> bool:
+        self._goto("history")
+        return self._check()
+
+    def analytics(self) -> bool:
+        self._goto("analytics")
+        return self._check()
+
+    def feedback(self, rng: random.Random) -> bool:
+        self._goto("feedback")
+        self.app.slider[0].set_value(rng.randint(1, 5))
+        self._click(APP_FEEDBACK_BUTTON)
+        return self._check()
+
+
+def run_level(users: int, args, workdir: str) -> Dict:
+    """동시 사용자 수 하나에 대한 부하 테스트"""
+    from fake_backend import FakeOpenAIClient
+
+    level_dir = os.path.join(workdir, f"users_{users}")
+    os.makedirs(level_dir, exist_ok=True)
+    os.chdir(level_dir)
+
+    if args.replay:
+        from cassette import ReplayClient
+        client = ReplayClient(args.replay, args.speed)
+    else:
+        client = FakeOpenAIClient(latency=args.backend_latency, tokens_per_second=args.tokens_per_second)
+    if args.record:
+        # 기록은 실제 OpenAI 호출로 (이후 --replay로 네트워크 없이 같은 부하 재현)
+        from cassette import RecordingClient
+        from config import Config
+        from openai import OpenAI
+        client = RecordingClient(OpenAI(api_key=Config.OPENAI_API_KEY), args.record)
+    stats = ContentionStats()
+    instrument_shared_locks(stats)
+    recorder = LatencyRecorder()
+    sessions: List = [None] * users
+    start_barrier = threading.Barrier(users)
+
+    gc.collect()
+    rss_before = current_rss_mb()
+
+    def user(index: int):
+        rng = random.Random(args.seed * 1000 + index)
+        session_holder = {}
+
+        def create():
+            if args.mode == "app":
+                session_holder["session"] = AppSession(index, client, stats, args.app_timeout)
+            else:
+                session_holder["session"] = PipelineSession(index, client, stats)
+
+        recorder.measure("session_start", create)
+        session = sessions[index] = session_holder.get("session")
+        start_barrier.wait()
+        if session is None:
+            return
+
+        for iteration in range(args.iterations):
+            code = make_code(index, iteration, args.duplicate_ratio, rng)
+            recorder.measure("review", lambda: session.review(code))
+            recorder.measure("history", session.history_page)
+            recorder.measure("analytics", session.analytics)
+            recorder.measure("feedback", lambda: session.feedback(rng))
+            if args.think_time:
+                time.sleep(rng.uniform(0, args.think_time))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), name=f"load-user-{i}") for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    # 세션 상태를 유지한 채 측정 (Streamlit도 세션이 살아 있는 동안 상태를 보관)
+    gc.collect()
+    rss_after = current_rss_mb()
+    steps = recorder.summary(duration)
+    total_ops = sum(steps.get(step, {}).get("count", 0) for step in FLOW_STEPS)
+    total_errors = sum(step["errors"] for step in steps.values())
+    del sessions
+
+    return {
+        "users": users,
+        "duration_s": round(duration, 2),
+        "flows_per_s": round(steps.get("feedback", {}).get("count", 0) / duration, 2),
+        "ops_per_s": round(total_ops / duration, 2),
+        "error_rate": round(total_errors / max(sum(s["count"] for s in steps.values()), 1), 4),
+        "steps": steps,
+        "rss_before_mb": round(rss_before, 1),
+        "rss_after_mb": round(rss_after, 1),
+        "rss_per_session_mb": round((rss_after - rss_before) / users, 2),
+        "locks": stats.summary(),
+        "backend_calls": client.chat.completions.call_count
+    }
+
+
+def capacity_report(levels: List[Dict], slo_ms: float, max_error_rate: float, headroom: float) -> Dict:
+    """SLO를 만족하는 최대 동시 세션 수와 파드 메모리 권장값"""
+    passing = [
+        level for level in levels
+        if level["error_rate"] <= max_error_rate
+        and all(level["steps"].get(step, {}).get("p95_ms", 0) <= slo_ms for step in FLOW_STEPS if step != "review")
+    ]
+    best = max(passing, key=lambda level: level["users"]) if passing else None
+    per_session = max((level["rss_per_session_mb"] for level in levels), default=0.0)
+    baseline = min((level["rss_before_mb"] for level in levels), default=0.0)
+
+    report = {
+        "slo_p95_ms": slo_ms,
+        "max_error_rate": max_error_rate,
+        "max_sessions_per_pod": best["users"] if best else 0,
+        "baseline_rss_mb": baseline,
+        "rss_per_session_mb": per_session,
+    }
+    if best:
+        sessions = best["users"]
+        report["recommended_memory_mb"] = round((baseline + per_session * sessions) * headroom)
+        report["review_p95_ms_at_capacity"] = best["steps"]["review"]["p95_ms"]
+        report["flows_per_s_at_capacity"] = best["flows_per_s"]
+    return report
+
+
+def print_level(level: Dict):
+    print(f"\n👥 동시 세션 {level['users']}명 ({level['duration_s']}s, 흐름 {level['flows_per_s']}/s, "
+          f"오류율 {level['error_rate'] * 100:.1f}%)")
+    for step, result in level["steps"].items():
+        print(f"  • {step:<13} {result['count']:>5}회  p50 {result['p50_ms']:>8.1f}ms  "
+              f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  오류 {result['errors']}")
+    print(f"  • 메모리: {level['rss_before_mb']}MB → {level['rss_after_mb']}MB "
+          f"(세션당 {level['rss_per_session_mb']}MB)")
+    contended = [(name, lock) for name, lock in level["locks"].items() if lock["contended"]]
+    if contended:
+        for name, lock in contended[:5]:
+            print(f"  • 락 {name}: 경합 {lock['contended']}/{lock['acquisitions']}회, "
+                  f"대기 합계 {lock['wait_ms']}ms (최대 {lock['max_wait_ms']}ms)")
+    else:
+        print("  • 락 경합 없음")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="동시 사용자 부하 테스트")
+    parser.add_argument("--mode", choices=["pipeline", "app"], default="pipeline",
+                        help="pipeline: 세션별 파이프라인 직접 호출, app: Streamlit AppTest rerun")
+    parser.add_argument("--users", default="1,5,10,20", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--iterations", type=int, default=3, help="세션당 흐름 반복 횟수")
+    parser.add_argument("--think-time", type=float, default=0.0, help="흐름 사이 최대 대기 (초)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="공통 코드 제출 비율")
+    parser.add_argument("--backend-latency", type=float, default=0.2, help="가짜 백엔드 첫 응답 지연 (초)")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="가짜 백엔드 생성 속도")
+    parser.add_argument("--replay", metavar="CASSETTE", help="가짜 백엔드 대신 재생할 기록 파일 (cassette.py)")
+    parser.add_argument("--record", metavar="CASSETTE", help="실제 OpenAI 호출을 기록할 파일")
+    parser.add_argument("--speed", default="original", help="재생 속도 (original, max 또는 배속)")
+    parser.add_argument("--app-timeout", type=int, default=60, help="app 모드 rerun 타임아웃 (초)")
+    parser.add_argument("--slo-ms", type=float, default=1000.0,
+                        help="review 외 단계(rerun)의 p95 지연 목표 (ms)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--headroom", type=float, default=1.3, help="메모리 권장값 여유 배수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="데이터 파일 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, repo_dir)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    # 단계마다 작업 디렉터리를 바꾸므로 기록 파일은 절대 경로로
+    args.replay = os.path.abspath(args.replay) if args.replay else None
+    args.record = os.path.abspath(args.record) if args.record else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="load_test_")
+    # app 모드에서 API 키 없이 세션 파이프라인을 만들 수 있도록 가짜 백엔드 사용 (config import 전에 설정)
+    os.environ.setdefault("USE_FAKE_BACKEND", "true")
+
+    print("=" * 50)
+    print(f"🏋️  동시 사용자 부하 테스트 ({args.mode} 모드, 데이터: {workdir})")
+    print("=" * 50)
+
+    # import/캐시 비용이 첫 단계의 세션당 메모리에 섞이지 않도록 한 번 미리 실행
+    run_level(1, argparse.Namespace(**{**vars(args), "iterations": 1}), os.path.join(workdir, "warmup"))
+
+    levels = []
+    for users in [int(value) for value in args.users.split(",") if value.strip()]:
+        level = run_level(users, args, workdir)
+        print_level(level)
+        levels.append(level)
+    os.chdir(repo_dir)
+
+    report = capacity_report(levels, args.slo_ms, args.max_error_rate, args.headroom)
+    print("\n📦 용량 보고서")
+    print(f"  • 파드당 최대 동시 세션: {report['max_sessions_per_pod']}명 "
+          f"(rerun p95 ≤ {args.slo_ms:.0f}ms, 오류율 ≤ {args.max_error_rate * 100:.1f}%)")
+    print(f"  • 기본 메모리 {report['baseline_rss_mb']}MB + 세션당 {report['rss_per_session_mb']}MB")
+    if "recommended_memory_mb" in report:
+        print(f"  • 권장 메모리 요청: {report['recommended_memory_mb']}MB (여유 {args.headroom}배)")
+        print(f"  • 용량 시점 리뷰 p95: {report['review_p95_ms_at_capacity']}ms, "
+              f"흐름 처리량 {report['flows_per_s_at_capacity']}/s")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "levels": levels, "capacity": report}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {json_path}")
+
+    sys.exit(0 if report["max_sessions_per_pod"] else 1)
+
+
+if __name__ == "__main__":
+    main()
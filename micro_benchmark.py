@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+로컬 핫패스 마이크로 벤치마크 스크립트
+LLM 호출 없이 매 요청/재실행마다 도는 함수(입력 검증, 코드 통계, 피드백 통계/인사이트,
+세션 관리, 히스토리 필터링)를 합성 데이터로 측정하고 저장된 기준값과 비교
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from config import Config
+from feedback_collector import FeedbackCollector, SessionManager
+from llm_backend import DeterministicBackend
+from review_history import ReviewHistory
+
+DEFAULT_RECORD_SIZES = "10,1000,100000,1000000"
+# pipeline._validate_code_input의 입력 한도 (10,000자)
+DEFAULT_SNIPPET_SIZES = "100,1000,10000"
+# 히스토리/세션은 메모리에 요약을 들고 있으므로 레코드 수를 따로 제한
+DEFAULT_MAX_HISTORY = 100000
+DEFAULT_BASELINE_FILE = "benchmark_baseline.json"
+
+REVIEW_TYPES = ["comprehensive", "test_cases"]
+GENERATE_CHUNK = 50000
+# 측정 한 번이 이 시간(초)보다 짧으면 여러 번 호출해 평균
+MIN_SAMPLE_SECONDS = 0.01
+
+SNIPPET_LINES = [
+    "def process(items, threshold=10):",
+    "    result = []",
+    "    for index, item in enumerate(items):",
+    "        if item > threshold:",
+    "            result.append(item * 2)",
+    "",
+    "    # 결과 반환",
+    "    return result",
+    ""
+]
+
+
+def make_snippet(chars: int) -> str:
+    """지정한 글자 수의 합성 코드"""
+    lines = []
+    total = 0
+    while total < chars:
+        line = SNIPPET_LINES[len(lines) % len(SNIPPET_LINES)]
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)[:chars]
+
+
+def iter_feedback_entries(count: int, seed: int = 0):
+    """최근 1년에 걸친 합성 피드백 기록 (GENERATE_CHUNK개씩 목록으로)"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    chunk = []
+    for index in range(count):
+        timestamp = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        entry = {
+            "timestamp": timestamp.isoformat(),
+            "language": rng.choice(Config.SUPPORTED_LANGUAGES),
+            "review_type": rng.choice(REVIEW_TYPES),
+            "rating": rng.randint(1, 5),
+            "helpful": rng.random() < 0.7,
+            "suggestions": f"제안 {index}" if rng.random() < 0.1 else ""
+        }
+        chunk.append(entry)
+        if len(chunk) >= GENERATE_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def make_review(index: int, rng: random.Random) -> dict:
+    """히스토리/세션에 넣을 합성 리뷰 결과"""
+    return {
+        "language": rng.choice(Config.SUPPORTED_LANGUAGES),
+        "review_type": rng.choice(REVIEW_TYPES),
+        "timestamp": f"2026-01-01T00:00:{index % 60:02d}",
+        "code_snippet": SNIPPET_LINES[0],
+        "review_result": "## 🚨 오류 및 버그\n- 문제 없음"
+    }
+
+
+def measure(func, repeat: int) -> dict:
+    """실행 시간 중앙값(호출당)과 할당 피크 측정"""
+    func()  # 워밍업
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or number >= 1000000:
+            break
+        number *= 10
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "min_ms": round(min(samples) * 1000, 4),
+        "peak_kb": round(peak / 1024, 1),
+        "calls": number * repeat
+    }
+
+
+def bench_code_input(pipeline, sizes, repeat: int) -> dict:
+    """입력 검증과 코드 통계 (스니펫 크기별)"""
+    results = {}
+    for chars in sizes:
+        snippet = make_snippet(chars)
+        results[f"validate_code_input[chars={chars}]"] = measure(
+            lambda: pipeline._validate_code_input(snippet, "Python"), repeat
+        )
+        results[f"analyze_code_stats[chars={chars}]"] = measure(
+            lambda: pipeline._analyze_code_stats(snippet), repeat
+        )
+    return results
+
+
+def bench_feedback(workdir: str, sizes, repeat: int) -> dict:
+    """피드백 통계와 개선 인사이트 (피드백 기록 수별)"""
+    results = {}
+    for count in sizes:
+        prefix = os.path.join(workdir, f"feedback_{count}")
+        collector = FeedbackCollector(
+            feedback_file=f"{prefix}.jsonl",
+            rollup_file=f"{prefix}.db",
+            column_dir=f"{prefix}_columns"
+        )
+        start = time.perf_counter()
+        for chunk in iter_feedback_entries(count):
+            collector.rollup.add_entries(chunk)
+        print(f"  · 합성 피드백 {count:,}건 준비 ({time.perf_counter() - start:.1f}초)")
+
+        results[f"feedback_statistics[records={count}]"] = measure(collector.get_feedback_statistics, repeat)
+        results[f"improvement_insights[records={count}]"] = measure(collector.get_improvement_insights, repeat)
+    return results
+
+
+def bench_sessions(sizes, repeat: int) -> dict:
+    """세션 시작, 리뷰 추가, 세션 히스토리 조회 (세션당 리뷰 수별)"""
+    results = {}
+    rng = random.Random(0)
+    for count in sizes:
+        reviews = [make_review(index, rng) for index in range(count)]
+
+        def session_ops():
+            manager = SessionManager()
+            manager.start_session("bench")
+            for review in reviews:
+                manager.add_review_to_session("bench", review)
+            manager.get_session_history("bench")
+
+        results[f"session_ops[reviews={count}]"] = measure(session_ops, repeat)
+    return results
+
+
+def bench_history(sizes, repeat: int) -> dict:
+    """히스토리 필터링/페이지 조회 (히스토리 리뷰 수별)"""
+    results = {}
+    rng = random.Random(0)
+    for count in sizes:
+        history = ReviewHistory()
+        for index in range(count):
+            history.add(make_review(index, rng))
+
+        def query_pages():
+            # 필터 없음, 언어, 유형, 언어+유형 조합을 첫/가운데 페이지로 조회
+            for language, review_type in ((None, None), ("Python", None),
+                                          (None, "test_cases"), ("Python", "comprehensive")):
+                first = history.query(language, review_type, page=1, page_size=20)
+                history.query(language, review_type, page=first["total_pages"] // 2 + 1, page_size=20)
+
+        results[f"history_query[reviews={count}]"] = measure(query_pages, repeat)
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float,
+                          min_delta_ms: float, min_delta_kb: float) -> list:
+    """기준값 대비 tolerance배를 넘고 잡음 한도보다 크게 느려지거나 커진 항목 목록"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if (current["median_ms"] > previous["median_ms"] * tolerance
+                and current["median_ms"] - previous["median_ms"] > min_delta_ms):
+            regressions.append(
+                f"{name}: {current['median_ms']:.4f}ms (기준 {previous['median_ms']:.4f}ms, "
+                f"{current['median_ms'] / max(previous['median_ms'], 1e-9):.1f}배)"
+            )
+        if (current["peak_kb"] > previous["peak_kb"] * tolerance
+                and current["peak_kb"] - previous["peak_kb"] > min_delta_kb):
+            regressions.append(
+                f"{name}: 할당 피크 {current['peak_kb']:.1f}KB (기준 {previous['peak_kb']:.1f}KB)"
+            )
+    return regressions
+
+
+def _parse_sizes(value: str) -> list:
+    return [int(size) for size in value.split(",") if size.strip()]
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="로컬 핫패스 마이크로 벤치마크")
+    parser.add_argument("--records", default=DEFAULT_RECORD_SIZES,
+                        help="피드백 기록 수 목록 (쉼표 구분)")
+    parser.add_argument("--snippets", default=DEFAULT_SNIPPET_SIZES,
+                        help="코드 스니펫 글자 수 목록 (쉼표 구분)")
+    parser.add_argument("--max-history", type=int, default=DEFAULT_MAX_HISTORY,
+                        help="세션/히스토리 측정에 사용할 최대 리뷰 수")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE, help="기준값 JSON 파일 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="기준값 대비 허용 배율 (넘으면 실패)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="이보다 작은 시간 차이는 잡음으로 무시 (ms)")
+    parser.add_argument("--min-delta-kb", type=float, default=64.0,
+                        help="이보다 작은 할당 피크 차이는 잡음으로 무시 (KB)")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("🔬 로컬 핫패스 마이크로 벤치마크")
+    print("=" * 50)
+
+    record_sizes = _parse_sizes(args.records)
+    history_sizes = [size for size in record_sizes if size <= args.max_history]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 파이프라인이 만드는 아카이브/인덱스 파일이 작업 디렉터리를 더럽히지 않도록 임시 디렉터리에서 생성
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            from pipeline import CodeReviewPipeline
+            pipeline = CodeReviewPipeline(backend=DeterministicBackend())
+            results.update(bench_code_input(pipeline, _parse_sizes(args.snippets), args.repeat))
+            results.update(bench_feedback(workdir, record_sizes, args.repeat))
+            results.update(bench_sessions(history_sizes, args.repeat))
+            results.update(bench_history(history_sizes, args.repeat))
+        finally:
+            os.chdir(cwd)
+
+    for name, result in results.items():
+        print(f"• {name}: {result['median_ms']:.4f}ms (최소 {result['min_ms']:.4f}ms, "
+              f"할당 피크 {result['peak_kb']:.1f}KB)")
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results
+    }
+
+    failures = []
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준값 저장: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != report["machine"]:
+            print(f"⚠️ 기준값이 다른 환경에서 측정되었습니다: {baseline.get('machine')}")
+        failures = compare_with_baseline(results, baseline, args.tolerance,
+                                         args.min_delta_ms, args.min_delta_kb)
+    else:
+        print(f"ℹ️ 기준값 파일이 없습니다: {args.baseline} (--save-baseline으로 생성)")
+
+    report["failures"] = failures
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ 기준값 대비 성능 회귀가 없습니다.")
+
+
+if __name__ == "__main__":
+    main()
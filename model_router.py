@@ -0,0 +1,212 @@
+"""
+모델 라우팅 모듈
+코드 통계, 리뷰 유형, 백엔드 지연 시간을 바탕으로 모델 티어와 생성 파라미터 선택
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from code_reviewer import scale_token_budget
+from config import Config
+from file_lock import locked_path
+
+
+TIER_ORDER = ["fast", "balanced", "strong"]
+
+# 리뷰 유형별 temperature (기존 CodeReviewHelper 기본값과 동일)
+REVIEW_TYPE_TEMPERATURES = {
+    "comprehensive": 0.7,
+    "quick_fix": 0.3,
+    "test_cases": 0.5,
+    "diff": 0.3
+}
+
+# 리뷰 유형별 max_tokens 산정 (기본값 + 코드 라인당 추가 토큰)
+REVIEW_TYPE_TOKEN_BUDGETS = {
+    "comprehensive": (1000, 12),
+    "quick_fix": (500, 8),
+    "test_cases": (700, 10),
+    "diff": (400, 6)
+}
+
+# 복잡도 추정값별 기본 티어 (종합 리뷰 기준)
+COMPLEXITY_TIERS = {
+    "낮음": "fast",
+    "보통": "balanced",
+    "높음": "strong",
+    "매우 높음": "strong"
+}
+
+
+class LatencyTracker:
+    """티어별 응답 지연 이동 평균 추적 클래스"""
+
+    def __init__(self,
+                 alpha: float = 0.3,
+                 max_age: float = Config.ROUTING_LATENCY_MAX_AGE_SECONDS,
+                 probe_interval: int = Config.ROUTING_PROBE_INTERVAL):
+        """
+        Args:
+            alpha: 지수 이동 평균 가중치 (클수록 최근 값 반영이 빠름)
+            max_age: 이 시간(초) 동안 새 관측이 없으면 이동 평균을 버림 (느려서 피한 티어도 다시 시도)
+            probe_interval: 예산 초과로 피하는 티어도 이 횟수마다 한 번은 그대로 사용해 지연을 다시 측정
+        """
+        self.alpha = alpha
+        self.max_age = max_age
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._ewma: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self._skipped: Dict[str, int] = {}
+
+    def observe(self, tier: str, latency: float):
+        """응답 지연 기록"""
+        with self._lock:
+            previous = self._ewma.get(tier)
+            self._ewma[tier] = latency if previous is None else (
+                self.alpha * latency + (1 - self.alpha) * previous
+            )
+            self._updated[tier] = time.monotonic()
+
+    def get(self, tier: str) -> Optional[float]:
+        """티어의 현재 이동 평균 지연 (관측 전이거나 오래되었으면 None)"""
+        with self._lock:
+            if tier in self._ewma and time.monotonic() - self._updated[tier] > self.max_age:
+                del self._ewma[tier]
+            return self._ewma.get(tier)
+
+    def should_probe(self, tier: str) -> bool:
+        """예산을 넘은 티어를 이번 요청에서 다시 측정할지 (probe_interval번마다 한 번)"""
+        if self.probe_interval <= 0:
+            return False
+        with self._lock:
+            count = self._skipped.get(tier, 0) + 1
+            self._skipped[tier] = 0 if count >= self.probe_interval else count
+            return count >= self.probe_interval
+
+
+# 프로세스 내 모든 세션이 같은 백엔드 지연 정보를 공유
+shared_latency_tracker = LatencyTracker()
+
+
+class ModelRouter:
+    """요청별 모델 티어/생성 파라미터 선택 클래스"""
+
+    def __init__(self,
+                 tiers: Optional[Dict] = None,
+                 latency_tracker: Optional[LatencyTracker] = None,
+                 log_file: Optional[str] = Config.ROUTING_LOG_FILE,
+                 log_max_bytes: int = Config.ROUTING_LOG_MAX_BYTES):
+        """
+        라우터 초기화
+
+        Args:
+            tiers: 티어 설정 (없으면 Config.MODEL_TIERS)
+            latency_tracker: 지연 추적기 (없으면 프로세스 공유 추적기)
+            log_file: 라우팅 결정을 기록할 JSON Lines 파일 (None이면 기록 안 함)
+            log_max_bytes: 로그가 이 크기를 넘으면 log_file + ".1"로 교체 (교체본은 하나만 유지)
+        """
+        self.tiers = tiers or Config.MODEL_TIERS
+        self.latency_tracker = latency_tracker or shared_latency_tracker
+        self.log_file = log_file
+        self.log_max_bytes = log_max_bytes
+
+    def _base_tier(self, review_type: str, code_stats: Dict) -> str:
+        """코드 통계와 리뷰 유형으로 기본 티어 결정"""
+        lines = code_stats.get("non_empty_lines", 0)
+
+        if review_type == "quick_fix":
+            # 빠른 수정은 대화형 응답 속도가 우선
+            return "fast" if lines < 200 else "balanced"
+
+        tier = COMPLEXITY_TIERS.get(code_stats.get("estimated_complexity"), "balanced")
+        if review_type == "test_cases" and tier == "fast" and lines >= 5:
+            # 테스트 생성은 짧은 코드라도 엣지 케이스 추론이 필요
+            tier = "balanced"
+        return tier
+
+    def route(self, review_type: str, code_stats: Dict, category_count: Optional[int] = None,
+              max_tier: Optional[str] = None) -> Dict:
+        """
+        모델 티어와 생성 파라미터 선택
+
+        Args:
+            review_type: 리뷰 유형 ("comprehensive", "quick_fix", "test_cases", "diff")
+            code_stats: _analyze_code_stats 결과
+            category_count: 종합 리뷰에서 생성할 카테고리 수 (없으면 전체)
+            max_tier: 사용할 수 있는 가장 높은 티어 (과부하 시 가벼운 리뷰로 낮출 때)
+
+        Returns:
+            라우팅 결정 (tier, model, temperature, max_tokens, reason)
+        """
+        tier = self._base_tier(review_type, code_stats)
+        reason = f"{code_stats.get('estimated_complexity', '?')} 복잡도, {code_stats.get('non_empty_lines', 0)}줄"
+        if max_tier and TIER_ORDER.index(tier) > TIER_ORDER.index(max_tier):
+            reason += f", 과부하로 {max_tier} 사용"
+            tier = max_tier
+
+        # 선택한 티어가 느려져 있으면 예산 안에 있는 더 빠른 티어로 낮춤
+        while TIER_ORDER.index(tier) > 0:
+            latency = self.latency_tracker.get(tier)
+            if latency is None or latency <= self.tiers[tier]["latency_budget"]:
+                break
+            if self.latency_tracker.should_probe(tier):
+                # 피하기만 하면 이동 평균이 갱신되지 않으므로 가끔은 그대로 보내 회복 여부 확인
+                reason += f", {tier} 지연 {latency:.1f}s 재측정"
+                break
+            lower = TIER_ORDER[TIER_ORDER.index(tier) - 1]
+            reason += f", {tier} 지연 {latency:.1f}s 초과로 {lower} 사용"
+            tier = lower
+
+        base_tokens, per_line = REVIEW_TYPE_TOKEN_BUDGETS.get(review_type, REVIEW_TYPE_TOKEN_BUDGETS["comprehensive"])
+        max_tokens = min(
+            base_tokens + per_line * code_stats.get("non_empty_lines", 0),
+            self.tiers[tier]["max_tokens"]
+        )
+        if review_type == "comprehensive" and category_count is not None:
+            max_tokens = scale_token_budget(max_tokens, category_count)
+
+        return {
+            "tier": tier,
+            "model": self.tiers[tier]["model"],
+            "temperature": REVIEW_TYPE_TEMPERATURES.get(review_type, 0.7),
+            "max_tokens": max_tokens,
+            "reason": reason
+        }
+
+    def record(self, decision: Dict, review_type: str, code_stats: Dict, latency: float, success: bool):
+        """
+        라우팅 결과 기록 (지연 추적 + 분석용 로그)
+
+        Args:
+            decision: route 결과
+            review_type: 리뷰 유형
+            code_stats: 코드 통계
+            latency: 실제 응답 시간 (초)
+            success: 호출 성공 여부
+        """
+        if success:
+            self.latency_tracker.observe(decision["tier"], latency)
+
+        if not self.log_file:
+            return
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "review_type": review_type,
+            "code_stats": code_stats,
+            **decision,
+            "latency": round(latency, 3),
+            "success": success
+        }
+        try:
+            # 여러 세션/프로세스가 같은 로그에 쓰므로 교체와 추가를 파일 잠금으로 직렬화
+            with locked_path(self.log_file):
+                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) >= self.log_max_bytes:
+                    os.replace(self.log_file, self.log_file + ".1")
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"라우팅 로그 저장 중 오류: {e}")
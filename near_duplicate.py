@@ -0,0 +1,369 @@
+"""
+유사 코드 탐지 모듈
+토큰 정규화 + MinHash 지문 + LSH 인덱스로 거의 동일한 코드의 이전 리뷰를 찾음
+"""
+import ast
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import tokenize
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16                      # 밴드당 8행 → 유사도 약 0.7 이상부터 후보로 잡힘
+SHINGLE_SIZE = 5
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 고정 시드로 만든 해시 순열 계수 (프로세스가 달라도 같은 지문을 생성해야 함)
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# 식별자로 취급하지 않을 공통 키워드 (Python 외 언어용)
+_COMMON_KEYWORDS = {
+    "if", "else", "for", "while", "do", "switch", "case", "break", "continue", "return",
+    "function", "func", "fn", "def", "class", "struct", "interface", "enum", "impl", "trait",
+    "public", "private", "protected", "static", "final", "const", "let", "var", "val", "mut",
+    "new", "delete", "try", "catch", "finally", "throw", "throws", "import", "package", "use",
+    "from", "extends", "implements", "this", "self", "super", "null", "nil", "None", "true",
+    "false", "void", "int", "long", "float", "double", "char", "bool", "boolean", "string",
+    "async", "await", "yield", "in", "of", "not", "and", "or", "end", "begin", "module",
+}
+
+_COMMENT_PATTERN = re.compile(r"/\*.*?\*/|//[^\n]*|#[^\n]*", re.DOTALL)
+_TOKEN_PATTERN = re.compile(r"""[A-Za-z_]\w*|\d+(?:\.\d+)?|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\S""")
+
+
+def _python_bound_names(code: str) -> Optional[set]:
+    """코드 안에서 바인딩되는 지역 이름 (매개변수, 대입/반복/with/except 대상)"""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    bound = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+    return bound
+
+
+def _python_tokens(code: str) -> List[str]:
+    """Python 토크나이저 기반 토큰 목록 (주석/공백 제외, 지역 이름만 ("ID", 이름))"""
+    bound = _python_bound_names(code)
+    if bound is None:
+        raise SyntaxError("파싱할 수 없는 Python 코드")
+    tokens = []
+    skipped = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+               tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER}
+    previous = None
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type in skipped:
+            continue
+        if token.type == tokenize.STRING:
+            tokens.append("STR")
+        elif token.type == tokenize.NAME and token.string in bound and previous != ".":
+            tokens.append(("ID", token.string))
+        else:
+            tokens.append(token.string)
+        previous = token.string
+    return tokens
+
+
+def _generic_bound_names(tokens: List[str]) -> set:
+    """
+    정규식 토큰에서 지역 이름 추정
+    (대입 대상, 선언 괄호 안에서 , ) : = 앞에 오는 매개변수 이름)
+    """
+    bound = set()
+    for index, token in enumerate(tokens[:-1]):
+        following = tokens[index + 1]
+        after = tokens[index + 2] if index + 2 < len(tokens) else ""
+        if not _is_identifier(token) or (index > 0 and tokens[index - 1] == "."):
+            continue
+        # x = ... (==, => 제외), for (x of/in ...)
+        if (following == "=" and after not in ("=", ">")) or following in ("of", "in"):
+            bound.add(token)
+
+    # 선언 괄호: ( ... ) 뒤에 { 또는 => / -> 가 오는 경우
+    depth_starts = []
+    for index, token in enumerate(tokens):
+        if token == "(":
+            depth_starts.append(index)
+        elif token == ")" and depth_starts:
+            start = depth_starts.pop()
+            following = tokens[index + 1:index + 3]
+            if following[:1] == ["{"] or following in (["=", ">"], ["-", ">"]):
+                for inner in range(start + 1, index):
+                    if (_is_identifier(tokens[inner]) and tokens[inner - 1] != "."
+                            and tokens[inner + 1] in (",", ")", ":", "=")):
+                        bound.add(tokens[inner])
+    return bound
+
+
+def _is_identifier(token: str) -> bool:
+    return (token[0].isalpha() or token[0] == "_") and token not in _COMMON_KEYWORDS
+
+
+def _generic_tokens(code: str) -> List[str]:
+    """정규식 기반 토큰 목록 (C 계열/스크립트 언어 주석 제거, 지역 이름만 ("ID", 이름))"""
+    raw = ["STR" if token[0] in "\"'" else token
+           for token in _TOKEN_PATTERN.findall(_COMMENT_PATTERN.sub(" ", code))]
+    bound = _generic_bound_names(raw)
+    tokens = []
+    for index, token in enumerate(raw):
+        if token in bound and not (index > 0 and raw[index - 1] == "."):
+            tokens.append(("ID", token))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_code(code: str, language: str) -> List[str]:
+    """
+    코드 정규화
+
+    공백, 주석, 문자열 리터럴 내용의 차이를 없애고 지역 이름(매개변수, 대입 대상)만
+    등장 순서대로 ID0, ID1, ...로 바꿔 변수명만 바뀐 코드도 같은 토큰열이 되도록 합니다.
+    내장 함수, 속성/메서드 이름, 호출 대상은 그대로 두어 동작이 다른 코드는 구분됩니다.
+
+    Args:
+        code: 원본 코드
+        language: 프로그래밍 언어
+
+    Returns:
+        정규화된 토큰 목록
+    """
+    tokens = None
+    if language == "Python":
+        try:
+            tokens = _python_tokens(code)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            tokens = None
+    if tokens is None:
+        tokens = _generic_tokens(code)
+
+    names: Dict[str, str] = {}
+    normalized = []
+    for token in tokens:
+        if isinstance(token, tuple):
+            token = names.setdefault(token[1], f"ID{len(names)}")
+        normalized.append(token)
+    return normalized
+
+
+@lru_cache(maxsize=64)
+def _cached_signature(code: str, language: str) -> Tuple[int, ...]:
+    tokens = normalize_code(code, language)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+        for shingle in shingles
+    ]
+    return tuple(
+        min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def compute_signature(code: str, language: str) -> List[int]:
+    """
+    MinHash 지문 계산 (검색 후 바로 인덱스에 추가하는 경우를 위해 최근 결과 캐시)
+
+    Args:
+        code: 원본 코드
+        language: 프로그래밍 언어
+
+    Returns:
+        NUM_PERMUTATIONS 길이의 MinHash 값 목록
+    """
+    return list(_cached_signature(code, language))
+
+
+def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """두 MinHash 지문의 자카드 유사도 추정"""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+
+class NearDuplicateIndex:
+    """MinHash LSH 기반 유사 코드 인덱스 클래스"""
+
+    def __init__(self, index_file: Optional[str] = Config.NEAR_DUPLICATE_INDEX_FILE):
+        """
+        인덱스 초기화
+
+        Args:
+            index_file: 지문을 추가 기록할 JSON Lines 파일 경로 (None이면 메모리 전용)
+        """
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._signatures: Dict[int, Tuple[List[int], str, str]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._load()
+
+    def _load(self):
+        """저장된 지문 로드"""
+        if not self.index_file or not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._insert(entry["id"], entry["signature"], entry["language"], entry["review_type"])
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"유사 코드 인덱스 로드 중 오류: {e}")
+
+    @staticmethod
+    def _band_keys(signature: List[int]):
+        rows = len(signature) // LSH_BANDS
+        for band in range(LSH_BANDS):
+            yield band, tuple(signature[band * rows:(band + 1) * rows])
+
+    def _insert(self, entry_id: int, signature: List[int], language: str, review_type: str):
+        self._signatures[entry_id] = (signature, language, review_type)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(entry_id)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def add(self, entry_id: int, code: str, language: str, review_type: str):
+        """
+        코드 지문 추가
+
+        Args:
+            entry_id: 리뷰 아카이브 ID
+            code: 리뷰한 코드
+            language: 프로그래밍 언어
+            review_type: 리뷰 유형
+        """
+        signature = compute_signature(code, language)
+        with self._lock:
+            self._insert(entry_id, signature, language, review_type)
+            if self.index_file:
+                try:
+                    with open(self.index_file, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps({
+                            "id": entry_id,
+                            "language": language,
+                            "review_type": review_type,
+                            "signature": signature
+                        }) + "\n")
+                except Exception as e:
+                    print(f"유사 코드 인덱스 저장 중 오류: {e}")
+
+    def find_similar(self,
+                     code: str,
+                     language: str,
+                     review_type: str,
+                     threshold: float = Config.NEAR_DUPLICATE_THRESHOLD) -> Optional[Dict]:
+        """
+        가장 유사한 이전 코드 검색
+
+        Args:
+            code: 새로 제출된 코드
+            language: 프로그래밍 언어
+            review_type: 리뷰 유형 (같은 유형의 리뷰만 재사용)
+            threshold: 최소 유사도 (0~1)
+
+        Returns:
+            {"id", "similarity"} 또는 None
+        """
+        signature = compute_signature(code, language)
+        best = None
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            for entry_id in candidates:
+                other, other_language, other_type = self._signatures[entry_id]
+                if other_language != language or other_type != review_type:
+                    continue
+                similarity = estimate_similarity(signature, other)
+                # 동점이면 더 최근 리뷰 우선
+                if similarity >= threshold and (best is None or (similarity, entry_id) > (best["similarity"], best["id"])):
+                    best = {"id": entry_id, "similarity": similarity}
+
+        return best
+
+
+_shared_index: Optional[NearDuplicateIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def shared_duplicate_index() -> NearDuplicateIndex:
+    """프로세스 공유 인덱스 (세션마다 파일을 다시 읽지 않고 다른 세션의 추가도 바로 검색됨)"""
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = NearDuplicateIndex()
+        return _shared_index
+
+
+# 정규화 점검용 코드 쌍 (코드 A, 코드 B, 언어, 재사용되어야 하는지)
+CHECK_CASES = [
+    ("def f(xs, a):\n    xs.append(max(a))\n    return xs\n",
+     "def f(xs, a):\n    xs.remove(min(a))\n    return xs\n", "Python", False),
+    ("def load(path):\n    with open(path) as f:\n        return json.load(f)\n",
+     "def load(path):\n    with open(path) as f:\n        return yaml.safe_load(f)\n", "Python", False),
+    ("def total(items):\n    s = 0\n    for it in items:\n        s += it.price\n    return s\n",
+     "def total(rows):\n    acc = 0\n    for r in rows:\n        acc += r.price\n    return acc\n", "Python", True),
+    ("function f(xs, a) { xs.push(Math.max(a)); return xs; }",
+     "function f(xs, a) { xs.pop(Math.min(a)); return xs; }", "JavaScript", False),
+    ("function sum(items) { let t = 0; for (const x of items) { t += x.v; } return t; }",
+     "function sum(rows) { let acc = 0; for (const r of rows) { acc += r.v; } return acc; }", "JavaScript", True),
+]
+
+
+def check_normalization(threshold: float = Config.NEAR_DUPLICATE_THRESHOLD) -> List[str]:
+    """CHECK_CASES의 유사도가 기대와 다른 항목 목록 (동작이 다른 코드는 threshold 미만이어야 함)"""
+    failures = []
+    for index, (code_a, code_b, language, duplicate) in enumerate(CHECK_CASES):
+        similarity = estimate_similarity(compute_signature(code_a, language), compute_signature(code_b, language))
+        if (similarity >= threshold) != duplicate:
+            expected = "이상" if duplicate else "미만"
+            failures.append(f"#{index} ({language}) 유사도 {similarity:.2f} (기대: {threshold} {expected})")
+    return failures
+
+
+def main():
+    """메인 함수"""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="유사 코드 탐지 점검")
+    parser.add_argument("command", choices=["check"], help="check: 정규화 점검 (동작이 다른 코드가 재사용되지 않는지)")
+    parser.add_argument("--threshold", type=float, default=Config.NEAR_DUPLICATE_THRESHOLD)
+    args = parser.parse_args()
+
+    failures = check_normalization(args.threshold)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ 점검 {len(CHECK_CASES)}건 통과 (임계값 {args.threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,25 +2,50 @@
 코드 리뷰 챗봇 파이프라인
 전체 코드 리뷰 프로세스를 관리하는 파이프라인
 """
-from typing import Dict, List, Optional, Tuple
-from code_reviewer import CodeReviewHelper
+from typing import Callable, Dict, List, Optional, Tuple
+from cancellation import CancellationToken
+from code_reviewer import (CodeReviewHelper, ReviewCancelled, ReviewError, measure_backend_time, resolve_categories,
+                           split_review_sections)
+from config import Config
+from llm_backend import LLMBackend
 from feedback_collector import FeedbackCollector, SessionManager
+from review_archive import ReviewArchive
+from near_duplicate import shared_duplicate_index
+from review_search import ReviewSearchIndex
+from model_router import ModelRouter
+from diff_review import build_review_batches, extract_findings
+from result_cache import cache_key, shared_result_cache
+from speculative_prefetch import shared_prefetcher
+from admission import shared_admission
+from scheduler import priority
+from prompt_compression import LineRemapper, compress_code, remap_line_references
 from datetime import datetime
+import time
 
 
 class CodeReviewPipeline:
     """코드 리뷰 전체 파이프라인 관리 클래스"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client=None, backend: Optional[LLMBackend] = None):
         """
         파이프라인 초기화
         
         Args:
             api_key: OpenAI API 키
+            client: OpenAI 호환 클라이언트 (지정 시 API 키 없이 사용, 예: FakeOpenAIClient)
+            backend: 사용할 LLM 백엔드 (llm_backend.py, 지정 시 client보다 우선)
         """
-        self.reviewer = CodeReviewHelper(api_key)
+        self.reviewer = CodeReviewHelper(api_key, client=client, backend=backend)
         self.feedback_collector = FeedbackCollector()
         self.session_manager = SessionManager()
+        self.archive = ReviewArchive()
+        self.duplicate_index = shared_duplicate_index()
+        self.search_index = ReviewSearchIndex()
+        self.router = ModelRouter()
+        self.result_cache = shared_result_cache
+        self.prefetcher = shared_prefetcher
+        self.admission = shared_admission if Config.ADMISSION_CONTROL_ENABLED else None
+        self.speculation_owner = f"pipeline-{id(self)}"
         self.current_session_id = None
         
     def start_new_session(self) -> str:
@@ -33,7 +58,14 @@ class CodeReviewPipeline:
     def process_code_review(self, 
                            code_snippet: str, 
                            language: str = "Python",
-                           review_type: str = "comprehensive") -> Dict:
+                           review_type: str = "comprehensive",
+                           allow_reuse: bool = True,
+                           on_chunk: Optional[Callable[[str], None]] = None,
+                           categories: Optional[List[str]] = None,
+                           compress: Optional[bool] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           deadline: Optional[float] = None,
+                           client_id: Optional[str] = None) -> Dict:
         """
         코드 리뷰 프로세스 실행
         
@@ -41,9 +73,17 @@ class CodeReviewPipeline:
             code_snippet: 리뷰할 코드
             language: 프로그래밍 언어
             review_type: 리뷰 유형 ("comprehensive", "quick_fix", "test_cases")
+            allow_reuse: 거의 동일한 코드의 이전 리뷰/캐시된 카테고리 결과 재사용 허용 여부
+            on_chunk: 스트리밍 조각 콜백 (지정 시 생성되는 대로 전달)
+            categories: 종합 리뷰에서 다룰 카테고리 ID 목록 (없으면 전체)
+            compress: 주석/빈 줄을 뺀 압축 코드로 요청할지 여부 (없으면 Config.PROMPT_COMPRESSION_ENABLED)
+            cancel_token: 취소 토큰 (취소되면 생성을 멈추고 cancelled 결과 반환, 아카이브/캐시에 저장하지 않음)
+            deadline: 결과를 기다릴 수 있는 시간 (초, 없으면 Config.ADMISSION_DEADLINE_SECONDS)
+            client_id: 추측 작업의 소유자 (여러 클라이언트가 파이프라인 하나를 공유할 때 클라이언트별 식별자,
+                       없으면 이 파이프라인의 세션)
             
         Returns:
-            리뷰 결과 딕셔너리
+            리뷰 결과 딕셔너리 (과부하로 거절되면 busy와 retry_after 포함)
         """
         if not self.current_session_id:
             self.start_new_session()
@@ -58,13 +98,84 @@ class CodeReviewPipeline:
                     "timestamp": datetime.now().isoformat()
                 }
             
+            categories = resolve_categories(categories) if review_type == "comprehensive" else None
+            all_categories = categories is None or len(categories) == len(Config.REVIEW_CATEGORY_IDS)
+            
+            # 다른 코드에 대한 이 세션(클라이언트)의 추측 작업은 더 이상 필요 없음
+            owner = client_id or self.speculation_owner
+            test_cases_key = cache_key("test_cases", language, code_snippet)
+            self.prefetcher.cancel(owner, keep_key=test_cases_key)
+            
+            # 거의 동일한 코드의 이전 리뷰가 있으면 API 호출 없이 재사용 (아카이브에는 전체 카테고리 리뷰만 있음)
+            reused = None
+            if allow_reuse and all_categories:
+                reused = self._find_reusable_review(code_snippet, language, review_type)
+            
+            code_stats = self._analyze_code_stats(code_snippet)
+            routing = None
+            prefetched = None
+            cached_categories = []
+            compression = self._compress(code_snippet, language, compress)
+            if not reused and review_type == "test_cases":
+                prefetched = self.prefetcher.take(test_cases_key)
+            
+            # 생성이 필요하면 수용 제어 (마감 안에 끝나지 못하면 가벼운 리뷰로 낮추거나 바로 거절)
+            admission = None
+            degraded = False
+            if not (reused or prefetched) and self.admission:
+                decision = self._admit(code_snippet, language, review_type, categories, allow_reuse, deadline)
+                if not decision["admitted"]:
+                    return self._busy_result(decision)
+                admission = decision["ticket"]
+                degraded = decision["degraded"]
+                if degraded and categories is not None:
+                    categories = decision["categories"]
+                    all_categories = len(categories) == len(Config.REVIEW_CATEGORY_IDS)
+            max_tier = "fast" if degraded else None
+            
             # 리뷰 타입에 따른 처리
-            if review_type == "comprehensive":
-                review_result = self.reviewer.analyze_code(code_snippet, language)
-            elif review_type == "test_cases":
-                review_result = self.reviewer.generate_test_cases(code_snippet, language)
-            else:
-                review_result = self.reviewer.analyze_code(code_snippet, language)
+            review_result = None
+            try:
+                with measure_backend_time() as backend_time:
+                    if reused or prefetched:
+                        review_result = reused["review"]["review_result"] if reused else prefetched["review_result"]
+                        routing = prefetched["routing"] if prefetched else None
+                        if on_chunk:
+                            on_chunk(review_result)
+                    elif review_type == "comprehensive":
+                        review_result, routing, cached_categories = self._review_categories(
+                            code_snippet, language, categories, code_stats, allow_reuse, on_chunk, compression,
+                            cancel_token, max_tier
+                        )
+                    else:
+                        routing = self._route(review_type, code_stats, max_tier=max_tier)
+                        generation = self._generation_params(routing)
+                        generation["on_chunk"] = on_chunk
+                        generation["cancel_token"] = cancel_token
+                        started = time.perf_counter()
+                    
+                        if review_type == "test_cases":
+                            review_result = self._generate(
+                                self.reviewer.generate_test_cases, code_snippet, language, compression,
+                                remap=False, **generation
+                            )
+                        else:
+                            review_result = self.reviewer.analyze_code(code_snippet, language, **generation)
+                    
+                        self._record_routing(routing, review_type, code_stats, started, review_result)
+            finally:
+                if admission:
+                    # 스케줄러 대기는 수용 제어가 따로 추정하므로 슬롯을 받은 뒤의 호출 시간만 학습
+                    self.admission.release(
+                        admission,
+                        completed=(backend_time["calls"] > 0 and review_result is not None
+                                   and not isinstance(review_result, ReviewError)),
+                        service_seconds=backend_time["seconds"]
+                    )
+            
+            # 취소된 리뷰는 부분 결과만 돌려주고 아카이브/인덱스/추측 실행은 건너뜀
+            if isinstance(review_result, ReviewCancelled):
+                return self._cancelled_result(review_result, review_type=review_type)
             
             # 결과 데이터 구성
             result_data = {
@@ -75,9 +186,56 @@ class CodeReviewPipeline:
                 "review_type": review_type,
                 "timestamp": datetime.now().isoformat(),
                 "session_id": self.current_session_id,
-                "code_stats": self._analyze_code_stats(code_snippet)
+                "code_stats": code_stats,
+                "reused": reused is not None,
+                "prefetched": prefetched is not None
             }
             
+            if categories is not None:
+                result_data["categories"] = categories
+                result_data["cached_categories"] = cached_categories
+            
+            if degraded:
+                result_data["degraded"] = True
+            
+            # 이번 요청에서 압축 코드로 생성했으면 절감량 보고
+            generated = not (reused or prefetched) and (categories is None or len(cached_categories) < len(categories))
+            if compression and generated:
+                result_data["compression"] = compression["stats"]
+            
+            if routing:
+                result_data["routing"] = routing
+            
+            if reused:
+                result_data["reused_from"] = reused["review"]["archive_id"]
+                result_data["similarity"] = reused["similarity"]
+            
+            # 영구 아카이브에 저장 (실패해도 리뷰 결과는 반환)
+            try:
+                result_data["archive_id"] = self.archive.store(result_data)
+                if not reused and all_categories and not isinstance(review_result, ReviewError):
+                    self.duplicate_index.add(result_data["archive_id"], code_snippet, language, review_type)
+            except Exception as e:
+                print(f"리뷰 아카이브 저장 중 오류: {e}")
+            
+            # 유사한 과거 리뷰와 받은 피드백 (현재 리뷰를 인덱스에 넣기 전에 검색)
+            result_data["similar_reviews"] = self.find_similar_reviews(
+                code_snippet,
+                review_result,
+                exclude_ids=[result_data.get("archive_id"), result_data.get("reused_from")]
+            )
+            if "archive_id" in result_data and not reused and not isinstance(review_result, ReviewError):
+                try:
+                    self.search_index.add(result_data["archive_id"], code_snippet, review_result)
+                except Exception as e:
+                    print(f"유사 리뷰 인덱스 저장 중 오류: {e}")
+            
+            # 종합 리뷰 다음에 이어질 가능성이 높은 테스트 케이스를 미리 생성
+            # (과부하로 낮춘 리뷰였으면 추가 부하를 만들지 않음)
+            if (Config.SPECULATIVE_PREFETCH_ENABLED and review_type == "comprehensive" and not degraded
+                    and not isinstance(review_result, ReviewError)):
+                self._schedule_test_cases(code_snippet, language, code_stats, test_cases_key, owner)
+            
             # 세션에 추가
             self.session_manager.add_review_to_session(
                 self.current_session_id, 
@@ -93,10 +251,320 @@ class CodeReviewPipeline:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _review_categories(self,
+                           code_snippet: str,
+                           language: str,
+                           categories: List[str],
+                           code_stats: Dict,
+                           use_cache: bool,
+                           on_chunk: Optional[Callable[[str], None]],
+                           compression: Optional[Dict] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           max_tier: Optional[str] = None) -> Tuple[str, Optional[Dict], List[str]]:
+        """
+        종합 리뷰를 카테고리 단위로 처리 (캐시에 없는 카테고리만 생성)
+        
+        Args:
+            code_snippet: 리뷰할 코드
+            language: 프로그래밍 언어
+            categories: 카테고리 ID 목록 (정해진 순서)
+            code_stats: 코드 통계
+            use_cache: 캐시된 카테고리 결과 사용 여부
+            on_chunk: 스트리밍 조각 콜백 (캐시된 섹션을 먼저 보낸 뒤 새로 생성한 부분을 보냄)
+            compression: compress_code 결과 (지정 시 압축 코드로 요청)
+            cancel_token: 취소 토큰 (취소되면 ReviewCancelled를 그대로 반환하고 캐시하지 않음)
+            max_tier: 사용할 수 있는 가장 높은 모델 티어 (과부하 시 "fast")
+            
+        Returns:
+            (카테고리 순서로 합친 리뷰, 라우팅 결정, 캐시에서 가져온 카테고리 ID 목록)
+        """
+        keys = {
+            category_id: cache_key("comprehensive", language, code_snippet, category=category_id)
+            for category_id in categories
+        }
+        sections = {}
+        if use_cache:
+            for category_id, key in keys.items():
+                section = self.result_cache.get(key)
+                if section is not None:
+                    sections[category_id] = section
+        cached_categories = [category_id for category_id in categories if category_id in sections]
+        missing = [category_id for category_id in categories if category_id not in sections]
+        
+        if on_chunk and cached_categories:
+            on_chunk("\n\n".join(sections[category_id] for category_id in cached_categories)
+                     + ("\n\n" if missing else ""))
+        if not missing:
+            return "\n\n".join(sections[category_id] for category_id in categories), None, cached_categories
+        
+        routing = self._route("comprehensive", code_stats, len(missing), max_tier)
+        generation = self._generation_params(routing)
+        started = time.perf_counter()
+        generated = self._generate(
+            self.reviewer.analyze_code, code_snippet, language, compression,
+            on_chunk=on_chunk, categories=missing, cancel_token=cancel_token, **generation
+        )
+        self._record_routing(routing, "comprehensive", code_stats, started, generated)
+        
+        if isinstance(generated, ReviewError):
+            return generated, routing, cached_categories
+        
+        new_sections = split_review_sections(generated, missing)
+        if new_sections is None and len(missing) == 1:
+            new_sections = {missing[0]: generated.strip()}
+        if new_sections is None:
+            # 섹션 제목을 찾지 못하면 캐시하지 않고 캐시된 섹션 뒤에 그대로 붙임
+            parts = [sections[category_id] for category_id in cached_categories] + [generated]
+            return "\n\n".join(parts), routing, cached_categories
+        
+        for category_id, section in new_sections.items():
+            self.result_cache.put(keys[category_id], section)
+        sections.update(new_sections)
+        return "\n\n".join(sections[category_id] for category_id in categories), routing, cached_categories
+    
+    @staticmethod
+    def _compress(code_snippet: str, language: str, compress: Optional[bool]) -> Optional[Dict]:
+        """프롬프트 압축 (비활성화했거나 압축 후 남는 코드가 없으면 None)"""
+        if not (Config.PROMPT_COMPRESSION_ENABLED if compress is None else compress):
+            return None
+        compression = compress_code(code_snippet, language)
+        if not compression["text"].strip():
+            return None
+        return compression
+    
+    @staticmethod
+    def _generate(method: Callable, 
+                  code_snippet: str, 
+                  language: str, 
+                  compression: Optional[Dict],
+                  on_chunk: Optional[Callable[[str], None]] = None,
+                  remap: bool = True,
+                  **kwargs) -> str:
+        """
+        생성 요청 (압축 코드로 보냈으면 응답의 줄 번호를 원래 코드 기준으로 되돌림)
+        
+        Args:
+            method: CodeReviewHelper.analyze_code 또는 generate_test_cases
+            code_snippet: 원래 코드
+            language: 프로그래밍 언어
+            compression: compress_code 결과 (없으면 원래 코드로 요청)
+            on_chunk: 스트리밍 조각 콜백 (압축 시 줄 단위로 번호를 바꿔 전달)
+            remap: 응답의 줄 번호를 되돌릴지 여부 (응답 전체가 코드인 테스트 케이스는 False)
+        """
+        if compression is None:
+            return method(code_snippet, language, on_chunk=on_chunk, **kwargs)
+        if not remap:
+            return method(compression["text"], language, on_chunk=on_chunk, compressed=True, **kwargs)
+        
+        line_map = compression["line_map"]
+        remapper = LineRemapper(on_chunk, line_map) if on_chunk else None
+        result = method(compression["text"], language, on_chunk=remapper, compressed=True, **kwargs)
+        if remapper:
+            remapper.flush()
+        if isinstance(result, ReviewCancelled):
+            return ReviewCancelled(result, remap_line_references(result.partial, line_map))
+        if isinstance(result, ReviewError):
+            return result
+        return remap_line_references(result, line_map)
+    
+    def _find_reusable_review(self, code_snippet: str, language: str, review_type: str) -> Optional[Dict]:
+        """재사용할 수 있는 이전 리뷰 검색 (설정된 유사도 이상)"""
+        if not Config.NEAR_DUPLICATE_ENABLED:
+            return None
+        
+        try:
+            match = self.duplicate_index.find_similar(
+                code_snippet, language, review_type, Config.NEAR_DUPLICATE_THRESHOLD
+            )
+            if match:
+                review = self.archive.get(match["id"])
+                if review:
+                    return {"review": review, "similarity": match["similarity"]}
+        except Exception as e:
+            print(f"유사 리뷰 검색 중 오류: {e}")
+        return None
+    
+    def _schedule_test_cases(self, code_snippet: str, language: str, code_stats: Dict, key: str, owner: str):
+        """테스트 케이스 추측 생성 예약 (이미 재사용할 결과가 있으면 생략)"""
+        if self._find_reusable_review(code_snippet, language, "test_cases"):
+            return
+        routing = self._route("test_cases", code_stats)
+        compression = self._compress(code_snippet, language, None)
+        
+        def task(on_chunk):
+            started = time.perf_counter()
+            with priority("speculative", override=True):
+                result = self._generate(
+                    self.reviewer.generate_test_cases,
+                    code_snippet, 
+                    language, 
+                    compression,
+                    on_chunk=on_chunk, 
+                    remap=False,
+                    **self._generation_params(routing)
+                )
+            if isinstance(result, ReviewError):
+                # 취소로 끊긴 호출도 오류로 돌아오므로 라우팅 통계에는 남기지 않음
+                return None
+            self._record_routing(routing, "test_cases", code_stats, started, result)
+            return {"review_result": result, "routing": routing}
+        
+        tokens = routing["max_tokens"] if routing else 1500
+        self.prefetcher.schedule(key, owner, tokens, task)
+    
+    def cancel_speculation(self, client_id: Optional[str] = None) -> int:
+        """이 세션(client_id가 있으면 해당 클라이언트)의 추측 작업 취소 (사용자가 코드를 수정했을 때)"""
+        return self.prefetcher.cancel(client_id or self.speculation_owner)
+    
+    def _route(self, review_type: str, code_stats: Dict, category_count: Optional[int] = None,
+               max_tier: Optional[str] = None) -> Optional[Dict]:
+        """모델 라우팅 결정 (비활성화 시 None → 헬퍼 기본값 사용)"""
+        if not Config.MODEL_ROUTING_ENABLED:
+            return None
+        return self.router.route(review_type, code_stats, category_count, max_tier)
+    
+    def _admit(self,
+               code_snippet: str,
+               language: str,
+               review_type: str,
+               categories: Optional[List[str]],
+               use_cache: bool,
+               deadline: Optional[float]) -> Dict:
+        """
+        수용 제어 결정
+        
+        종합 리뷰는 캐시에 없는 카테고리 비율만큼을 비용으로 보고, 낮출 때는
+        Config.ADMISSION_DEGRADED_CATEGORIES(없으면 첫 카테고리)와 캐시된 카테고리만 남김
+        
+        Returns:
+            AdmissionController.admit 결과 (+ 낮췄을 때 사용할 "categories")
+        """
+        if categories is None:
+            return self.admission.admit(
+                review_type, 1.0, Config.ADMISSION_DEGRADED_COST_RATIO, deadline
+            )
+        
+        total = len(Config.REVIEW_CATEGORY_IDS)
+        pending = [
+            category_id for category_id in categories
+            if not (use_cache and cache_key("comprehensive", language, code_snippet, category=category_id)
+                    in self.result_cache)
+        ]
+        if not pending:
+            # 모두 캐시에 있으면 백엔드 호출이 없으므로 제한하지 않음
+            return {"admitted": True, "degraded": False, "ticket": None}
+        
+        kept = [category_id for category_id in pending if category_id in Config.ADMISSION_DEGRADED_CATEGORIES] or pending[:1]
+        decision = self.admission.admit(
+            review_type,
+            len(pending) / total,
+            len(kept) / total * Config.ADMISSION_DEGRADED_COST_RATIO,
+            deadline
+        )
+        decision["categories"] = [
+            category_id for category_id in categories if category_id in kept or category_id not in pending
+        ]
+        return decision
+    
+    @staticmethod
+    def _busy_result(decision: Dict) -> Dict:
+        """과부하로 거절한 요청의 결과"""
+        return {
+            "success": False,
+            "busy": True,
+            "retry_after": decision["retry_after"],
+            "estimated_seconds": decision["estimated_seconds"],
+            "error": f"요청이 많아 지금은 처리할 수 없습니다. {decision['retry_after']}초 후 다시 시도해주세요.",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _generation_params(routing: Optional[Dict]) -> Dict:
+        """라우팅 결정을 CodeReviewHelper 호출 인자로 변환"""
+        if not routing:
+            return {}
+        return {
+            "model": routing["model"],
+            "temperature": routing["temperature"],
+            "max_tokens": routing["max_tokens"]
+        }
+    
+    def _record_routing(self, routing: Optional[Dict], review_type: str, code_stats: Dict, started: float, result: str):
+        """라우팅 결과(지연 시간, 성공 여부) 기록 (취소된 호출은 모델 탓이 아니므로 제외)"""
+        if not routing or isinstance(result, ReviewCancelled):
+            return
+        self.router.record(
+            routing,
+            review_type,
+            code_stats,
+            time.perf_counter() - started,
+            not isinstance(result, ReviewError)
+        )
+    
+    @staticmethod
+    def _cancelled_result(cancelled: ReviewCancelled, **extra) -> Dict:
+        """취소된 요청의 결과 (취소 전까지 받은 내용은 partial_result로 표시)"""
+        return {
+            "success": False,
+            "cancelled": True,
+            "error": str(cancelled),
+            "partial": bool(cancelled.partial),
+            "partial_result": cancelled.partial,
+            **extra,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def find_similar_reviews(self,
+                             code_snippet: str,
+                             review_text: str = "",
+                             exclude_ids: Optional[List[int]] = None) -> List[Dict]:
+        """
+        유사한 과거 리뷰 검색
+        
+        Args:
+            code_snippet: 기준 코드
+            review_text: 기준 리뷰 본문
+            exclude_ids: 제외할 아카이브 ID
+            
+        Returns:
+            유사 리뷰 요약 목록 (유사도, 미리보기, 받은 피드백 포함)
+        """
+        try:
+            matches = self.search_index.search(
+                code_snippet,
+                review_text,
+                k=Config.SIMILAR_REVIEWS_TOP_K,
+                exclude_ids=[i for i in (exclude_ids or []) if i is not None],
+                min_score=Config.SIMILAR_REVIEWS_MIN_SCORE
+            )
+            feedback = self.feedback_collector.get_review_feedback([m["id"] for m in matches])
+            
+            similar_reviews = []
+            for match in matches:
+                review = self.archive.get(match["id"])
+                if review is None:
+                    continue
+                similar_reviews.append({
+                    "archive_id": match["id"],
+                    "score": round(match["score"], 3),
+                    "language": review["language"],
+                    "review_type": review["review_type"],
+                    "timestamp": review["timestamp"],
+                    "code_preview": review["code_snippet"][:200],
+                    "review_preview": review["review_result"][:300],
+                    "feedback": feedback.get(match["id"])
+                })
+            return similar_reviews
+        except Exception as e:
+            print(f"유사 리뷰 검색 중 오류: {e}")
+            return []
+    
     def process_quick_fix(self, 
                          code_snippet: str, 
                          issue_description: str,
-                         language: str = "Python") -> Dict:
+                         language: str = "Python",
+                         on_chunk: Optional[Callable[[str], None]] = None,
+                         cancel_token: Optional[CancellationToken] = None) -> Dict:
         """
         빠른 수정 제안 프로세스
         
@@ -104,23 +572,37 @@ class CodeReviewPipeline:
             code_snippet: 원본 코드
             issue_description: 수정할 이슈 설명
             language: 프로그래밍 언어
+            on_chunk: 스트리밍 조각 콜백 (지정 시 생성되는 대로 전달)
+            cancel_token: 취소 토큰 (취소되면 cancelled 결과 반환)
             
         Returns:
             수정 제안 결과
         """
         try:
+            code_stats = self._analyze_code_stats(code_snippet)
+            routing = self._route("quick_fix", code_stats)
+            started = time.perf_counter()
+            
             fix_result = self.reviewer.get_quick_fix(
                 code_snippet, 
                 issue_description, 
-                language
+                language,
+                on_chunk=on_chunk,
+                cancel_token=cancel_token,
+                **self._generation_params(routing)
             )
             
+            self._record_routing(routing, "quick_fix", code_stats, started, fix_result)
+            if isinstance(fix_result, ReviewCancelled):
+                return self._cancelled_result(fix_result)
+            
             return {
                 "success": True,
                 "fix_result": fix_result,
                 "original_code": code_snippet,
                 "issue": issue_description,
                 "language": language,
+                "routing": routing,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -131,13 +613,94 @@ class CodeReviewPipeline:
                 "timestamp": datetime.now().isoformat()
             }
     
+    def process_diff_review(self,
+                            diff_text: Optional[str] = None,
+                            rev_range: Optional[str] = None,
+                            repo_dir: str = ".",
+                            language: Optional[str] = None,
+                            on_chunk: Optional[Callable[[str], None]] = None,
+                            cancel_token: Optional[CancellationToken] = None,
+                            read_sources: bool = False) -> Dict:
+        """
+        변경 사항(diff) 리뷰 프로세스
+        
+        Args:
+            diff_text: unified diff 텍스트 (read_sources가 아니면 서버 파일을 읽지 않고 hunk만으로 문맥 구성)
+            rev_range: diff_text가 없을 때 사용할 git 커밋 범위 (예: "main..HEAD")
+            repo_dir: git 저장소 / 파일 기준 디렉터리 (rev_range일 때만 사용)
+            language: 모든 파일에 사용할 언어 (없으면 확장자로 추정)
+            on_chunk: 스트리밍 조각 콜백 (지정 시 생성되는 대로 전달)
+            cancel_token: 취소 토큰 (취소되면 남은 묶음을 보내지 않고 끝난 묶음만 cancelled 결과로 반환)
+            read_sources: diff_text의 경로로 repo_dir 파일을 읽어 감싸는 함수/클래스 문맥 구성 (로컬 CLI 전용)
+            
+        Returns:
+            요청 묶음별 리뷰 결과와 file:line 지적 사항
+        """
+        try:
+            plan = build_review_batches(diff_text, rev_range, repo_dir, language, read_sources=read_sources)
+            if not plan["batches"]:
+                return {
+                    "success": False,
+                    "error": "리뷰할 변경 사항이 없습니다.",
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+            batches = []
+            for batch in plan["batches"]:
+                snippet = "\n\n".join(chunk["text"] for chunk in batch)
+                code_stats = self._analyze_code_stats(snippet)
+                routing = self._route("diff", code_stats)
+                started = time.perf_counter()
+                
+                review_result = self.reviewer.review_diff(
+                    snippet,
+                    on_chunk=on_chunk,
+                    cancel_token=cancel_token,
+                    **self._generation_params(routing)
+                )
+                self._record_routing(routing, "diff", code_stats, started, review_result)
+                if isinstance(review_result, ReviewCancelled):
+                    return self._cancelled_result(review_result, batches=batches)
+                
+                batches.append({
+                    "files": [chunk["path"] for chunk in batch],
+                    "review_result": review_result,
+                    "findings": [] if isinstance(review_result, ReviewError) else extract_findings(review_result, batch),
+                    "prompt_chars": len(snippet),
+                    "routing": routing
+                })
+            
+            return {
+                "success": True,
+                "batches": batches,
+                "findings": [finding for batch in batches for finding in batch["findings"]],
+                "errors": [batch["review_result"] for batch in batches if isinstance(batch["review_result"], ReviewError)],
+                "diff_stats": {
+                    "files": plan["files"],
+                    "hunks": plan["hunks"],
+                    "changed_lines": plan["changed_lines"],
+                    "prompt_chars": plan["prompt_chars"],
+                    "requests": len(batches)
+                },
+                "timestamp": datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"변경 사항 리뷰 중 오류가 발생했습니다: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            }
+    
     def collect_user_feedback(self, 
                              review_result: str,
                              user_code: str,
                              language: str,
                              rating: int,
                              helpful: bool,
-                             suggestions: str = "") -> Dict:
+                             suggestions: str = "",
+                             review_type: str = "comprehensive",
+                             archive_id: Optional[int] = None) -> Dict:
         """
         사용자 피드백 수집 프로세스
         
@@ -148,6 +711,8 @@ class CodeReviewPipeline:
             rating: 평점 (1-5)
             helpful: 도움됨 여부
             suggestions: 개선 제안사항
+            review_type: 리뷰 유형
+            archive_id: 피드백 대상 리뷰의 아카이브 ID
             
         Returns:
             피드백 수집 결과
@@ -159,7 +724,9 @@ class CodeReviewPipeline:
                 language=language,
                 rating=rating,
                 helpful=helpful,
-                suggestions=suggestions
+                suggestions=suggestions,
+                review_type=review_type,
+                archive_id=archive_id
             )
             
             return {
@@ -188,6 +755,46 @@ class CodeReviewPipeline:
         """서비스 개선 인사이트 반환"""
         return self.feedback_collector.get_improvement_insights()
     
+    def get_feedback_timeseries(self, granularity: str = "daily", periods: int = 30) -> List[Dict]:
+        """시간 버킷별 피드백 집계 반환"""
+        return self.feedback_collector.get_feedback_timeseries(granularity, periods)
+    
+    def get_suggestions_page(self, page: int = 1) -> Dict:
+        """개선 제안사항 페이지 반환"""
+        return self.feedback_collector.get_suggestions_page(page)
+    
+    def get_feedback_breakdown(self) -> Dict:
+        """언어/리뷰 유형별 평점 분석 (컬럼형 저장소 기반)"""
+        return self.feedback_collector.get_feedback_breakdown()
+    
+    def get_usage_summary(self) -> List[Dict]:
+        """모델 티어별 사용량/지연 분석 (컬럼형 저장소 기반)"""
+        return self.feedback_collector.get_usage_summary()
+    
+    def get_key_usage(self) -> List[Dict]:
+        """API 키별 사용량/레이트 리밋 (키 풀을 쓰지 않으면 빈 목록)"""
+        client = self.reviewer.client
+        client = getattr(client, "inner", client)   # 기록(cassette) 래퍼 안쪽
+        pool = getattr(client, "pool", None)
+        return pool.get_stats() if pool else []
+    
+    def get_backend_usage(self) -> Dict:
+        """LLM 백엔드 종류와 누적 요청/토큰 사용량"""
+        return self.reviewer.backend.get_usage()
+    
+    def get_admission_stats(self) -> Dict:
+        """리뷰 요청 수용 제어 상태 (비활성화되어 있으면 빈 딕셔너리)"""
+        return self.admission.get_stats() if self.admission else {}
+    
+    def get_scheduler_stats(self) -> List[Dict]:
+        """우선순위 클래스별 대기 시간과 진행/대기 수 (스케줄러를 쓰지 않으면 빈 목록)"""
+        scheduler = self.reviewer.scheduler
+        return scheduler.get_stats() if scheduler else []
+    
+    def compact_feedback_data(self) -> Dict:
+        """보존 기간이 지난 원시 피드백 정리"""
+        return self.feedback_collector.compact_feedback_data()
+    
     def _validate_code_input(self, code_snippet: str, language: str) -> Dict:
         """코드 입력 유효성 검증"""
         if not code_snippet or not code_snippet.strip():
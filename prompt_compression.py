@@ -0,0 +1,338 @@
+"""
+프롬프트 압축 모듈
+리뷰 요청에 보내는 코드에서 의미 없는 내용(주석, 빈 줄, 줄 끝 공백)을 언어별로 제거하고
+압축된 줄 → 원래 줄 번호 대응표로 모델이 말한 줄 번호를 원래 코드 기준으로 되돌림
+"""
+import io
+import re
+import tokenize
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 언어별 한 줄 주석 시작 기호
+LINE_COMMENT_PREFIXES = {
+    "Python": ("#",),
+    "Ruby": ("#",),
+    "JavaScript": ("//",),
+    "TypeScript": ("//",),
+    "Java": ("//",),
+    "C++": ("//",),
+    "C#": ("//",),
+    "Go": ("//",),
+    "Rust": ("//",),
+    "PHP": ("//", "#"),
+}
+
+# 언어별 블록 주석 (시작, 끝)
+BLOCK_COMMENTS = {
+    "Ruby": ("=begin", "=end"),
+    "JavaScript": ("/*", "*/"),
+    "TypeScript": ("/*", "*/"),
+    "Java": ("/*", "*/"),
+    "C++": ("/*", "*/"),
+    "C#": ("/*", "*/"),
+    "Go": ("/*", "*/"),
+    "Rust": ("/*", "*/"),
+    "PHP": ("/*", "*/"),
+}
+
+# 리뷰에 의미가 있어 남겨 두는 주석
+_KEPT_COMMENT = re.compile(r"TODO|FIXME|HACK|XXX|noqa|type:|pragma|eslint|nolint|@ts-|#!|coding[:=]", re.IGNORECASE)
+
+# 응답에서 줄 번호 참조 (COMPRESSED_CODE_NOTE가 요청한 "줄 12", "줄 3-5" 형식만)
+_LINE_REFERENCE = re.compile(r"(?<![가-힣])(?P<prefix>줄\s*)(?P<start>\d+)(?:(?P<sep>\s*[-~–]\s*)(?P<end>\d+))?")
+
+# 코드 블록 시작/끝 줄
+_CODE_FENCE = re.compile(r"^\s*(```|~~~)")
+
+# 언어별 여러 줄 문자열 리터럴: (시작 패턴, 끝 구분자 또는 None(시작 패턴의 그룹으로 결정), 이스케이프 방식)
+# 이스케이프: "backslash"(\\ 다음 글자 무시), "double"(C# @"" 안의 ""), None(raw)
+_MULTILINE_LITERALS = {
+    "Python": [(re.compile(r'"""'), '"""', "backslash"), (re.compile("'''"), "'''", "backslash")],
+    "JavaScript": [(re.compile(r"`"), "`", "backslash")],
+    "TypeScript": [(re.compile(r"`"), "`", "backslash")],
+    "Go": [(re.compile(r"`"), "`", None)],
+    "Rust": [(re.compile(r'(?<![\w])b?r(#*)"'), None, None)],
+    "C++": [(re.compile(r'(?<![\w])(?:u8|[uUL])?R"([^()\\\s]{0,16})\('), None, None)],
+    "C#": [(re.compile(r'"{3,}'), None, None), (re.compile(r'(?:\$@|@\$|@)"'), '"', "double")],
+    "Java": [(re.compile(r'"""'), '"""', "backslash")],
+}
+
+# 보통 문자열("..."/'...')도 줄을 넘을 수 있는 언어
+_MULTILINE_QUOTES = {
+    "Rust": ('"',),
+    "Ruby": ('"', "'"),
+    "PHP": ('"', "'"),
+}
+
+# 줄 단위로 판단할 수 없는 heredoc (있으면 압축하지 않음)
+_HEREDOC = {
+    "Ruby": re.compile(r"<<[~-]?(['\"`]?)[A-Za-z_]\w*\1"),
+    "PHP": re.compile(r"<<<\s*['\"]?[A-Za-z_]\w*"),
+}
+
+
+def _python_lines(code: str) -> Optional[List[str]]:
+    """
+    tokenize로 Python 주석 제거 (문자열 안의 #은 유지, 여러 줄 문자열 내부 줄은 그대로)
+
+    Returns:
+        원래 줄 수와 같은 길이의 줄 목록 (제거할 줄은 None), 토큰화에 실패하면 None
+    """
+    lines = code.splitlines()
+    kept: List[Optional[str]] = list(lines)
+    verbatim = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.STRING and token.end[0] > token.start[0]:
+                verbatim.update(range(token.start[0] + 1, token.end[0] + 1))
+            elif token.type == tokenize.COMMENT and not _KEPT_COMMENT.search(token.string):
+                row, col = token.start
+                kept[row - 1] = lines[row - 1][:col]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+
+    result = []
+    for number, line in enumerate(kept, start=1):
+        if number in verbatim:
+            result.append(lines[number - 1])
+        elif line is None or not line.strip():
+            result.append(None)
+        else:
+            result.append(line.rstrip())
+    return result
+
+
+def _literal_end(code: str, position: int, closer: str, escape: Optional[str]) -> int:
+    """position부터 closer로 끝나는 문자열의 끝 위치 (닫히지 않으면 코드 끝)"""
+    while position < len(code):
+        if escape == "backslash" and code[position] == "\\":
+            position += 2
+            continue
+        if code.startswith(closer, position):
+            if escape == "double" and code.startswith(closer * 2, position):
+                position += 2
+                continue
+            return position + len(closer)
+        position += 1
+    return len(code)
+
+
+def _verbatim_lines(code: str, language: str) -> Optional[set]:
+    """
+    여러 줄 문자열 리터럴 안에 있는 줄 번호 (두 번째 줄부터 끝 줄까지, Python의 verbatim과 같은 기준)
+
+    주석과 문자열을 구분하며 훑으므로 리터럴 안의 //, /*, # 줄은 주석으로 보지 않습니다.
+
+    Returns:
+        줄 번호 집합, heredoc처럼 판단할 수 없는 리터럴이 있으면 None
+    """
+    heredoc = _HEREDOC.get(language)
+    if heredoc and heredoc.search(code):
+        return None
+
+    prefixes = LINE_COMMENT_PREFIXES.get(language, ())
+    block = BLOCK_COMMENTS.get(language) if language != "Ruby" else None
+    literals = _MULTILINE_LITERALS.get(language, [])
+    multiline_quotes = _MULTILINE_QUOTES.get(language, ())
+    verbatim = set()
+    position = 0
+
+    while position < len(code):
+        char = code[position]
+        if char == "\n" or char.isspace():
+            position += 1
+            continue
+        if any(code.startswith(prefix, position) for prefix in prefixes):
+            end = code.find("\n", position)
+            position = len(code) if end < 0 else end
+            continue
+        if language == "Ruby" and code.startswith("=begin", position) and (position == 0 or code[position - 1] == "\n"):
+            end = code.find("\n=end", position)
+            position = len(code) if end < 0 else end + len("\n=end")
+            continue
+        if block and code.startswith(block[0], position):
+            end = code.find(block[1], position + len(block[0]))
+            position = len(code) if end < 0 else end + len(block[1])
+            continue
+
+        start = position
+        for pattern, closer, escape in literals:
+            match = pattern.match(code, position)
+            if match:
+                if closer is None:
+                    # Rust r#"..."#, C++ R"delim(...)delim", C# """...""" 은 시작에서 끝 구분자가 정해짐
+                    opener = match.group(0)
+                    if language == "Rust":
+                        closer = '"' + match.group(1)
+                    elif language == "C++":
+                        closer = ")" + match.group(1) + '"'
+                    else:
+                        closer = opener
+                position = _literal_end(code, match.end(), closer, escape)
+                break
+        else:
+            if char in ('"', "'"):
+                position += 1
+                while position < len(code):
+                    if code[position] == "\\":
+                        position += 2
+                        continue
+                    if code[position] == char:
+                        position += 1
+                        break
+                    if code[position] == "\n" and char not in multiline_quotes:
+                        break
+                    position += 1
+            else:
+                position += 1
+                continue
+
+        spanned = code.count("\n", start, max(position - 1, start))
+        if spanned:
+            first_line = code.count("\n", 0, start) + 1
+            verbatim.update(range(first_line + 1, first_line + spanned + 1))
+    return verbatim
+
+
+def _generic_lines(code: str, language: str) -> List[Optional[str]]:
+    """
+    줄 단위 규칙으로 한 줄 주석/블록 주석/빈 줄 제거
+    (여러 줄 문자열 리터럴 안의 줄은 그대로 두고, heredoc이 있으면 아무것도 제거하지 않음)
+    """
+    lines = code.splitlines()
+    verbatim = _verbatim_lines(code, language)
+    if verbatim is None:
+        return list(lines)
+
+    prefixes = LINE_COMMENT_PREFIXES.get(language, ())
+    block = BLOCK_COMMENTS.get(language)
+    result: List[Optional[str]] = []
+    in_block = False
+
+    for number, line in enumerate(lines, start=1):
+        if number in verbatim:
+            result.append(line)
+            continue
+        stripped = line.strip()
+        if in_block:
+            end = stripped.find(block[1])
+            if end < 0:
+                result.append(None)
+                continue
+            in_block = False
+            rest = stripped[end + len(block[1]):].strip()
+            result.append(line[:len(line) - len(line.lstrip())] + rest if rest else None)
+            continue
+        if block and stripped.startswith(block[0]) and not _KEPT_COMMENT.search(stripped):
+            end = stripped.find(block[1], len(block[0]))
+            if end < 0:
+                in_block = True
+                result.append(None)
+                continue
+            rest = stripped[end + len(block[1]):].strip()
+            result.append(line[:len(line) - len(line.lstrip())] + rest if rest else None)
+            continue
+        if any(stripped.startswith(prefix) for prefix in prefixes) and not _KEPT_COMMENT.search(stripped):
+            result.append(None)
+            continue
+        result.append(line.rstrip() if stripped else None)
+    return result
+
+
+def compress_code(code: str, language: str) -> Dict:
+    """
+    리뷰 프롬프트용 코드 압축
+
+    Args:
+        code: 원래 코드
+        language: 프로그래밍 언어 (모르는 언어는 빈 줄과 줄 끝 공백만 제거)
+
+    Returns:
+        {"text": 압축된 코드, "line_map": 압축된 줄(1부터) → 원래 줄 번호 목록, "stats": 절감량}
+    """
+    lines = _python_lines(code) if language == "Python" else None
+    if lines is None:
+        lines = _generic_lines(code, language)
+
+    kept = [(number, line) for number, line in enumerate(lines, start=1) if line is not None]
+    text = "\n".join(line for _, line in kept)
+    original_chars = len(code)
+    compressed_chars = len(text)
+    return {
+        "text": text,
+        "line_map": [number for number, _ in kept],
+        "stats": {
+            "original_lines": len(lines),
+            "compressed_lines": len(kept),
+            "original_chars": original_chars,
+            "compressed_chars": compressed_chars,
+            # 코드는 약 4자당 1토큰으로 추정
+            "estimated_tokens_saved": (original_chars - compressed_chars) // 4,
+            "ratio": round(compressed_chars / original_chars, 3) if original_chars else 1.0
+        }
+    }
+
+
+def _remap_text(text: str, line_map: List[int], in_code: bool = False) -> Tuple[str, bool]:
+    """
+    코드 블록 밖의 줄 번호 참조만 변환
+
+    Returns:
+        (변환된 텍스트, 마지막 줄이 코드 블록 안인지 여부)
+    """
+    def original(number: str) -> str:
+        index = int(number)
+        return str(line_map[index - 1]) if 1 <= index <= len(line_map) else number
+
+    def replace(match) -> str:
+        result = match.group("prefix") + original(match.group("start"))
+        if match.group("end") is not None:
+            result += match.group("sep") + original(match.group("end"))
+        return result
+
+    parts = []
+    for line in text.splitlines(keepends=True):
+        if _CODE_FENCE.match(line):
+            in_code = not in_code
+            parts.append(line)
+        elif in_code:
+            parts.append(line)
+        else:
+            parts.append(_LINE_REFERENCE.sub(replace, line))
+    return "".join(parts), in_code
+
+
+def remap_line_references(text: str, line_map: List[int]) -> str:
+    """
+    응답의 `줄 N` 참조를 원래 코드 기준으로 변환
+    (코드 블록 안과 범위를 벗어난 번호, "2줄로" 같은 줄 수 표현은 그대로)
+
+    Args:
+        text: 모델 응답
+        line_map: compress_code의 line_map
+    """
+    return _remap_text(text, line_map)[0]
+
+
+class LineRemapper:
+    """스트리밍 조각을 줄 단위로 모아 줄 번호를 바꾼 뒤 전달하는 on_chunk 래퍼"""
+
+    def __init__(self, on_chunk: Callable[[str], None], line_map: List[int]):
+        self.on_chunk = on_chunk
+        self.line_map = line_map
+        self._buffer = ""
+        self._in_code = False
+
+    def __call__(self, text: str):
+        self._buffer += text
+        cut = self._buffer.rfind("\n")
+        if cut >= 0:
+            complete, self._buffer = self._buffer[:cut + 1], self._buffer[cut + 1:]
+            text, self._in_code = _remap_text(complete, self.line_map, self._in_code)
+            self.on_chunk(text)
+
+    def flush(self):
+        """남은 마지막 줄 전달"""
+        if self._buffer:
+            self.on_chunk(_remap_text(self._buffer, self.line_map, self._in_code)[0])
+            self._buffer = ""
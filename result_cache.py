@@ -0,0 +1,99 @@
+"""
+결과 캐시 모듈
+(종류, 언어, 코드, 파라미터)별 생성 결과를 TTL이 있는 LRU로 보관
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import Config
+
+
+def cache_key(kind: str, language: str, code: str, **params) -> str:
+    """
+    캐시 키 생성
+
+    Args:
+        kind: 결과 종류 (예: "test_cases")
+        language: 프로그래밍 언어
+        code: 코드 원문 (공백 하나라도 다르면 다른 키)
+        **params: 결과에 영향을 주는 추가 파라미터
+
+    Returns:
+        sha256 16진 문자열
+    """
+    digest = hashlib.sha256()
+    for part in (kind, language, code, *(f"{k}={params[k]}" for k in sorted(params))):
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """스레드 안전 LRU + TTL 결과 캐시 클래스"""
+
+    def __init__(self, max_entries: int = Config.RESULT_CACHE_SIZE, ttl: float = Config.RESULT_CACHE_TTL):
+        """
+        Args:
+            max_entries: 최대 항목 수 (넘으면 가장 오래 쓰지 않은 항목 제거)
+            ttl: 항목 유효 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """유효한 항목 반환 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any):
+        """항목 저장"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        """유효한 항목이 있는지 (적중률/LRU 순서에 반영하지 않음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def discard(self, key: str):
+        """항목 제거"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict:
+        """적중률 통계"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# 프로세스 내 모든 세션이 공유하는 캐시 (같은 코드면 세션이 달라도 같은 결과)
+shared_result_cache = ResultCache()
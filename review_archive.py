@@ -0,0 +1,367 @@
+"""
+리뷰 아카이브 모듈
+리뷰 입력/출력을 콘텐츠 해시 기반으로 중복 제거하고 압축하여 영구 저장
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import Config
+from review_history import make_summary
+
+# zlib 사전은 압축 윈도우(32KB)보다 커도 효과가 없음
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def build_dictionary(samples: List[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    리뷰 코퍼스에서 zlib 사전 생성
+
+    여러 문서에 반복해서 등장하는 줄을 빈도 × 길이 순으로 골라 사전에 담습니다.
+    zlib은 사전의 끝부분을 더 짧은 거리로 참조하므로 가치가 높은 줄을 뒤쪽에 둡니다.
+
+    Args:
+        samples: 학습에 사용할 텍스트 목록
+        size: 사전 최대 크기 (바이트)
+
+    Returns:
+        사전 바이트열 (반복되는 내용이 없으면 빈 바이트열)
+    """
+    document_frequency = Counter()
+    for text in samples:
+        for line in set(text.splitlines()):
+            if len(line.strip()) >= 4:
+                document_frequency[line] += 1
+
+    candidates = [
+        (count * len(line.encode('utf-8')), line)
+        for line, count in document_frequency.items() if count >= 2
+    ]
+    candidates.sort(reverse=True)
+
+    chosen = []
+    used = 0
+    for _, line in candidates:
+        encoded = (line + "\n").encode('utf-8')
+        if used + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+
+    return b"".join(reversed(chosen))
+
+
+class ReviewArchive:
+    """중복 제거·압축 리뷰 아카이브 클래스"""
+
+    def __init__(self, archive_file: str = Config.REVIEW_ARCHIVE_FILE):
+        """
+        아카이브 초기화
+
+        Args:
+            archive_file: 아카이브 SQLite 파일 경로
+        """
+        self.archive_file = archive_file
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[int, bytes] = {}
+        self._conn = sqlite3.connect(archive_file, check_same_thread=False)
+        with self._lock, self._conn:
+            if archive_file != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS dictionaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    dict_id INTEGER,
+                    raw_size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS reviews (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    session_id TEXT,
+                    language TEXT NOT NULL,
+                    review_type TEXT NOT NULL,
+                    code_hash TEXT NOT NULL,
+                    review_hash TEXT NOT NULL,
+                    code_stats TEXT
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reviews_filter ON reviews (language, review_type)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reviews_code ON reviews (code_hash)"
+            )
+
+    # ------------------------------------------------------------------
+    # 압축 / 블롭 저장
+    # ------------------------------------------------------------------
+
+    def _dictionary(self, dict_id: Optional[int]) -> Optional[bytes]:
+        """사전 조회 (메모리 캐시)"""
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            row = self._conn.execute(
+                "SELECT data FROM dictionaries WHERE id = ?", (dict_id,)
+            ).fetchone()
+            self._dictionaries[dict_id] = row[0]
+        return self._dictionaries[dict_id]
+
+    def _latest_dictionary_id(self) -> Optional[int]:
+        """가장 최근에 학습된 사전 ID"""
+        row = self._conn.execute("SELECT MAX(id) FROM dictionaries").fetchone()
+        return row[0]
+
+    @staticmethod
+    def _compress(text: str, dictionary: Optional[bytes]) -> bytes:
+        if dictionary:
+            compressor = zlib.compressobj(level=9, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(level=9)
+        return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+    @staticmethod
+    def _decompress(data: bytes, dictionary: Optional[bytes]) -> str:
+        if dictionary:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8')
+
+    def _put_blob(self, text: str, dict_id: Optional[int]) -> str:
+        """텍스트를 해시 키로 저장 (이미 있으면 재사용)"""
+        blob_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        exists = self._conn.execute(
+            "SELECT 1 FROM blobs WHERE hash = ?", (blob_hash,)
+        ).fetchone()
+        if not exists:
+            # 다른 세션/프로세스가 그사이 같은 내용을 저장했을 수 있으므로 충돌은 무시
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                (blob_hash, dict_id, len(text.encode('utf-8')),
+                 self._compress(text, self._dictionary(dict_id)))
+            )
+        return blob_hash
+
+    def _get_blob(self, blob_hash: str) -> str:
+        row = self._conn.execute(
+            "SELECT dict_id, data FROM blobs WHERE hash = ?", (blob_hash,)
+        ).fetchone()
+        return self._decompress(row[1], self._dictionary(row[0]))
+
+    # ------------------------------------------------------------------
+    # 리뷰 저장 / 조회
+    # ------------------------------------------------------------------
+
+    def store(self, review: Dict) -> int:
+        """
+        리뷰 결과 저장
+
+        Args:
+            review: process_code_review 결과 딕셔너리
+
+        Returns:
+            아카이브 ID
+        """
+        with self._lock, self._conn:
+            dict_id = self._latest_dictionary_id()
+            code_hash = self._put_blob(review['code_snippet'], dict_id)
+            review_hash = self._put_blob(review['review_result'], dict_id)
+            cursor = self._conn.execute("""
+                INSERT INTO reviews (timestamp, session_id, language, review_type,
+                                     code_hash, review_hash, code_stats)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                review['timestamp'],
+                review.get('session_id'),
+                review['language'],
+                review['review_type'],
+                code_hash,
+                review_hash,
+                json.dumps(review.get('code_stats', {}), ensure_ascii=False)
+            ))
+            archive_id = cursor.lastrowid
+
+        # 사전이 아직 없고 코퍼스가 충분히 쌓였으면 자동 학습
+        if dict_id is None and archive_id % Config.ARCHIVE_DICT_TRAIN_MIN_SAMPLES == 0:
+            self.train_dictionary()
+
+        return archive_id
+
+    def get(self, archive_id: int) -> Optional[Dict]:
+        """
+        아카이브 ID로 전체 리뷰 조회
+
+        Args:
+            archive_id: 아카이브 ID
+
+        Returns:
+            리뷰 결과 딕셔너리 (없으면 None)
+        """
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT timestamp, session_id, language, review_type, code_hash, review_hash, code_stats
+                FROM reviews WHERE id = ?
+            """, (archive_id,)).fetchone()
+            if row is None:
+                return None
+            timestamp, session_id, language, review_type, code_hash, review_hash, code_stats = row
+            code_snippet = self._get_blob(code_hash)
+            review_result = self._get_blob(review_hash)
+
+        return {
+            "success": True,
+            "archive_id": archive_id,
+            "review_result": review_result,
+            "code_snippet": code_snippet,
+            "language": language,
+            "review_type": review_type,
+            "timestamp": timestamp,
+            "session_id": session_id,
+            "code_stats": json.loads(code_stats) if code_stats else {}
+        }
+
+    def languages(self) -> List[str]:
+        """아카이브에 있는 언어 목록"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT language FROM reviews ORDER BY language").fetchall()
+        return [row[0] for row in rows]
+
+    def review_types(self) -> List[str]:
+        """아카이브에 있는 리뷰 유형 목록"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT review_type FROM reviews ORDER BY review_type").fetchall()
+        return [row[0] for row in rows]
+
+    def query(self,
+              language: Optional[str] = None,
+              review_type: Optional[str] = None,
+              page: int = 1,
+              page_size: int = 20) -> Dict:
+        """
+        필터링된 아카이브 페이지 조회 (최신순, ReviewHistory.query와 같은 형식)
+
+        Args:
+            language: 언어 필터 (없으면 전체)
+            review_type: 리뷰 유형 필터 (없으면 전체)
+            page: 페이지 번호 (1부터 시작)
+            page_size: 페이지당 항목 수
+
+        Returns:
+            요약 목록과 페이지 정보
+        """
+        conditions = []
+        params = []
+        if language:
+            conditions.append("language = ?")
+            params.append(language)
+        if review_type:
+            conditions.append("review_type = ?")
+            params.append(review_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reviews {where}", params).fetchone()[0]
+            total_pages = max((total + page_size - 1) // page_size, 1)
+            page = min(max(page, 1), total_pages)
+            rows = self._conn.execute(f"""
+                SELECT id, timestamp, language, review_type, code_hash, review_hash
+                FROM reviews {where} ORDER BY id DESC LIMIT ? OFFSET ?
+            """, params + [page_size, (page - 1) * page_size]).fetchall()
+
+            # 현재 페이지 항목만 압축 해제하여 미리보기 생성
+            items = []
+            for offset, (archive_id, timestamp, language_, review_type_, code_hash, review_hash) in enumerate(rows):
+                summary = make_summary(
+                    archive_id, language_, review_type_, timestamp,
+                    self._get_blob(code_hash), self._get_blob(review_hash)
+                )
+                summary["number"] = total - (page - 1) * page_size - offset
+                items.append(summary)
+
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": total_pages
+        }
+
+    def get_review(self, review_id: int) -> Optional[Dict]:
+        """전체 코드와 리뷰 본문 조회 (ReviewHistory와 같은 인터페이스)"""
+        return self.get(review_id)
+
+    # ------------------------------------------------------------------
+    # 사전 학습 / 통계
+    # ------------------------------------------------------------------
+
+    def train_dictionary(self, sample_size: int = 500) -> Optional[int]:
+        """
+        최근 리뷰 코퍼스로 압축 사전 학습
+
+        이후 저장되는 블롭부터 새 사전을 사용하며, 기존 블롭은 저장 당시 사전으로 계속 읽힙니다.
+
+        Args:
+            sample_size: 학습에 사용할 최근 리뷰 수
+
+        Returns:
+            새 사전 ID (학습할 반복 패턴이 없으면 None)
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT code_hash, review_hash FROM reviews ORDER BY id DESC LIMIT ?
+            """, (sample_size,)).fetchall()
+            samples = []
+            for code_hash, review_hash in rows:
+                samples.append(self._get_blob(code_hash))
+                samples.append(self._get_blob(review_hash))
+
+        dictionary = build_dictionary(samples)
+        if not dictionary:
+            return None
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO dictionaries (created_at, data) VALUES (?, ?)",
+                (datetime.now().isoformat(), dictionary)
+            )
+        return cursor.lastrowid
+
+    def get_statistics(self) -> Dict:
+        """저장 효율 통계"""
+        with self._lock:
+            reviews, = self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()
+            blobs, unique_bytes, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+            logical_bytes, = self._conn.execute("""
+                SELECT COALESCE(SUM(c.raw_size + r.raw_size), 0) FROM reviews
+                JOIN blobs c ON c.hash = reviews.code_hash
+                JOIN blobs r ON r.hash = reviews.review_hash
+            """).fetchone()
+            dictionaries, = self._conn.execute("SELECT COUNT(*) FROM dictionaries").fetchone()
+
+        return {
+            "reviews": reviews,
+            "blobs": blobs,
+            "dictionaries": dictionaries,
+            "logical_bytes": logical_bytes,
+            "unique_bytes": unique_bytes,
+            "stored_bytes": stored_bytes,
+            "compression_ratio": round(logical_bytes / stored_bytes, 2) if stored_bytes else 0
+        }
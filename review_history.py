@@ -0,0 +1,145 @@
+"""
+리뷰 히스토리 모듈
+언어/리뷰 유형 인덱스를 유지하여 히스토리 필터링과 페이지 조회를 빠르게 처리
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 목록에 표시할 미리보기 길이
+CODE_PREVIEW_CHARS = 200
+REVIEW_PREVIEW_CHARS = 500
+
+
+def make_summary(review_id: int,
+                 language: str,
+                 review_type: str,
+                 timestamp: str,
+                 code: str,
+                 review_text: str) -> Dict:
+    """목록 표시에 필요한 요약 정보 생성"""
+    return {
+        "id": review_id,
+        "language": language,
+        "review_type": review_type,
+        "timestamp": timestamp,
+        "code_preview": code[:CODE_PREVIEW_CHARS] + "..." if len(code) > CODE_PREVIEW_CHARS else code,
+        "review_preview": (
+            review_text[:REVIEW_PREVIEW_CHARS] + "..." if len(review_text) > REVIEW_PREVIEW_CHARS else review_text
+        ),
+        "truncated": len(code) > CODE_PREVIEW_CHARS or len(review_text) > REVIEW_PREVIEW_CHARS
+    }
+
+
+class ReviewHistory:
+    """인덱스 기반 리뷰 히스토리 관리 클래스"""
+
+    def __init__(self, archive=None):
+        """
+        히스토리 초기화
+
+        Args:
+            archive: 전체 본문을 보관하는 ReviewArchive (있으면 메모리에는 요약만 유지)
+        """
+        self.archive = archive
+        self._reviews: List[Dict] = []
+        self._summaries: List[Dict] = []
+        # 삽입 시점에 갱신되는 인덱스 (값은 삽입 순서의 위치 목록)
+        self._by_language: Dict[str, List[int]] = {}
+        self._by_review_type: Dict[str, List[int]] = {}
+        self._by_language_and_type: Dict[Tuple[str, str], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._reviews)
+
+    def add(self, review: Dict) -> int:
+        """
+        리뷰 결과 추가 및 인덱스 갱신
+
+        Args:
+            review: process_code_review 결과 딕셔너리
+
+        Returns:
+            히스토리 내 리뷰 위치 (ID)
+        """
+        position = len(self._reviews)
+        language = review['language']
+        review_type = review['review_type']
+
+        if self.archive is not None and review.get('archive_id') is not None:
+            self._reviews.append({"archive_id": review['archive_id']})
+        else:
+            self._reviews.append(review)
+        self._summaries.append(make_summary(
+            position, review['language'], review['review_type'], review['timestamp'],
+            review['code_snippet'], review['review_result']
+        ))
+        self._by_language.setdefault(language, []).append(position)
+        self._by_review_type.setdefault(review_type, []).append(position)
+        self._by_language_and_type.setdefault((language, review_type), []).append(position)
+        return position
+
+    def languages(self) -> List[str]:
+        """히스토리에 있는 언어 목록"""
+        return sorted(self._by_language)
+
+    def review_types(self) -> List[str]:
+        """히스토리에 있는 리뷰 유형 목록"""
+        return sorted(self._by_review_type)
+
+    def _positions(self, language: Optional[str], review_type: Optional[str]) -> Sequence[int]:
+        """필터 조건에 맞는 위치 목록 (인덱스 조회)"""
+        if language and review_type:
+            return self._by_language_and_type.get((language, review_type), [])
+        if language:
+            return self._by_language.get(language, [])
+        if review_type:
+            return self._by_review_type.get(review_type, [])
+        return range(len(self._reviews))
+
+    def query(self,
+              language: Optional[str] = None,
+              review_type: Optional[str] = None,
+              page: int = 1,
+              page_size: int = 20) -> Dict:
+        """
+        필터링된 히스토리 페이지 조회 (최신순)
+
+        Args:
+            language: 언어 필터 (없으면 전체)
+            review_type: 리뷰 유형 필터 (없으면 전체)
+            page: 페이지 번호 (1부터 시작)
+            page_size: 페이지당 항목 수
+
+        Returns:
+            요약 목록과 페이지 정보
+        """
+        positions = self._positions(language, review_type)
+        total = len(positions)
+        total_pages = max((total + page_size - 1) // page_size, 1)
+        page = min(max(page, 1), total_pages)
+
+        # 최신순으로 필요한 구간만 잘라서 요약 생성
+        end = total - (page - 1) * page_size
+        start = max(end - page_size, 0)
+        items = []
+        for index in range(end - 1, start - 1, -1):
+            summary = dict(self._summaries[positions[index]])
+            summary["number"] = index + 1
+            items.append(summary)
+
+        return {
+            "items": items,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": total_pages
+        }
+
+    def get_review(self, review_id: int) -> Optional[Dict]:
+        """전체 코드와 리뷰 본문 조회 (아카이브에 보관된 경우 필요할 때 로드)"""
+        if not 0 <= review_id < len(self._reviews):
+            return None
+        review = self._reviews[review_id]
+        if 'code_snippet' not in review:
+            return self.archive.get(review['archive_id'])
+        return review
@@ -0,0 +1,163 @@
+"""
+유사 리뷰 검색 모듈
+해시 n-gram 벡터와 메모리 매핑 파일을 이용한 로컬 top-k 코사인 유사도 검색
+"""
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+from config import Config
+from file_lock import locked_path
+
+
+VECTOR_DIM = 1024
+_WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[가-힣]+|\d+")
+
+
+def _features(text: str) -> Counter:
+    """단어 unigram/bigram 특징 추출"""
+    words = [word.lower() for word in _WORD_PATTERN.findall(text)]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+def vectorize(code: str, review_text: str = ""):
+    """
+    코드와 리뷰 텍스트를 해시 벡터로 변환
+
+    특징을 crc32로 VECTOR_DIM 차원에 해싱하고(부호 해싱으로 충돌 상쇄),
+    로그 TF 가중치 후 L2 정규화하여 내적이 곧 코사인 유사도가 되도록 합니다.
+
+    Args:
+        code: 코드
+        review_text: 리뷰 본문
+
+    Returns:
+        (VECTOR_DIM,) float32 NumPy 배열
+    """
+    import numpy as np
+
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for feature, count in (_features(code) + _features(review_text)).items():
+        hashed = zlib.crc32(feature.encode('utf-8'))
+        sign = 1.0 if hashed & 0x80000000 else -1.0
+        vector[hashed % VECTOR_DIM] += sign * (1.0 + math.log(count))
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class ReviewSearchIndex:
+    """메모리 매핑 기반 유사 리뷰 벡터 인덱스 클래스"""
+
+    def __init__(self, index_path: str = Config.REVIEW_SEARCH_INDEX_PATH):
+        """
+        인덱스 초기화 (파일은 첫 검색/추가 시점에 매핑)
+
+        Args:
+            index_path: 인덱스 파일 경로 접두사 (.f32 벡터, .ids ID 파일 생성)
+        """
+        self.vectors_file = f"{index_path}.f32"
+        self.ids_file = f"{index_path}.ids"
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._ids = None
+        self._mapped_rows = -1
+
+    def _row_count(self) -> int:
+        """파일에 기록된 벡터 수 (두 파일 중 완전히 기록된 행 기준)"""
+        if not os.path.exists(self.vectors_file) or not os.path.exists(self.ids_file):
+            return 0
+        return min(os.path.getsize(self.vectors_file) // (VECTOR_DIM * 4),
+                   os.path.getsize(self.ids_file) // 8)
+
+    def _refresh(self):
+        """다른 세션/프로세스가 추가한 행까지 다시 매핑"""
+        import numpy as np
+
+        rows = self._row_count()
+        if rows == self._mapped_rows:
+            return
+        if rows:
+            self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode='r', shape=(rows, VECTOR_DIM))
+            self._ids = np.memmap(self.ids_file, dtype=np.int64, mode='r', shape=(rows,))
+        else:
+            self._vectors = None
+            self._ids = None
+        self._mapped_rows = rows
+
+    def __len__(self) -> int:
+        return self._row_count()
+
+    def add(self, entry_id: int, code: str, review_text: str):
+        """
+        리뷰 벡터를 인덱스 파일 끝에 추가
+
+        Args:
+            entry_id: 리뷰 아카이브 ID
+            code: 리뷰한 코드
+            review_text: 리뷰 본문
+        """
+        import numpy as np
+
+        vector = vectorize(code, review_text)
+        # 세션/프로세스마다 인스턴스가 따로 있으므로 경로 단위로 잠가 두 파일의 행 순서를 맞춤
+        with locked_path(self.ids_file):
+            rows = self._row_count()
+            # 중간에 끊긴 기록(ID 없는 벡터, 잘린 ID)은 잘라내고 같은 행 위치에 이어 씀
+            for path, row_bytes in ((self.vectors_file, VECTOR_DIM * 4), (self.ids_file, 8)):
+                if os.path.exists(path) and os.path.getsize(path) > rows * row_bytes:
+                    os.truncate(path, rows * row_bytes)
+            # 벡터를 먼저 쓰고 ID를 나중에 써서, 읽는 쪽은 ID가 있는 행만 보게 함
+            with open(self.vectors_file, 'ab') as f:
+                f.write(vector.tobytes())
+            with open(self.ids_file, 'ab') as f:
+                f.write(np.array([entry_id], dtype=np.int64).tobytes())
+
+    def search(self,
+               code: str,
+               review_text: str = "",
+               k: int = 5,
+               exclude_ids: Optional[List[int]] = None,
+               min_score: float = 0.0) -> List[Dict]:
+        """
+        top-k 코사인 유사도 검색
+
+        Args:
+            code: 검색할 코드
+            review_text: 검색할 리뷰 본문 (있으면 함께 사용)
+            k: 반환할 결과 수
+            exclude_ids: 결과에서 제외할 아카이브 ID
+            min_score: 최소 유사도
+
+        Returns:
+            [{"id", "score"}] (유사도 높은 순)
+        """
+        import numpy as np
+
+        query = vectorize(code, review_text)
+        with self._lock:
+            self._refresh()
+            if self._vectors is None:
+                return []
+            scores = self._vectors @ query
+            ids = self._ids
+
+            if exclude_ids:
+                scores = np.where(np.isin(ids, exclude_ids), -np.inf, scores)
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                {"id": int(ids[i]), "score": float(scores[i])}
+                for i in top if scores[i] >= min_score
+            ]
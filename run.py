@@ -5,23 +5,39 @@
 import sys
 import subprocess
 import os
+import importlib.util
+
+# 실행에 필요한 패키지 (import 이름, 설치 이름)
+REQUIRED_PACKAGES = [
+    ("streamlit", "streamlit"),
+    ("openai", "openai"),
+    ("pandas", "pandas"),
+    ("numpy", "numpy"),
+    ("pyarrow", "pyarrow"),
+    ("dotenv", "python-dotenv"),
+]
 
 def check_requirements():
-    """필요한 패키지 설치 확인"""
-    try:
-        import streamlit
-        import openai
-        import pandas
-        from dotenv import load_dotenv
-        print("✅ 모든 필요한 패키지가 설치되어 있습니다.")
-        return True
-    except ImportError as e:
-        print(f"❌ 패키지 누락: {e}")
+    """필요한 패키지 설치 확인
+    
+    패키지를 실제로 import하지 않고 find_spec으로 존재 여부만 확인합니다.
+    (Streamlit 프로세스가 다시 import하므로 여기서 로드하면 시작 시간만 늘어남)
+    """
+    missing = [
+        dist_name for module_name, dist_name in REQUIRED_PACKAGES
+        if importlib.util.find_spec(module_name) is None
+    ]
+    
+    if missing:
+        print(f"❌ 패키지 누락: {', '.join(missing)}")
         print("UV 환경에서 패키지를 설치해주세요:")
         print("uv add streamlit openai python-dotenv pandas")
         print("또는 requirements.txt 사용:")
         print("uv pip install -r requirements.txt")
         return False
+    
+    print("✅ 모든 필요한 패키지가 설치되어 있습니다.")
+    return True
 
 def check_env_file():
     """환경 변수 파일 확인"""
@@ -0,0 +1,273 @@
+"""
+백엔드 호출 스케줄러 모듈
+우선순위 클래스(대화형 빠른 수정 > 대화형 리뷰 > 추측 실행 > 배치)별 가중 공정 큐(WFQ)와
+에이징으로 제한된 동시 호출 슬롯을 나누고, 대화형 부하가 높으면 배치 작업을 멈추거나 선점
+(프로세스 단위: 같은 프로세스 안의 호출끼리만 조절하며 다른 프로세스와는 슬롯을 나누지 않음)
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+
+
+# 우선순위가 높은 순서
+PRIORITY_CLASSES = ["quick_fix", "review", "speculative", "batch"]
+INTERACTIVE_CLASSES = ("quick_fix", "review")
+# 진행 중에 다른 요청에 자리를 양보할 수 있는 클래스
+PREEMPTIBLE_CLASSES = ("speculative", "batch")
+
+_current_priority = contextvars.ContextVar("backend_priority", default=None)
+# track_tickets 블록 안에서 받은 (스케줄러, 티켓) 목록
+_ticket_sink = contextvars.ContextVar("backend_ticket_sink", default=None)
+
+
+class Preempted(Exception):
+    """더 높은 우선순위 요청에 슬롯을 양보하기 위해 호출을 중단할 때 발생"""
+
+
+def current_priority(default: str = "review") -> str:
+    """현재 실행 흐름의 우선순위 클래스 (바깥에서 지정하지 않았으면 default)"""
+    return _current_priority.get() or default
+
+
+@contextmanager
+def priority(priority_class: str, override: bool = False):
+    """
+    이 블록 안의 백엔드 호출에 우선순위 클래스 지정
+
+    Args:
+        priority_class: PRIORITY_CLASSES 중 하나
+        override: False면 바깥에서 이미 지정한 클래스를 유지 (예: 배치 CLI가 호출한 파이프라인)
+    """
+    if priority_class not in PRIORITY_CLASSES:
+        raise ValueError(f"알 수 없는 우선순위 클래스: {priority_class}")
+    if _current_priority.get() is not None and not override:
+        yield
+        return
+    token = _current_priority.set(priority_class)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def track_tickets(sink: list):
+    """이 블록 안의 슬롯 요청을 (스케줄러, 티켓)으로 sink에 추가 (나중에 우선순위를 올릴 때 사용)"""
+    token = _ticket_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _ticket_sink.reset(token)
+
+
+def run_with_priority(priority_class: str, func: Callable, *args, **kwargs):
+    """우선순위 클래스를 지정해 함수 실행 (스레드 풀에 넘길 때 사용)"""
+    with priority(priority_class, override=True):
+        return func(*args, **kwargs)
+
+
+class Ticket:
+    """슬롯 요청 하나"""
+
+    def __init__(self, priority_class: str, finish_tag: float, preemptible: bool, cost: float = 1.0):
+        self.priority_class = priority_class
+        self.finish_tag = finish_tag
+        self.cost = cost
+        self.preemptible = preemptible
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.preempted = threading.Event()
+
+
+class BackendScheduler:
+    """우선순위 클래스별 가중 공정 큐 스케줄러 클래스 (스레드 안전)"""
+
+    def __init__(self,
+                 max_concurrent: int = Config.SCHEDULER_MAX_CONCURRENT,
+                 weights: Optional[Dict[str, float]] = None,
+                 aging_seconds: float = Config.SCHEDULER_AGING_SECONDS,
+                 batch_pause_load: int = Config.SCHEDULER_BATCH_PAUSE_LOAD,
+                 max_pause_seconds: float = Config.SCHEDULER_MAX_PAUSE_SECONDS):
+        """
+        Args:
+            max_concurrent: 동시에 실행할 백엔드 호출 수
+            weights: 클래스별 가중치 (클수록 많은 몫)
+            aging_seconds: 이만큼 기다릴 때마다 가상 완료 시각을 한 단위 앞당김
+            batch_pause_load: 대화형 요청(진행+대기)이 이 수 이상이면 배치 작업을 새로 시작하지 않음
+            max_pause_seconds: 배치가 멈춰 있을 수 있는 최대 시간 (기아 방지)
+        """
+        self.max_concurrent = max_concurrent
+        self.weights = weights or Config.SCHEDULER_WEIGHTS
+        self.aging_seconds = aging_seconds
+        self.batch_pause_load = batch_pause_load
+        self.max_pause_seconds = max_pause_seconds
+        self._cond = threading.Condition()
+        self._queues: Dict[str, deque] = {name: deque() for name in PRIORITY_CLASSES}
+        self._running: List[Ticket] = []
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._waits: Dict[str, deque] = {name: deque(maxlen=1000) for name in PRIORITY_CLASSES}
+        self._counts: Dict[str, Dict[str, int]] = {
+            name: {"completed": 0, "preempted": 0} for name in PRIORITY_CLASSES
+        }
+
+    def _interactive_load(self) -> int:
+        running = sum(1 for ticket in self._running if ticket.priority_class in INTERACTIVE_CLASSES)
+        waiting = sum(len(self._queues[name]) for name in INTERACTIVE_CLASSES)
+        return running + waiting
+
+    def _eligible(self, ticket: Ticket, now: float) -> bool:
+        if ticket.priority_class != "batch":
+            return True
+        # 대화형 부하가 높으면 배치는 대기 (너무 오래 기다렸으면 예외)
+        return (self._interactive_load() < self.batch_pause_load
+                or now - ticket.enqueued_at >= self.max_pause_seconds)
+
+    def _dispatch(self):
+        """빈 슬롯에 (가상 완료 시각 - 에이징)이 가장 작은 요청 배정 (락을 잡은 상태에서 호출)"""
+        now = time.monotonic()
+        while len(self._running) < self.max_concurrent:
+            best = None
+            best_score = None
+            for name in PRIORITY_CLASSES:
+                if not self._queues[name]:
+                    continue
+                ticket = self._queues[name][0]
+                if not self._eligible(ticket, now):
+                    continue
+                score = ticket.finish_tag - (now - ticket.enqueued_at) / self.aging_seconds
+                if best is None or score < best_score:
+                    best, best_score = ticket, score
+            if best is None:
+                return
+            self._queues[best.priority_class].popleft()
+            self._virtual_time = max(self._virtual_time, best.finish_tag)
+            self._waits[best.priority_class].append(now - best.enqueued_at)
+            best.granted = True
+            self._running.append(best)
+            self._cond.notify_all()
+
+    def _preempt_for_interactive(self):
+        """슬롯이 모두 찼는데 대화형 요청이 기다리면 낮은 우선순위 호출에 양보 요청"""
+        waiting = sum(len(self._queues[name]) for name in INTERACTIVE_CLASSES)
+        pending = sum(1 for ticket in self._running if ticket.preempted.is_set())
+        free = self.max_concurrent - len(self._running)
+        victims = [ticket for ticket in self._running
+                   if ticket.preemptible and not ticket.preempted.is_set()]
+        # 배치부터, 같은 클래스면 나중에 시작한 호출부터
+        victims.sort(key=lambda t: (-PRIORITY_CLASSES.index(t.priority_class), -t.enqueued_at))
+        while waiting > pending + free and victims:
+            victims.pop(0).preempted.set()
+            pending += 1
+
+    def acquire(self, priority_class: Optional[str] = None, cost: float = 1.0,
+                preemptible: bool = True, cancel_token=None) -> Ticket:
+        """
+        슬롯 요청 (배정될 때까지 대기)
+
+        Args:
+            priority_class: 우선순위 클래스 (없으면 현재 실행 흐름의 클래스)
+            cost: 요청 비용 (예상 출력 토큰 / 1000)
+            preemptible: 진행 중 선점 허용 여부 (PREEMPTIBLE_CLASSES만 적용)
+            cancel_token: 대기 중 취소되면 줄에서 빠지고 Cancelled 발생
+
+        Raises:
+            Cancelled: 슬롯을 받기 전에 취소되었을 때
+        """
+        priority_class = priority_class or current_priority()
+        with self._cond:
+            start = max(self._virtual_time, self._last_finish[priority_class])
+            finish_tag = start + max(cost, 0.1) / self.weights[priority_class]
+            self._last_finish[priority_class] = finish_tag
+            ticket = Ticket(priority_class, finish_tag, preemptible and priority_class in PREEMPTIBLE_CLASSES, cost)
+            self._queues[priority_class].append(ticket)
+            sink = _ticket_sink.get()
+            if sink is not None:
+                sink.append((self, ticket))
+            self._dispatch()
+            if not ticket.granted and priority_class in INTERACTIVE_CLASSES:
+                self._preempt_for_interactive()
+            while not ticket.granted:
+                if cancel_token is not None and cancel_token.cancelled:
+                    # promote로 클래스가 바뀌었을 수 있으므로 티켓의 현재 클래스 큐에서 제거
+                    self._queues[ticket.priority_class].remove(ticket)
+                    cancel_token.raise_if_cancelled()
+                # 배치 대기 해제/에이징/취소는 시간에 따라 바뀌므로 주기적으로 다시 확인
+                self._cond.wait(timeout=0.2 if cancel_token is not None else 1.0)
+                if not ticket.granted:
+                    self._dispatch()
+            return ticket
+
+    def promote(self, ticket: Ticket, priority_class: str):
+        """
+        대기 중이거나 진행 중인 요청의 우선순위를 올림 (사용자가 추측 작업 결과를 기다릴 때)
+
+        대기 중이면 새 클래스 큐로 옮겨 다시 가상 완료 시각을 매기고, 진행 중이면 선점 대상에서 뺌
+        """
+        with self._cond:
+            if PRIORITY_CLASSES.index(priority_class) >= PRIORITY_CLASSES.index(ticket.priority_class):
+                return
+            if not ticket.granted:
+                queue = self._queues[ticket.priority_class]
+                if ticket not in queue:
+                    return
+                queue.remove(ticket)
+                start = max(self._virtual_time, self._last_finish[priority_class])
+                ticket.finish_tag = start + max(ticket.cost, 0.1) / self.weights[priority_class]
+                self._last_finish[priority_class] = ticket.finish_tag
+                ticket.priority_class = priority_class
+                ticket.preemptible = ticket.preemptible and priority_class in PREEMPTIBLE_CLASSES
+                self._queues[priority_class].append(ticket)
+                self._dispatch()
+                if not ticket.granted and priority_class in INTERACTIVE_CLASSES:
+                    self._preempt_for_interactive()
+            elif ticket in self._running:
+                ticket.priority_class = priority_class
+                ticket.preemptible = ticket.preemptible and priority_class in PREEMPTIBLE_CLASSES
+
+    def release(self, ticket: Ticket):
+        """슬롯 반납"""
+        with self._cond:
+            if ticket in self._running:
+                self._running.remove(ticket)
+            key = "preempted" if ticket.preempted.is_set() else "completed"
+            self._counts[ticket.priority_class][key] += 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority_class: Optional[str] = None, cost: float = 1.0, preemptible: bool = True,
+             cancel_token=None):
+        """슬롯을 잡고 블록 실행 후 반납"""
+        ticket = self.acquire(priority_class, cost, preemptible, cancel_token)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_stats(self) -> List[Dict]:
+        """클래스별 대기 시간(ms)과 진행/대기/완료/선점 수"""
+        with self._cond:
+            stats = []
+            for name in PRIORITY_CLASSES:
+                waits = sorted(self._waits[name])
+                stats.append({
+                    "class": name,
+                    "weight": self.weights[name],
+                    "running": sum(1 for ticket in self._running if ticket.priority_class == name),
+                    "queued": len(self._queues[name]),
+                    "completed": self._counts[name]["completed"],
+                    "preempted": self._counts[name]["preempted"],
+                    "wait_mean_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                    "wait_p95_ms": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)] * 1000, 1) if waits else 0.0,
+                    "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0
+                })
+            return stats
+
+
+# 프로세스 내 모든 세션/배치가 같은 백엔드 슬롯을 나눠 씀
+shared_scheduler = BackendScheduler()
@@ -0,0 +1,231 @@
+"""
+추측 실행(speculative prefetch) 모듈
+종합 리뷰가 끝난 뒤 사용자가 이어서 요청할 가능성이 높은 결과(테스트 케이스)를
+백그라운드에서 낮은 우선순위로 미리 생성해 결과 캐시에 넣음
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import Config
+from result_cache import ResultCache, shared_result_cache
+from scheduler import track_tickets
+
+
+class SpeculationCancelled(Exception):
+    """추측 작업이 취소되어 생성을 중단할 때 발생"""
+
+
+class SpeculationBudget:
+    """최근 구간의 추측 호출 수/토큰 상한 관리 클래스"""
+
+    def __init__(self,
+                 max_calls: int = Config.SPECULATIVE_MAX_CALLS_PER_HOUR,
+                 max_tokens: int = Config.SPECULATIVE_MAX_TOKENS_PER_HOUR,
+                 window: float = 3600.0):
+        """
+        Args:
+            max_calls: 구간 내 최대 추측 호출 수
+            max_tokens: 구간 내 최대 추측 토큰 수 (max_tokens 기준 상한 추정)
+            window: 구간 길이 (초)
+        """
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.window = window
+        self._lock = threading.Lock()
+        self._spent = deque()
+
+    def _expire(self, now: float):
+        while self._spent and self._spent[0][0] <= now - self.window:
+            self._spent.popleft()
+
+    def try_acquire(self, tokens: int) -> bool:
+        """예산이 남아 있으면 사용 처리 후 True"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            used_tokens = sum(spent for _, spent in self._spent)
+            if len(self._spent) >= self.max_calls or used_tokens + tokens > self.max_tokens:
+                return False
+            self._spent.append((now, tokens))
+            return True
+
+    def usage(self) -> Dict:
+        """현재 구간 사용량"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "calls": len(self._spent),
+                "max_calls": self.max_calls,
+                "tokens": sum(spent for _, spent in self._spent),
+                "max_tokens": self.max_tokens
+            }
+
+
+class _Job:
+    def __init__(self, key: str, owner: str):
+        self.key = key
+        self.owner = owner
+        self.started = False
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        # 작업이 받은 백엔드 슬롯 (스케줄러, 티켓)
+        self.tickets = []
+
+    def promote(self, priority_class: str):
+        """작업의 슬롯 요청 우선순위를 올림"""
+        for scheduler, ticket in list(self.tickets):
+            scheduler.promote(ticket, priority_class)
+
+
+class SpeculativePrefetcher:
+    """추측 작업 큐 관리 클래스 (프로세스 전체에서 작업 스레드 하나만 사용)"""
+
+    def __init__(self,
+                 cache: ResultCache,
+                 budget: SpeculationBudget,
+                 max_queue: int = Config.SPECULATIVE_MAX_QUEUE):
+        """
+        Args:
+            cache: 결과를 넣을 캐시
+            budget: 추측 호출 예산
+            max_queue: 시작 전 대기 가능한 최대 작업 수 (넘으면 새 작업을 건너뜀)
+        """
+        self.cache = cache
+        self.budget = budget
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _Job] = {}
+        self._executor = None
+        self.stats = {"scheduled": 0, "completed": 0, "cancelled": 0, "used": 0,
+                      "skipped_budget": 0, "skipped_queue": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # 작업 스레드 하나 → 추측 작업은 한 번에 하나씩만 백엔드를 사용 (사용자 요청이 항상 우선)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative")
+            return self._executor
+
+    def schedule(self, key: str, owner: str, tokens: int,
+                 task: Callable[[Callable[[str], None]], Optional[Dict]]) -> bool:
+        """
+        추측 작업 예약
+
+        Args:
+            key: 결과 캐시 키
+            owner: 작업을 요청한 세션 식별자 (취소 단위)
+            tokens: 예산에서 차감할 예상 토큰 수
+            task: on_chunk 콜백을 받아 결과(dict, 실패 시 None)를 반환하는 함수
+
+        Returns:
+            예약 여부
+        """
+        with self._lock:
+            if key in self._jobs:
+                return False
+            if sum(1 for job in self._jobs.values() if not job.started) >= self.max_queue:
+                self.stats["skipped_queue"] += 1
+                return False
+        if self.cache.get(key) is not None:
+            return False
+        if not self.budget.try_acquire(tokens):
+            self._count("skipped_budget")
+            return False
+
+        job = _Job(key, owner)
+        with self._lock:
+            self._jobs[key] = job
+            self.stats["scheduled"] += 1
+        self._get_executor().submit(self._run, job, task)
+        return True
+
+    def _run(self, job: _Job, task: Callable):
+        def on_chunk(_text: str):
+            # 스트리밍 중 취소되면 예외로 생성을 끊어 토큰을 아낌
+            if job.cancelled.is_set():
+                raise SpeculationCancelled()
+
+        try:
+            with self._lock:
+                # take가 시작 전 작업을 취소하는 것과 겹치지 않도록 락 안에서 시작 표시
+                if job.cancelled.is_set():
+                    return
+                job.started = True
+            with track_tickets(job.tickets):
+                result = task(on_chunk)
+            if result is not None and not job.cancelled.is_set():
+                self.cache.put(job.key, result)
+                self._count("completed")
+        except Exception as e:
+            print(f"추측 실행 중 오류: {e}")
+        finally:
+            if job.cancelled.is_set():
+                self._count("cancelled")
+            with self._lock:
+                self._jobs.pop(job.key, None)
+            job.done.set()
+
+    def take(self, key: str, timeout: float = Config.SPECULATIVE_WAIT_SECONDS) -> Optional[Dict]:
+        """
+        미리 생성된 결과 가져오기
+
+        아직 시작하지 않은 작업(다른 세션 작업 뒤에 대기 중)은 취소하고 None을 돌려줘 호출자가
+        바로 대화형으로 생성하게 하고, 생성 중인 작업은 review 우선순위로 올려 최대 timeout초 대기
+
+        Returns:
+            결과 dict 또는 None
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.started:
+                job.cancelled.set()
+                job = None
+        if job is not None and not job.cancelled.is_set():
+            deadline = time.monotonic() + timeout
+            # 선점되어 다시 줄을 선 슬롯도 올리도록 기다리는 동안 주기적으로 반복
+            job.promote("review")
+            while not job.done.wait(min(0.2, max(deadline - time.monotonic(), 0))):
+                if time.monotonic() >= deadline:
+                    break
+                job.promote("review")
+
+        result = self.cache.get(key)
+        if result is not None:
+            self._count("used")
+        return result
+
+    def cancel(self, owner: str, keep_key: Optional[str] = None) -> int:
+        """
+        세션의 추측 작업 취소 (코드가 바뀌었을 때)
+
+        Args:
+            owner: 세션 식별자
+            keep_key: 취소하지 않을 작업 키 (현재 코드의 작업)
+
+        Returns:
+            취소한 작업 수
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.owner == owner and job.key != keep_key]
+        for job in jobs:
+            job.cancelled.set()
+        return len(jobs)
+
+    def get_stats(self) -> Dict:
+        """추측 실행 통계 (예약/완료/취소/사용 수와 예산 사용량)"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["budget"] = self.budget.usage()
+        stats["cache"] = self.cache.stats()
+        return stats
+
+
+# 프로세스 전체에서 예산과 작업 스레드를 공유
+shared_prefetcher = SpeculativePrefetcher(shared_result_cache, SpeculationBudget())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 벤치마크 스크립트
+모듈 import 시간과 첫 페이지 렌더링 지연을 측정하고 예산과 비교
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 기본 예산 (밀리초) - 오토스케일링되는 Streamlit 파드 기준
+DEFAULT_IMPORT_BUDGET_MS = 500
+DEFAULT_RENDER_BUDGET_MS = 3000
+
+# import 시간을 측정할 모듈
+BENCHMARK_MODULES = ["config", "feedback_collector", "code_reviewer", "pipeline"]
+
+# 시작 시점에 로드되면 안 되는 무거운 패키지
+LAZY_PACKAGES = ["pandas", "openai", "numpy", "pyarrow"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    "elapsed_ms": elapsed_ms,
+    "loaded": [name for name in {lazy!r} if name in sys.modules]
+}}))
+"""
+
+RENDER_PROBE = """
+import json, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout={timeout})
+at.run()
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    "elapsed_ms": elapsed_ms,
+    "elements": len(at.main),
+    "exceptions": [str(e.value) for e in at.exception]
+}}))
+"""
+
+
+def _run_probe(source: str) -> dict:
+    """새 인터프리터에서 측정 코드를 실행하고 JSON 결과 반환"""
+    env = dict(os.environ)
+    # 실제 API 호출 없이 파이프라인 초기화 경로까지 측정하기 위한 더미 키
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    completed = subprocess.run(
+        [sys.executable, "-c", source],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(repeat: int) -> dict:
+    """모듈별 콜드 import 시간 측정 (중앙값)"""
+    results = {}
+    for module in BENCHMARK_MODULES:
+        samples = []
+        loaded = []
+        for _ in range(repeat):
+            probe = _run_probe(IMPORT_PROBE.format(module=module, lazy=LAZY_PACKAGES))
+            samples.append(probe["elapsed_ms"])
+            loaded = probe["loaded"]
+        results[module] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "max_ms": round(max(samples), 2),
+            "eagerly_loaded": loaded
+        }
+    return results
+
+
+def measure_first_render(repeat: int, timeout: int) -> dict:
+    """app.py 첫 페이지 렌더링 지연 측정 (중앙값)"""
+    samples = []
+    probe = {}
+    for _ in range(repeat):
+        probe = _run_probe(RENDER_PROBE.format(timeout=timeout))
+        samples.append(probe["elapsed_ms"])
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "max_ms": round(max(samples), 2),
+        "elements": probe["elements"],
+        "exceptions": probe["exceptions"]
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="콜드 스타트 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="pipeline 모듈 import 예산 (ms)")
+    parser.add_argument("--render-budget-ms", type=float, default=DEFAULT_RENDER_BUDGET_MS,
+                        help="첫 페이지 렌더링 예산 (ms)")
+    parser.add_argument("--render-timeout", type=int, default=30, help="렌더링 타임아웃 (초)")
+    parser.add_argument("--skip-render", action="store_true", help="첫 렌더링 측정 생략")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("⏱️  콜드 스타트 벤치마크")
+    print("=" * 50)
+
+    failures = []
+    report = {"imports": measure_imports(args.repeat)}
+
+    for module, result in report["imports"].items():
+        print(f"• import {module}: {result['median_ms']:.1f}ms (최대 {result['max_ms']:.1f}ms)")
+        if result["eagerly_loaded"]:
+            failures.append(f"{module} import 시 지연 로드 대상이 로드됨: {result['eagerly_loaded']}")
+
+    pipeline_ms = report["imports"]["pipeline"]["median_ms"]
+    if pipeline_ms > args.import_budget_ms:
+        failures.append(f"pipeline import {pipeline_ms:.1f}ms > 예산 {args.import_budget_ms:.0f}ms")
+
+    if not args.skip_render:
+        report["first_render"] = measure_first_render(args.repeat, args.render_timeout)
+        render = report["first_render"]
+        print(f"• 첫 페이지 렌더링: {render['median_ms']:.1f}ms (최대 {render['max_ms']:.1f}ms)")
+        if render["exceptions"]:
+            failures.append(f"렌더링 중 예외 발생: {render['exceptions']}")
+        elif not render["elements"]:
+            failures.append("렌더링된 요소가 없습니다 (app.py 실행 실패)")
+        if render["median_ms"] > args.render_budget_ms:
+            failures.append(f"첫 렌더링 {render['median_ms']:.1f}ms > 예산 {args.render_budget_ms:.0f}ms")
+
+    report["failures"] = failures
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ 모든 항목이 예산 안에 있습니다.")
+
+
+if __name__ == "__main__":
+    main()